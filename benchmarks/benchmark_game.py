@@ -0,0 +1,105 @@
+"""Benchmark a single game mode, intended to be run in a fresh subprocess by run_benchmarks.py.
+
+usage: python -m benchmarks.benchmark_game <game> <mode> <num_sims> <threads> <batch_size> <library_path>
+       python -m benchmarks.benchmark_game <game>   (prints the game's bet mode names)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from src.config.paths import PATH_TO_GAMES
+from src.state.run_sims import run_multi_process_sims
+from src.write_data.write_data import output_lookup_and_force_files
+
+
+def get_peak_rss_mb() -> float:
+    """Peak resident memory of this process and its simulation workers."""
+    if resource is None:
+        return None
+    peak_kb = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return round(peak_kb / 1024, 2)
+
+
+def get_mode_bytes_written(gamestate: object, mode: str) -> int:
+    """Size of all final files written for a bet mode."""
+    output_files = gamestate.output_files
+    names = [
+        output_files.get_final_book_name(mode, True),
+        output_files.get_final_lookup_name(mode),
+        output_files.get_final_segmented_name(mode),
+        output_files.force[mode]["paths"]["force_record"],
+    ]
+    return sum(os.path.getsize(name) for name in names if os.path.isfile(name))
+
+
+def load_game(game: str):
+    """Import the config and gamestate classes of a sample game."""
+    sys.path.insert(0, os.path.join(PATH_TO_GAMES, game))
+    from game_config import GameConfig
+    from gamestate import GameState
+
+    return GameConfig, GameState
+
+
+def get_mode_names(game: str) -> list:
+    """All bet mode names defined in the game config."""
+    GameConfig, _ = load_game(game)
+    return [betmode.get_name() for betmode in GameConfig().bet_modes]
+
+
+def benchmark_mode(game: str, mode: str, num_sims: int, threads: int, batch_size: int, library_path: str) -> dict:
+    """Simulate and merge a fixed number of books for one mode, writing to a separate library."""
+    GameConfig, GameState = load_game(game)
+    config = GameConfig()
+    config.library_path = library_path
+    gamestate = GameState(config)
+    gamestate.betmode = mode
+
+    start_time = time.perf_counter()
+    num_sims, num_repeats = run_multi_process_sims(
+        threads,
+        batch_size,
+        config.game_id,
+        mode,
+        gamestate,
+        num_sims=num_sims,
+        compress=True,
+        write_event_list=config.write_event_list,
+    )
+    sim_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    output_lookup_and_force_files(
+        threads, batch_size, config.game_id, mode, gamestate, num_sims=num_sims, num_repeats=num_repeats
+    )
+    merge_seconds = time.perf_counter() - start_time
+    shutil.rmtree(gamestate.output_files.temp_path)
+
+    return {
+        "sims": num_sims,
+        "sim_seconds": round(sim_seconds, 3),
+        "sims_per_second": round(num_sims / sim_seconds, 2),
+        "merge_seconds": round(merge_seconds, 3),
+        "peak_rss_mb": get_peak_rss_mb(),
+        "bytes_written": get_mode_bytes_written(gamestate, mode),
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2:
+        print(json.dumps(get_mode_names(sys.argv[1])))
+        sys.exit(0)
+    game, mode, num_sims, threads, batch_size, library_path = sys.argv[1:7]
+    result = benchmark_mode(game, mode, int(num_sims), int(threads), int(batch_size), library_path)
+    print(json.dumps(result))
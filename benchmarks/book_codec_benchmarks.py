@@ -0,0 +1,101 @@
+"""Compare binary books against the published .jsonl.zst books: file sizes and parse times.
+
+usage:
+    python -m benchmarks.book_codec_benchmarks --game gates --modes base bonus
+    python -m benchmarks.book_codec_benchmarks --books path/to/books_base.jsonl.zst
+
+Parse times include reading and decompressing the file, so both formats are timed from disk to a list of
+decoded books. The summary time reads only the top-level book fields (id, payoutMultiplier, criteria, ...)
+of the binary books, skipping their events.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+from src.config.paths import PATH_TO_GAMES
+from src.write_data.write_data import read_zst_text
+from src.write_data.binary_book_encoder import write_binary_books
+from src.write_data.binary_book_decoder import BinaryBookReader
+
+
+def run_book_codec_benchmark(books_file: str) -> dict:
+    """Convert a .jsonl.zst books file to binary and time both formats."""
+    start = time.perf_counter()
+    lines = read_zst_text(books_file).splitlines()
+    books = [json.loads(line) for line in lines if line]
+    json_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        binary_file = os.path.join(temp_dir, "books.bin.zst")
+        start = time.perf_counter()
+        binary_zst_bytes = write_binary_books(books, binary_file)
+        encode_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decoded = list(BinaryBookReader(binary_file))
+        binary_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reader = BinaryBookReader(binary_file)
+        summaries = list(reader.iter_books(skip_events=True))
+        summary_seconds = time.perf_counter() - start
+
+    return {
+        "books": len(books),
+        "jsonl_bytes": sum(len(line.encode("UTF-8")) + 1 for line in lines if line),
+        "binary_bytes": len(reader.data),
+        "jsonl_zst_bytes": os.path.getsize(books_file),
+        "binary_zst_bytes": binary_zst_bytes,
+        "json_parse_seconds": round(json_seconds, 4),
+        "binary_parse_seconds": round(binary_seconds, 4),
+        "binary_summary_seconds": round(summary_seconds, 4),
+        "binary_encode_seconds": round(encode_seconds, 4),
+        "exact": len(summaries) == len(books) and [json.dumps(book) for book in decoded] == lines,
+    }
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--game", default=None, help="game id, benchmarks its published books")
+    parser.add_argument("--modes", nargs="+", default=None, help="bet modes of --game, all published modes if unset")
+    parser.add_argument("--books", nargs="+", default=[], help="explicit .jsonl.zst books files")
+    parser.add_argument("--output", default=None, help="optional JSON results file")
+    args = parser.parse_args(argv)
+
+    books_files = list(args.books)
+    if args.game is not None:
+        publish_path = os.path.join(PATH_TO_GAMES, args.game, "library", "publish_files")
+        modes = args.modes or sorted(
+            f[len("books_") : -len(".jsonl.zst")] for f in os.listdir(publish_path) if f.endswith(".jsonl.zst")
+        )
+        books_files += [os.path.join(publish_path, f"books_{mode}.jsonl.zst") for mode in modes]
+
+    results = {}
+    for books_file in books_files:
+        metrics = run_book_codec_benchmark(books_file)
+        results[books_file] = metrics
+        print(os.path.basename(books_file), f"({metrics['books']} books, exact round trip: {metrics['exact']})")
+        print(
+            f"  size    jsonl {metrics['jsonl_bytes']:>12} B   binary {metrics['binary_bytes']:>12} B"
+            f"   ({round(metrics['jsonl_bytes'] / metrics['binary_bytes'], 2)}x)"
+        )
+        print(
+            f"  zst     jsonl {metrics['jsonl_zst_bytes']:>12} B   binary {metrics['binary_zst_bytes']:>12} B"
+            f"   ({round(metrics['jsonl_zst_bytes'] / metrics['binary_zst_bytes'], 2)}x)"
+        )
+        print(
+            f"  parse   json  {metrics['json_parse_seconds']:>12} s   binary {metrics['binary_parse_seconds']:>12} s"
+            f"   summaries {metrics['binary_summary_seconds']} s"
+        )
+    if args.output is not None:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(json.dumps(results, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Compare projected book decoding against full json.loads on published .jsonl.zst books.
+
+usage:
+    python -m benchmarks.book_projection_benchmarks --game gates --modes base bonus
+    python -m benchmarks.book_projection_benchmarks --books path/to/books_base.jsonl.zst --event-types winInfo
+
+Books are decompressed once before timing, so only decoding is timed. Each event type (or the group given by
+--event-types) is projected with --keys top-level keys, and the projected books are checked against the fully
+decoded books filtered to the same projection.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from src.config.paths import PATH_TO_GAMES
+from utils.book_analytics import stream_book_lines, project_book_line, filter_book
+
+PROJECTIONS = [["setTotalWin"], ["winInfo"], ["boardMultiplierInfo"]]
+
+
+def run_book_projection_benchmark(books_file: str, projections: list = PROJECTIONS, keys: list = None) -> dict:
+    """Time full and projected decoding of every book in a books file."""
+    lines = list(stream_book_lines(books_file))
+
+    start = time.perf_counter()
+    books = [json.loads(line) for line in lines]
+    json_seconds = time.perf_counter() - start
+
+    metrics = {"books": len(books), "json_seconds": round(json_seconds, 4), "projections": {}}
+    for event_types in projections:
+        start = time.perf_counter()
+        projected = [project_book_line(line, set(event_types), keys) for line in lines]
+        seconds = time.perf_counter() - start
+        metrics["projections"][",".join(event_types)] = {
+            "seconds": round(seconds, 4),
+            "speedup": round(json_seconds / max(seconds, 1e-9), 2),
+            "events": sum(len(book["events"]) for book in projected),
+            "exact": projected == [filter_book(book, set(event_types), keys) for book in books],
+        }
+    return metrics
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--game", default=None, help="game id, benchmarks its published books")
+    parser.add_argument("--modes", nargs="+", default=None, help="bet modes of --game, all published modes if unset")
+    parser.add_argument("--books", nargs="+", default=[], help="explicit .jsonl.zst books files")
+    parser.add_argument("--event-types", nargs="+", default=None, help="one projection of these event types")
+    parser.add_argument("--keys", nargs="*", default=[], help="top-level keys kept besides id, payoutMultiplier and events")
+    parser.add_argument("--output", default=None, help="optional JSON results file")
+    args = parser.parse_args(argv)
+
+    books_files = list(args.books)
+    if args.game is not None:
+        publish_path = os.path.join(PATH_TO_GAMES, args.game, "library", "publish_files")
+        modes = args.modes or sorted(
+            f[len("books_") : -len(".jsonl.zst")] for f in os.listdir(publish_path) if f.endswith(".jsonl.zst")
+        )
+        books_files += [os.path.join(publish_path, f"books_{mode}.jsonl.zst") for mode in modes]
+    projections = PROJECTIONS if args.event_types is None else [args.event_types]
+
+    results = {}
+    for books_file in books_files:
+        metrics = run_book_projection_benchmark(books_file, projections, args.keys)
+        results[books_file] = metrics
+        print(os.path.basename(books_file), f"({metrics['books']} books, json.loads {metrics['json_seconds']} s)")
+        for name, projection in metrics["projections"].items():
+            print(
+                f"  {name:<24} {projection['seconds']:>8} s   {projection['speedup']:>6}x"
+                f"   {projection['events']:>8} events   exact: {projection['exact']}"
+            )
+    if args.output is not None:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(json.dumps(results, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
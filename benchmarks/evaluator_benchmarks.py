@@ -0,0 +1,218 @@
+"""Microbenchmarks of the win evaluators on seeded synthetic boards.
+
+usage:
+    python -m benchmarks.evaluator_benchmarks --boards 200 --wild-density 0.05 --multiplier-density 0.5
+
+Board specs (symbol names and multiplier values) are generated once per size from the seed, so every evaluator,
+and any alternative implementation passed to run_microbenchmarks(), is timed on identical inputs.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+
+from src.calculations.lines import Lines
+from src.calculations.ways import Ways
+from src.calculations.cluster import Cluster
+from src.calculations.scatter import Scatter
+from src.calculations.tumble import Tumble
+from src.wins.multiplier_strategy import apply_mult
+
+BOARD_SIZES = [(5, 3), (5, 4), (5, 5), (6, 5), (6, 6), (7, 7), (8, 8)]
+PAYING_SYMBOLS = ["H1", "H2", "H3", "H4", "L1", "L2", "L3", "L4"]
+MULTIPLIER_VALUES = [2, 3, 5, 10]
+NUM_PAYLINES = 20
+
+
+class SyntheticConfig:
+    """Minimal game configuration for a given board size and win type."""
+
+    def __init__(self, num_reels: int, num_rows: int, win_type: str, seed: int = 0):
+        self.game_id = "synthetic"
+        self.num_reels = num_reels
+        self.num_rows = [num_rows] * num_reels
+        self.include_padding = False
+        self.special_symbols = {"wild": ["W"], "scatter": ["S"]}
+        self.bet_modes = []
+        self.basegame_type = "basegame"
+        self.freegame_type = "freegame"
+
+        num_cells = num_reels * num_rows
+        min_kind = {"lines": 3, "ways": 3, "cluster": 5, "scatter": 8}[win_type]
+        max_kind = num_reels if win_type in ["lines", "ways"] else num_cells
+        self.paytable = {}
+        for idx, symbol in enumerate(PAYING_SYMBOLS + ["W"]):
+            for kind in range(min_kind, max_kind + 1):
+                self.paytable[(kind, symbol)] = round((len(PAYING_SYMBOLS) + 1 - idx) * kind / min_kind, 2)
+
+        rng = random.Random(seed)
+        self.paylines = {idx: [row] * num_reels for idx, row in enumerate(range(num_rows), start=1)}
+        while len(self.paylines) < NUM_PAYLINES:
+            self.paylines[len(self.paylines) + 1] = [rng.randrange(num_rows) for _ in range(num_reels)]
+
+
+class SyntheticGamestate(Tumble):
+    """Gamestate with seeded reelstrips, used to tumble synthetic boards."""
+
+    def __init__(self, config: SyntheticConfig, seed: int = 0):
+        self.config = config
+        self.special_symbol_functions = {}
+        self.create_symbol_map()
+        rng = random.Random(seed)
+        self.reelstrip = [[rng.choice(PAYING_SYMBOLS) for _ in range(100)] for _ in range(config.num_reels)]
+        self.reel_positions = [0] * config.num_reels
+        self.top_symbols = None
+
+    def assign_special_sym_function(self):
+        pass
+
+    def run_spin(self, sim):
+        pass
+
+    def run_freespin(self):
+        pass
+
+
+def generate_board_specs(
+    num_reels: int,
+    num_rows: int,
+    num_boards: int,
+    wild_density: float = 0.05,
+    multiplier_density: float = 0.0,
+    scatter_density: float = 0.02,
+    seed: int = 0,
+) -> list:
+    """Seeded (name, multiplier) specs. Multipliers are only assigned to wilds."""
+    rng = random.Random(seed)
+    specs = []
+    for _ in range(num_boards):
+        board = []
+        for _ in range(num_reels):
+            reel = []
+            for _ in range(num_rows):
+                u = rng.random()
+                if u < wild_density:
+                    name = "W"
+                elif u < wild_density + scatter_density:
+                    name = "S"
+                else:
+                    name = rng.choice(PAYING_SYMBOLS)
+                multiplier = rng.choice(MULTIPLIER_VALUES) if name == "W" and rng.random() < multiplier_density else None
+                reel.append((name, multiplier))
+            board.append(reel)
+        specs.append(board)
+    return specs
+
+
+def build_board(gamestate: SyntheticGamestate, spec: list) -> list:
+    """Create symbol objects from a board spec."""
+    board = []
+    for reel in spec:
+        board.append([])
+        for name, multiplier in reel:
+            symbol = gamestate.create_symbol(name)
+            if multiplier is not None:
+                symbol.assign_attribute({"multiplier": multiplier})
+            board[-1].append(symbol)
+    return board
+
+
+def prepare_tumble(gamestate: SyntheticGamestate, board: list) -> None:
+    """Explode every winning cluster, as a cascade game would before tumbling."""
+    Cluster.get_cluster_data(gamestate.config, board, 1)
+    gamestate.board = board
+    gamestate.reel_positions = [0] * gamestate.config.num_reels
+
+
+def all_positions(board: list) -> list:
+    return [{"reel": reel, "row": row} for reel in range(len(board)) for row in range(len(board[reel]))]
+
+
+# name: (win type used to build the config, optional untimed setup, timed evaluation)
+EVALUATORS = {
+    "get_lines": ("lines", None, lambda gs, board: Lines.get_lines(board, gs.config)),
+    "get_ways_data": ("ways", None, lambda gs, board: Ways.get_ways_data(gs.config, board)),
+    "get_cluster_data": ("cluster", None, lambda gs, board: Cluster.get_cluster_data(gs.config, board, 1)),
+    "get_scatterpay_wins": ("scatter", None, lambda gs, board: Scatter.get_scatterpay_wins(gs.config, board)),
+    "tumble_board": ("cluster", prepare_tumble, lambda gs, board: gs.tumble_board()),
+    "apply_mult": ("lines", None, lambda gs, board: apply_mult(board, "combined", 1.0, 2, all_positions(board))),
+}
+
+
+def run_microbenchmarks(
+    evaluators: dict = None,
+    board_sizes: list = None,
+    num_boards: int = 200,
+    wild_density: float = 0.05,
+    multiplier_density: float = 0.0,
+    scatter_density: float = 0.02,
+    seed: int = 0,
+) -> dict:
+    """Time each evaluator on the same seeded boards, for every board size."""
+    if evaluators is None:
+        evaluators = EVALUATORS
+    if board_sizes is None:
+        board_sizes = BOARD_SIZES
+
+    results = {}
+    for num_reels, num_rows in board_sizes:
+        specs = generate_board_specs(
+            num_reels, num_rows, num_boards, wild_density, multiplier_density, scatter_density, seed
+        )
+        for name, (win_type, setup, evaluate) in evaluators.items():
+            gamestate = SyntheticGamestate(SyntheticConfig(num_reels, num_rows, win_type, seed), seed)
+            elapsed = 0
+            for spec in specs:
+                board = build_board(gamestate, spec)
+                if setup is not None:
+                    setup(gamestate, board)
+                start = time.perf_counter_ns()
+                evaluate(gamestate, board)
+                elapsed += time.perf_counter_ns() - start
+            results.setdefault(name, {})[f"{num_reels}x{num_rows}"] = {
+                "boards": num_boards,
+                "mean_us": round(elapsed / num_boards / 1e3, 3),
+                "ns_per_cell": round(elapsed / num_boards / (num_reels * num_rows), 1),
+            }
+    return results
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evaluators", nargs="+", default=list(EVALUATORS.keys()), choices=list(EVALUATORS.keys()))
+    parser.add_argument("--sizes", nargs="+", default=None, help="board sizes as <reels>x<rows>, e.g. 5x3 8x8")
+    parser.add_argument("--boards", type=int, default=200)
+    parser.add_argument("--wild-density", type=float, default=0.05)
+    parser.add_argument("--multiplier-density", type=float, default=0.0, help="probability a wild has a multiplier")
+    parser.add_argument("--scatter-density", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="optional JSON results file")
+    args = parser.parse_args(argv)
+
+    board_sizes = None
+    if args.sizes is not None:
+        board_sizes = [tuple(int(x) for x in size.split("x")) for size in args.sizes]
+    results = run_microbenchmarks(
+        {name: EVALUATORS[name] for name in args.evaluators},
+        board_sizes,
+        args.boards,
+        args.wild_density,
+        args.multiplier_density,
+        args.scatter_density,
+        args.seed,
+    )
+
+    for name, sizes in results.items():
+        print(name)
+        for size, metrics in sizes.items():
+            print(f"  {size:>5}: {metrics['mean_us']:>10} us/board {metrics['ns_per_cell']:>10} ns/cell")
+    if args.output is not None:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(json.dumps(results, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Fixed-size simulation benchmarks for the sample games, with regression checks against a saved baseline.
+
+usage:
+    python -m benchmarks.run_benchmarks --output benchmarks/results/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/results/baseline.json
+
+Each game mode is simulated in a fresh subprocess (books are seeded by simulation number, so the workload is
+identical between runs) and written to a temporary library, leaving games/<game>/library untouched.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+from src.config.paths import PROJECT_PATH
+
+SAMPLE_GAMES = ["0_0_lines", "0_0_ways", "0_0_cluster", "0_0_scatter", "0_0_expwilds"]
+
+# metric: (direction, relative tolerance). 'higher' metrics regress when they drop, 'lower' when they grow.
+DEFAULT_THRESHOLDS = {
+    "sims_per_second": ("higher", 0.10),
+    "merge_seconds": ("lower", 0.25),
+    "peak_rss_mb": ("lower", 0.20),
+    "bytes_written": ("lower", 0.05),
+}
+
+
+def run_in_subprocess(*args) -> object:
+    """Run benchmark_game with the given arguments and return its JSON output."""
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.benchmark_game", *[str(a) for a in args]],
+        cwd=PROJECT_PATH,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark {args} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def get_best_run(runs: list) -> dict:
+    """Keep the best value of each thresholded metric over repeated runs, to reduce timing noise."""
+    best = dict(runs[0])
+    for metric, (direction, _) in DEFAULT_THRESHOLDS.items():
+        values = [run[metric] for run in runs if run.get(metric) is not None]
+        if values:
+            best[metric] = max(values) if direction == "higher" else min(values)
+    return best
+
+
+def run_benchmarks(games: list, num_sims: int, threads: int, batch_size: int, repeats: int = 1) -> dict:
+    """Benchmark every bet mode of each game."""
+    results = {}
+    for game in games:
+        for mode in run_in_subprocess(game):
+            print(f"Benchmarking {game} {mode}...", flush=True)
+            runs = []
+            for _ in range(repeats):
+                library_path = tempfile.mkdtemp(prefix=f"benchmark_{game}_{mode}_")
+                try:
+                    runs.append(run_in_subprocess(game, mode, num_sims, threads, batch_size, library_path))
+                finally:
+                    shutil.rmtree(library_path, ignore_errors=True)
+            results[f"{game}/{mode}"] = get_best_run(runs)
+            print(f"  {results[f'{game}/{mode}']}", flush=True)
+    return results
+
+
+def compare_to_baseline(results: dict, baseline: dict, thresholds: dict = None) -> list:
+    """Return a description of every metric which regressed beyond its threshold."""
+    if thresholds is None:
+        thresholds = DEFAULT_THRESHOLDS
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        for metric, (direction, tolerance) in thresholds.items():
+            current, previous = metrics.get(metric), baseline[name].get(metric)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            if (direction == "higher" and change < -tolerance) or (direction == "lower" and change > tolerance):
+                regressions.append(
+                    f"{name} {metric}: {previous} -> {current} ({round(100 * change, 1)}%, threshold {round(100 * tolerance, 1)}%)"
+                )
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", nargs="+", default=SAMPLE_GAMES)
+    parser.add_argument("--sims", type=int, default=1000, help="simulations per bet mode")
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=250)
+    parser.add_argument("--repeats", type=int, default=1, help="keep the best of several runs per mode")
+    parser.add_argument("--output", default=None, help="results file, defaults to benchmarks/results/<timestamp>.json")
+    parser.add_argument("--baseline", default=None, help="fail if any metric regresses against this results file")
+    parser.add_argument("--tolerance", type=float, default=None, help="override the relative tolerance of all metrics")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(
+        PROJECT_PATH, "benchmarks", "results", f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    results = {
+        "settings": {"sims": args.sims, "threads": args.threads, "batch": args.batch},
+        "results": run_benchmarks(args.games, args.sims, args.threads, args.batch, args.repeats),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="UTF-8") as f:
+        f.write(json.dumps(results, indent=4))
+    print("Results written to", output)
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline, "r", encoding="UTF-8") as f:
+        baseline = json.load(f)
+    if baseline["settings"] != results["settings"]:
+        print("Warning: baseline was recorded with different settings", baseline["settings"])
+
+    thresholds = DEFAULT_THRESHOLDS
+    if args.tolerance is not None:
+        thresholds = {metric: (direction, args.tolerance) for metric, (direction, _) in thresholds.items()}
+    regressions = compare_to_baseline(results["results"], baseline["results"], thresholds)
+    for regression in regressions:
+        print("REGRESSION:", regression)
+    if not regressions:
+        print("No regressions against", args.baseline)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,10 +6,17 @@ Provides histograms and detailed breakdowns for base game and free game mechanic
 
 import json
 import os
+import sys
 import statistics
 from collections import defaultdict, Counter
 from typing import Dict, List, Any, Tuple
 
+# Add the root directory to the path to access utils modules
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, root_dir)
+
+from utils.book_analytics import BookReducer, register_reducer, reduce_books, reduce_book_iterable
+
 
 def load_books_data(books_path: str) -> List[Dict]:
     """Load books data from JSON file."""
@@ -146,57 +153,56 @@ def create_text_histograms(data: Dict):
             mult_sum_ranges[range_key] += 1
         print_histogram("MULTIPLIER SUMS: Total per Free Spin Distribution (Grouped by 5s)", mult_sum_ranges)
 
-def analyze_all_books(books_data: List[Dict], game_mode: str) -> Dict:
-    """
-    Analyze all books for tumbles and multipliers.
-    Returns comprehensive analysis data.
-    """
-
-    # Separate base game and free game books
-    base_books = []
-    free_books = []
-
-    for book in books_data:
+@register_reducer
+class TumbleMultiplierReducer(BookReducer):
+    """Tumble, multiplier and retrigger statistics of base game and free game books."""
+
+    name = "tumbles_and_multipliers"
+    event_types = ["reveal", "tumbleBoard", "winInfo", "setTotalWin", "freeSpinRetrigger", "boardMultiplierInfo"]
+    keys = ["criteria"]
+
+    def initial(self) -> Dict:
+        return {
+            'total_books': 0,
+            'base_books': 0,
+            'free_books': 0,
+
+            # Base game tumble data (per spin)
+            'base_tumbles_per_spin': [],
+            'base_total_wins': [],
+
+            # Free game tumble data (per individual free spin)
+            'free_tumbles_per_individual_spin': [],
+            'free_tumbles_per_bonus': [],  # Total tumbles for entire bonus round
+
+            # Multiplier data (free game only)
+            'multiplier_values': [],  # Individual M symbol values (used multipliers only)
+            'multiplier_values_landed': [],  # All M symbols that land (whether used or not)
+            'multiplier_sums_per_spin': [],  # Sum of multipliers per free spin (when present)
+            'multiplier_win_impact': [],  # Multiplier factor applied to wins
+            'spins_with_landed_mult': 0,
+            'retrigger_counts': [],  # Number of retriggers per bonus
+            'retrigger_amounts': [],  # Amount of free spins awarded per retrigger
+
+            # Detailed breakdowns
+            'base_tumble_breakdown': Counter(),
+            'free_tumble_breakdown': Counter(),
+            'multiplier_value_breakdown': Counter(),
+            'multiplier_landed_breakdown': Counter(),
+        }
+
+    def map(self, analysis_data: Dict, book: Dict) -> Dict:
+        analysis_data['total_books'] += 1
         criteria = book.get('criteria', '')
         if criteria in ['0', 'basegame']:
-            base_books.append(book)
+            analysis_data['base_books'] += 1
+            self.map_base_book(analysis_data, book)
         elif criteria == 'freegame':
-            free_books.append(book)
-
-    analysis_data = {
-        'total_books': len(books_data),
-        'base_books': len(base_books),
-        'free_books': len(free_books),
-        'game_mode': game_mode,
-
-        # Base game tumble data (per spin)
-        'base_tumbles_per_spin': [],
-        'base_total_wins': [],
-
-        # Free game tumble data (per individual free spin)
-        'free_tumbles_per_individual_spin': [],
-        'free_tumbles_per_bonus': [],  # Total tumbles for entire bonus round
-
-        # Multiplier data (free game only)
-        'multiplier_values': [],  # Individual M symbol values (used multipliers only)
-        'multiplier_values_landed': [],  # All M symbols that land (whether used or not)
-        'multiplier_sums_per_spin': [],  # Sum of multipliers per free spin (when present)
-        'multiplier_frequency': 0,  # % of free spins with multipliers used
-        'multiplier_land_frequency': 0,  # % of free spins with multipliers landed
-        'multiplier_win_impact': [],  # Multiplier factor applied to wins
-        'spins_with_landed_mult': 0,
-        'retrigger_counts': [],  # Number of retriggers per bonus
-        'retrigger_amounts': [],  # Amount of free spins awarded per retrigger
-
-        # Detailed breakdowns
-        'base_tumble_breakdown': Counter(),
-        'free_tumble_breakdown': Counter(),
-        'multiplier_value_breakdown': Counter(),
-        'multiplier_landed_breakdown': Counter(),
-    }
+            analysis_data['free_books'] += 1
+            self.map_free_book(analysis_data, book)
+        return analysis_data
 
-    # Analyze base game books
-    for book in base_books:
+    def map_base_book(self, analysis_data: Dict, book: Dict) -> None:
         events = book.get('events', [])
         tumble_analysis = analyze_tumbles_in_spin(events)
 
@@ -204,9 +210,8 @@ def analyze_all_books(books_data: List[Dict], game_mode: str) -> Dict:
         analysis_data['base_total_wins'].append(tumble_analysis['total_win'])
         analysis_data['base_tumble_breakdown'][tumble_analysis['tumble_count']] += 1
 
-    # Analyze free game books
-    # Note: Each free game "book" contains multiple individual free spins
-    for book in free_books:
+    def map_free_book(self, analysis_data: Dict, book: Dict) -> None:
+        # Note: Each free game "book" contains multiple individual free spins
         events = book.get('events', [])
 
         # Count total tumbles for entire bonus
@@ -335,19 +340,42 @@ def analyze_all_books(books_data: List[Dict], game_mode: str) -> Dict:
         for value in bonus_multiplier_values_landed:
             analysis_data['multiplier_landed_breakdown'][value] += 1
 
-    # Calculate multiplier frequencies
-    total_free_spins = len(analysis_data['free_tumbles_per_individual_spin'])
-    total_bonuses = len(analysis_data['free_tumbles_per_bonus'])
+    def finalize(self, analysis_data: Dict) -> Dict:
+        analysis_data['multiplier_frequency'] = 0  # % of free spins with multipliers used
+        analysis_data['multiplier_land_frequency'] = 0  # % of free spins with multipliers landed
+
+        # Calculate multiplier frequencies
+        total_free_spins = len(analysis_data['free_tumbles_per_individual_spin'])
+        total_bonuses = len(analysis_data['free_tumbles_per_bonus'])
+
+        if total_free_spins > 0:
+            analysis_data['multiplier_frequency'] = (len(analysis_data['multiplier_sums_per_spin']) / total_free_spins) * 100
+            analysis_data['multiplier_land_frequency'] = (analysis_data['spins_with_landed_mult'] / total_free_spins) * 100
+
+        # Calculate multipliers per bonus and per free spin
+        if len(analysis_data['multiplier_values_landed']) > 0:
+            analysis_data['avg_multipliers_per_bonus'] = len(analysis_data['multiplier_values_landed']) / total_bonuses if total_bonuses > 0 else 0
+            analysis_data['avg_multipliers_per_freespin'] = len(analysis_data['multiplier_values_landed']) / total_free_spins if total_free_spins > 0 else 0
 
-    if total_free_spins > 0:
-        analysis_data['multiplier_frequency'] = (len(analysis_data['multiplier_sums_per_spin']) / total_free_spins) * 100
-        analysis_data['multiplier_land_frequency'] = (analysis_data['spins_with_landed_mult'] / total_free_spins) * 100
+        return analysis_data
 
-    # Calculate multipliers per bonus and per free spin
-    if len(analysis_data['multiplier_values_landed']) > 0:
-        analysis_data['avg_multipliers_per_bonus'] = len(analysis_data['multiplier_values_landed']) / total_bonuses if total_bonuses > 0 else 0
-        analysis_data['avg_multipliers_per_freespin'] = len(analysis_data['multiplier_values_landed']) / total_free_spins if total_free_spins > 0 else 0
 
+def analyze_all_books(books_data: List[Dict], game_mode: str) -> Dict:
+    """
+    Analyze already loaded books for tumbles and multipliers.
+    Returns comprehensive analysis data.
+    """
+    analysis_data = reduce_book_iterable(books_data, [TumbleMultiplierReducer()])[TumbleMultiplierReducer.name]
+    analysis_data['game_mode'] = game_mode
+    return analysis_data
+
+
+def analyze_books_file(books_path: str, game_mode: str, processes: int = None) -> Dict:
+    """
+    Stream a books file through the tumble and multiplier reducer in parallel processes.
+    """
+    analysis_data = reduce_books(books_path, [TumbleMultiplierReducer()], processes)[TumbleMultiplierReducer.name]
+    analysis_data['game_mode'] = game_mode
     return analysis_data
 
 def print_detailed_analysis(data: Dict):
@@ -465,34 +493,21 @@ def print_detailed_analysis(data: Dict):
 def main():
     """Main analysis function."""
 
-    base_path = "C:\\Users\\jonah\\math-sdk-1\\games\\brainrot_bonanza\\library\\books"
-    output_dir = "C:\\Users\\jonah\\math-sdk-1\\games\\brainrot_bonanza\\analysis_output"
-
-    # Analyze base mode
-    base_books_path = os.path.join(base_path, "books_base.json")
-    if os.path.exists(base_books_path):
-        print("Loading base game books...")
-        base_books = load_books_data(base_books_path)
-        base_analysis = analyze_all_books(base_books, "BASE")
-        print_detailed_analysis(base_analysis)
-
-        print(f"\nCreating histograms for BASE mode...")
-        create_text_histograms(base_analysis)
+    base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "library", "publish_files")
 
-    # Analyze bonus mode
-    bonus_books_path = os.path.join(base_path, "books_bonus.json")
-    if os.path.exists(bonus_books_path):
-        print(f"\n{'='*80}")
-        print("Loading bonus game books...")
-        bonus_books = load_books_data(bonus_books_path)
-        bonus_analysis = analyze_all_books(bonus_books, "BONUS")
-        print_detailed_analysis(bonus_analysis)
+    for mode in ["base", "bonus"]:
+        books_path = os.path.join(base_path, f"books_{mode}.jsonl.zst")
+        if os.path.exists(books_path):
+            print(f"\n{'='*80}")
+            print(f"Streaming {mode} game books...")
+            analysis = analyze_books_file(books_path, mode.upper())
+            print_detailed_analysis(analysis)
 
-        print(f"\nCreating histograms for BONUS mode...")
-        create_text_histograms(bonus_analysis)
+            print(f"\nCreating histograms for {mode.upper()} mode...")
+            create_text_histograms(analysis)
 
     print(f"\n{'='*80}")
-    print(f"Analysis complete! Histograms saved to: {output_dir}")
+    print(f"Analysis complete!")
     print(f"{'='*80}")
 
 if __name__ == "__main__":
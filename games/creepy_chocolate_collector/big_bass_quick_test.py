@@ -5,45 +5,51 @@ Simple Big Bass level progression analysis - reads actual events only
 import json
 import zstandard as zstd
 import os
+import sys
 from collections import Counter
 
+# Add the root directory to the path to access utils modules
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, root_dir)
+
+from utils.book_analytics import BookReducer, register_reducer, reduce_books, reduce_book_iterable
+
 def load_books(file_path):
     with open(file_path, 'rb') as f:
         dctx = zstd.ZstdDecompressor()
-        with dctx.stream_reader(f) as reader:
+        with dctx.stream_reader(f, read_across_frames=True) as reader:
             decompressed = reader.read()
             lines = decompressed.decode('utf-8').strip().split('\n')
             return [json.loads(line) for line in lines if line.strip()]
 
-def analyze_big_bass_events(books):
-    """Analyze Big Bass mechanics from actual game events"""
-    
-    stats = {
-        'total_bonuses': 0,
-        'level_distributions': {1: 0, 2: 0, 3: 0, 4: 0},
-        'collection_events': [],
-        'level_advance_events': [],
-        'total_collected': 0,
-        'collections_by_level': Counter(),
-        'values_by_level': {1: [], 2: [], 3: [], 4: []},
-    }
-    
-    for book in books:
+@register_reducer
+class LevelProgressionReducer(BookReducer):
+    """Maximum level reached, level advances and collections of each bonus"""
+
+    name = "level_progression"
+
+    def initial(self):
+        return {
+            'total_bonuses': 0,
+            'level_distributions': {1: 0, 2: 0, 3: 0, 4: 0},
+            'collection_events': [],
+            'level_advance_events': [],
+            'total_collected': 0,
+            'collections_by_level': Counter(),
+            'values_by_level': {1: [], 2: [], 3: [], 4: []},
+        }
+
+    def map(self, stats, book):
         if not book.get('events'):
-            continue
-            
+            return stats
+
         stats['total_bonuses'] += 1
-        
-        # Print progress every 5k books
-        if stats['total_bonuses'] % 5000 == 0:
-            print(f"  Processed {stats['total_bonuses']:,} bonuses...")
-        
         max_level_reached = 1
-        
+
         # Process each event in the bonus
         for event in book['events']:
             event_type = event.get('type')
-            
+
             if event_type == 'level_advance':
                 new_level = event.get('new_level', 1)
                 max_level_reached = max(max_level_reached, new_level)
@@ -52,39 +58,37 @@ def analyze_big_bass_events(books):
                     'spin': event.get('spin'),
                     'new_level': new_level
                 })
-                
+
             elif event_type == 'collection':
                 level = event.get('level', 1)
                 collected_amount = event.get('collected_amount', 0)
-                cw_count = event.get('cw_count', 0)
-                cc_count = event.get('cc_count', 0)
-                cc_sum = event.get('cc_sum', 0)
-                
+
                 stats['collection_events'].append({
                     'bonus_id': book.get('id'),
                     'spin': event.get('spin'),
                     'level': level,
-                    'cw_count': cw_count,
-                    'cc_count': cc_count,
-                    'cc_sum': cc_sum,
+                    'cw_count': event.get('cw_count', 0),
+                    'cc_count': event.get('cc_count', 0),
+                    'cc_sum': event.get('cc_sum', 0),
                     'collected_amount': collected_amount
                 })
-                
+
                 stats['total_collected'] += collected_amount
                 stats['collections_by_level'][level] += 1
                 stats['values_by_level'][level].append(collected_amount)
-        
+
         # Record the maximum level reached in this bonus
         stats['level_distributions'][max_level_reached] += 1
-    
-    return stats
+        return stats
+
+
+def analyze_big_bass_events(books):
+    """Analyze Big Bass mechanics from actual game events"""
+    return reduce_book_iterable(books, [LevelProgressionReducer()])[LevelProgressionReducer.name]
 
 def main():
     books_path = os.path.join("library", "publish_files", "books_bonus.jsonl.zst")
-    books = load_books(books_path)
-    print(f"Loaded {len(books):,} bonus rounds")
-    
-    stats = analyze_big_bass_events(books)
+    stats = reduce_books(books_path, [LevelProgressionReducer()])[LevelProgressionReducer.name]
     
     print(f"\nBIG-BASS LEVEL PROGRESSION SUMMARY:")
     print(f"  Total bonuses analyzed: {stats['total_bonuses']:,}")
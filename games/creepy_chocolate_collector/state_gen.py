@@ -6,72 +6,74 @@ No fallbacks, no mock data, only real collection events
 import json
 import zstandard as zstd
 import os
+import sys
 from collections import defaultdict, Counter
 
+# Add the root directory to the path to access utils modules
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, root_dir)
+
+from utils.book_analytics import BookReducer, register_reducer, reduce_books, reduce_book_iterable
+
 def load_books(file_path):
     """Load compressed game books"""
     with open(file_path, 'rb') as f:
         dctx = zstd.ZstdDecompressor()
-        with dctx.stream_reader(f) as reader:
+        with dctx.stream_reader(f, read_across_frames=True) as reader:
             decompressed = reader.read()
             lines = decompressed.decode('utf-8').strip().split('\n')
             return [json.loads(line) for line in lines if line.strip()]
 
-def analyze_collections(books):
-    """Analyze only actual collection events - no guessing"""
-    
-    # Raw counters
-    total_bonuses = len(books)
-    total_spins = 0
-    total_cw_symbols = 0
-    total_cc_symbols = 0
-    
-    # Collection data - only from real collection events
-    collection_events = []
-    collections_per_bonus = []
-    
-    # Board analysis
-    cw_per_bonus = []
-    cc_per_bonus = []
-    
-    for book in books:
+@register_reducer
+class CollectionReducer(BookReducer):
+    """Symbol counts and collection events per bonus"""
+
+    name = "collections"
+
+    def initial(self):
+        return {
+            # Raw counters
+            'total_bonuses': 0,
+            'total_spins': 0,
+            'total_cw_symbols': 0,
+            'total_cc_symbols': 0,
+            # Collection data - only from real collection events
+            'collection_events': [],
+            'collections_per_bonus': [],
+            # Board analysis
+            'cw_per_bonus': [],
+            'cc_per_bonus': [],
+        }
+
+    def map(self, data, book):
+        data['total_bonuses'] += 1
         if not book.get('events'):
-            continue
-            
+            return data
+
         # Count spins and symbols for this bonus
-        bonus_spins = 0
         bonus_cws = 0
         bonus_ccs = 0
         bonus_collections = 0
-        
+
         # Process all events for this bonus
         for event in book['events']:
             event_type = event.get('type')
-            
+
             if event_type == 'reveal':
-                bonus_spins += 1
-                total_spins += 1
-                
+                data['total_spins'] += 1
+
                 # Count symbols on this spin
-                board = event.get('board', [])
-                spin_cws = 0
-                spin_ccs = 0
-                
-                for row in board:
+                for row in event.get('board', []):
                     for cell in row:
                         if cell.get('name') == 'CW':
-                            spin_cws += 1
-                            total_cw_symbols += 1
                             bonus_cws += 1
                         elif cell.get('name') == 'CC':
-                            spin_ccs += 1  
-                            total_cc_symbols += 1
                             bonus_ccs += 1
-            
+
             elif event_type == 'collection':
                 # Real collection event - use exactly as logged
                 bonus_collections += 1
-                collection_events.append({
+                data['collection_events'].append({
                     'book_id': book.get('id'),
                     'cw_count': event.get('cw_count', 0),
                     'cc_count': event.get('cc_count', 0),
@@ -79,22 +81,20 @@ def analyze_collections(books):
                     'level': event.get('level', 1),
                     'collected_amount': event.get('collected_amount', 0)
                 })
-        
+
+        data['total_cw_symbols'] += bonus_cws
+        data['total_cc_symbols'] += bonus_ccs
+
         # Store per-bonus stats
-        collections_per_bonus.append(bonus_collections)
-        cw_per_bonus.append(bonus_cws)
-        cc_per_bonus.append(bonus_ccs)
-    
-    return {
-        'total_bonuses': total_bonuses,
-        'total_spins': total_spins,
-        'total_cw_symbols': total_cw_symbols,
-        'total_cc_symbols': total_cc_symbols,
-        'collection_events': collection_events,
-        'collections_per_bonus': collections_per_bonus,
-        'cw_per_bonus': cw_per_bonus,
-        'cc_per_bonus': cc_per_bonus
-    }
+        data['collections_per_bonus'].append(bonus_collections)
+        data['cw_per_bonus'].append(bonus_cws)
+        data['cc_per_bonus'].append(bonus_ccs)
+        return data
+
+
+def analyze_collections(books):
+    """Analyze only actual collection events - no guessing"""
+    return reduce_book_iterable(books, [CollectionReducer()])[CollectionReducer.name]
 
 def print_analysis(data):
     """Print analysis results"""
@@ -172,12 +172,9 @@ def main():
         print(f"Error: {books_path} not found")
         return
     
-    print("Loading bonus books...")
-    books = load_books(books_path)
-    print(f"Loaded {len(books)} bonus rounds")
-    
-    print("\nAnalyzing collections...")
-    data = analyze_collections(books)
+    print("Streaming bonus books...")
+    data = reduce_books(books_path, [CollectionReducer()])[CollectionReducer.name]
+    print(f"Analyzed {data['total_bonuses']} bonus rounds")
     
     print_analysis(data)
 
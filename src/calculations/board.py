@@ -3,8 +3,8 @@
 import random
 from typing import List
 from src.state.state import GeneralGameState
-from src.calculations.statistics import get_random_outcome
 from src.events.events import reveal_event
+from src.state.phase_timers import timed_phase
 
 
 class Board(GeneralGameState):
@@ -16,9 +16,7 @@ class Board(GeneralGameState):
             top_symbols = []
             bottom_symbols = []
         self.refresh_special_syms()
-        self.reelstrip_id = get_random_outcome(
-            self.get_current_distribution_conditions()["reel_weights"][self.gametype]
-        )
+        self.reelstrip_id = self.get_criteria_context().sample("reel_weights", self.gametype)
         self.reelstrip = self.config.reels[self.reelstrip_id]
         anticipation = [0] * self.config.num_reels
         board = [[]] * self.config.num_reels
@@ -192,6 +190,7 @@ class Board(GeneralGameState):
             board_str.append([x.name for x in board[reel]])
         return board_str
 
+    @timed_phase("draw_board")
     def draw_board(self, emit_event: bool = True, trigger_symbol: str = "scatter") -> None:
         """Instead of retrying to draw a board, force the initial revel to have a
         specific number of scatters, if the betmode criteria specifies this."""
@@ -199,7 +198,7 @@ class Board(GeneralGameState):
             self.get_current_distribution_conditions()["force_freegame"]
             and self.gametype == self.config.basegame_type
         ):
-            num_scatters = get_random_outcome(self.get_current_distribution_conditions()["scatter_triggers"])
+            num_scatters = self.get_criteria_context().sample("scatter_triggers")
             self.force_special_board(trigger_symbol, num_scatters)
         elif (
             not (self.get_current_distribution_conditions()["force_freegame"])
@@ -246,9 +245,7 @@ class Board(GeneralGameState):
         """
         Helper function for forcing special (or name specific) symbols
         """
-        reelstrip_id = get_random_outcome(
-            self.get_current_distribution_conditions()["reel_weights"][self.gametype]
-        )
+        reelstrip_id = self.get_criteria_context().sample("reel_weights", self.gametype)
         reelstops = self.get_syms_on_reel(reelstrip_id, force_criteria)
 
         sym_prob = []
@@ -3,6 +3,7 @@
 from src.calculations.symbol import Symbol
 from src.config.config import Config
 from src.wins.multiplier_strategy import apply_mult
+from src.state.phase_timers import timed_phase
 from src.events.events import (
     win_info_event,
     set_win_event,
@@ -25,6 +26,7 @@ class Lines:
         }
 
     @staticmethod
+    @timed_phase("win_evaluation")
     def get_lines(
         board: list[list[Symbol]],
         config: Config,
@@ -4,6 +4,7 @@ from typing import List, Dict
 from collections import defaultdict
 from src.calculations.symbol import Symbol
 from src.config.config import Config
+from src.state.phase_timers import timed_phase
 
 
 class Scatter:
@@ -32,6 +33,7 @@ class Scatter:
         return (reel_to_overlay, row_to_overlay)
 
     @staticmethod
+    @timed_phase("win_evaluation")
     def get_scatterpay_wins(
         config: Config,
         board: list[list[Symbol]],
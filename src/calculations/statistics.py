@@ -1,4 +1,5 @@
 import random
+from bisect import bisect_left
 from typing import Union
 
 
@@ -17,6 +18,41 @@ def get_random_outcome(distribution: dict, totalWeight: float = None) -> Union[f
     return Exception("error drawing item from distribution")
 
 
+class WeightedSampler:
+    """Inverse-CDF sampler for a fixed {value: weight} distribution.
+
+    Cumulative weights are computed once and each draw is a bisection. Draws consume the same random number
+    as get_random_outcome() and return the same value, so replacing one with the other does not change books.
+    """
+
+    def __init__(self, distribution: dict):
+        assert isinstance(distribution, dict), "distribution must be of type: dict "
+        self.distribution = distribution
+        self.items = list(distribution.items())
+        self.values = list(distribution.keys())
+        self.total = sum(distribution.values())
+        self.cumulative = []
+        cumulative = 0.0
+        for weight in distribution.values():
+            cumulative += weight
+            self.cumulative.append(cumulative)
+        # Bisection needs non-decreasing cumulative weights, negative weights use the linear search
+        self.non_negative = all(weight >= 0 for weight in distribution.values())
+
+    def matches(self, distribution: dict) -> bool:
+        """True if the sampler was built from this dictionary and its weights have not changed since."""
+        return distribution is self.distribution and list(distribution.items()) == self.items
+
+    def sample(self) -> Union[float, int]:
+        """Draw a value from the distribution."""
+        if not self.non_negative:
+            return get_random_outcome(self.distribution, self.total)
+        idx = bisect_left(self.cumulative, random.uniform(0, self.total))
+        if idx < len(self.values):
+            return self.values[idx]
+        return Exception("error drawing item from distribution")
+
+
 def get_mean_std_median(dist: dict) -> tuple[float, float, float]:
     """Returns mean and standard deviation from an ordered win-distribution."""
     total = 0
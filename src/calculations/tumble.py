@@ -1,11 +1,13 @@
 from copy import copy
 from src.events.events import set_win_event, set_total_event
 from src.calculations.board import Board
+from src.state.phase_timers import timed_phase
 
 
 class Tumble(Board):
     """General class for cascading/tumble game actions."""
 
+    @timed_phase("tumble_board")
     def tumble_board(self) -> None:
         """Remove winning symbols from the active gameboard."""
         self.board_before_tumble = copy(self.board)
@@ -2,6 +2,8 @@
 
 from src.config.betmode import BetMode
 from src.config.paths import PATH_TO_GAMES
+from src.config.reel_cache import get_csv_digest, read_reel_cache, write_reel_cache
+from bisect import bisect_right
 import os
 
 
@@ -18,6 +20,8 @@ class Config:
         self.provider_number = 1
         self.game_name = "sample_lines"
         self.output_regular_json = True  # if True, outputs .json if compression = False. If False, outputs .jsonl
+        self.book_frame_size = None  # books per zstd frame of compressed books, with a books_<mode>.index sidecar
+        self.book_dictionary_size = None  # bytes of a zstd dictionary trained per mode for compressed books
         if self.game_id != "0_0_sample":
             self.construct_paths()
 
@@ -47,8 +51,10 @@ class Config:
         self.reel_location = ""
         self.reels = {}
         self.padding_reels = {}  # symbol configuration displayed before the board reveal
+        self.reel_cache = True  # store parsed reelstrips in reels/__reelcache__, rebuilt when a CSV changes
 
         self.write_event_list = True
+        self.retry_budget = None  # maximum rejected attempts per simulation, can be overridden per distribution
 
         self.bet_modes = []
         self.opt_params = {None: None}
@@ -80,8 +86,33 @@ class Config:
                 10: (self.wincap, float("inf")),
             },
         }
+        self.win_level_tables = {}
+
+    def get_win_level_table(self, winlevel_key: str) -> tuple:
+        """Sorted (lower bounds, upper bounds, levels) for contiguous win-levels, None if they are not contiguous."""
+        levels = self.win_levels[winlevel_key]
+        cached = self.win_level_tables.get(winlevel_key)
+        if cached is not None and cached[0] is levels:
+            return cached[1]
+        pairs = list(levels.items())
+        table = (
+            [pair[0] for _, pair in pairs],
+            [pair[1] for _, pair in pairs],
+            [idx for idx, _ in pairs],
+        )
+        is_contiguous = all(lower < upper for lower, upper in zip(table[0], table[1])) and all(
+            table[1][i] == table[0][i + 1] for i in range(len(pairs) - 1)
+        )
+        self.win_level_tables[winlevel_key] = (levels, table if is_contiguous else None)
+        return self.win_level_tables[winlevel_key][1]
 
     def get_win_level(self, win_amount: float, winlevel_key: str) -> int:
+        table = self.get_win_level_table(winlevel_key)
+        if table is not None:
+            idx = bisect_right(table[0], win_amount) - 1
+            if idx >= 0 and win_amount < table[1][idx]:
+                return table[2][idx]
+            return RuntimeError(f"winLevel not found: {win_amount}")
         levels = self.win_levels[winlevel_key]
         for idx, pair in levels.items():
             if win_amount >= pair[0] and win_amount < pair[1]:
@@ -120,7 +151,18 @@ class Config:
             )
 
     def read_reels_csv(self, file_path):
-        """Read csv from reelstrip path."""
+        """Read csv from reelstrip path, using the binary reel cache when it matches the CSV contents."""
+        if not self.reel_cache:
+            return self.parse_reels_csv(file_path)
+        digest = get_csv_digest(file_path)
+        reelstrips = read_reel_cache(file_path, digest)
+        if reelstrips is None:
+            reelstrips = self.parse_reels_csv(file_path)
+            write_reel_cache(file_path, reelstrips, digest)
+        return reelstrips
+
+    def parse_reels_csv(self, file_path):
+        """Parse reelstrips from a csv file."""
         reelstrips = []
         count = 0
         with open(os.path.abspath(file_path), "r", encoding="UTF-8") as file:
@@ -17,6 +17,7 @@ class Distribution:
             "reel_weights",
         ],
         default_distribution_conditions: dict = {"force_wincap": False, "force_freegame": False},
+        retry_budget: Union[int, None] = None,
     ):
 
         assert quota > 0, "non-zero quota value must be assigned"
@@ -26,6 +27,7 @@ class Distribution:
         self._required_distribution_conditions = required_distribution_conditions
         self._default_distribution_conditions = default_distribution_conditions
         self._win_criteria = win_criteria
+        self._retry_budget = retry_budget
         self.verify_and_set_conditions(conditions)
 
     def verify_and_set_conditions(self, conditions):
@@ -52,6 +54,10 @@ class Distribution:
         """Return criteria for simulation to pass."""
         return self._win_criteria
 
+    def get_retry_budget(self):
+        """Return the maximum number of rejected attempts per simulation, if set."""
+        return self._retry_budget
+
     def get_required_distribution_conditions(self):
         """Return what win conditions must be specified."""
         return self._required_distribution_conditions
@@ -22,7 +22,9 @@ class OutputFiles:
 
     def setup_output_directories(self):
         """Entrypoint for saving all output files."""
-        self.library_path = os.path.join(PATH_TO_GAMES, str(self.game_config.game_id), "library")
+        self.library_path = getattr(
+            self.game_config, "library_path", os.path.join(PATH_TO_GAMES, str(self.game_config.game_id), "library")
+        )
         self.temp_path = os.path.join(self.library_path, "temp_multi_threaded_files")
         self.config_path = os.path.join(self.library_path, "configs")
         self.force_path = os.path.join(self.library_path, "forces")
@@ -34,6 +36,7 @@ class OutputFiles:
         self.compressed_path = self.publish_path  # Required RGS files
         self.final_lookup_path = self.publish_path  # Required RGS files
         self.optimization_result_path = os.path.join(self.optimization_path, "trial_results")
+        self.stats_path = os.path.join(self.library_path, "simulation_stats")
 
         all_paths = [
             "library_path",
@@ -46,6 +49,7 @@ class OutputFiles:
             "optimization_path",
             "optimization_result_path",
             "publish_path",
+            "stats_path",
         ]
         for p in all_paths:
             self.check_folder_exists(getattr(self, p))
@@ -119,6 +123,10 @@ class OutputFiles:
                 },
             }
 
+    def get_temp_profile_name(self, betmode: str, thread_index: int, repeat_count: int):
+        """Naming convention for temp worker profiles."""
+        return os.path.join(self.temp_path, f"profile_{betmode}_{thread_index}_{repeat_count}.prof")
+
     def get_temp_multi_thread_name(self, betmode: str, thread_index: int, repeat_count: int, compress: bool):
         """Naming convention for temp book files."""
         if compress:
@@ -144,6 +152,10 @@ class OutputFiles:
         """Naming convention for temp force files."""
         return os.path.join(self.temp_path, f"force_{betmode}_{thread_index}_{repeat_count}.json")
 
+    def get_temp_rejection_name(self, betmode: str, thread_index: int, repeat_count: int):
+        """Naming convention for temp rejection statistics."""
+        return os.path.join(self.temp_path, f"rejections_{betmode}_{thread_index}_{repeat_count}.json")
+
     def get_final_book_name(self, betmode: str, compress: bool):
         """Returns final simulation books output name."""
         if compress:
@@ -156,6 +168,14 @@ class OutputFiles:
             raise RuntimeError("Logic error in name generation.")
         return os.path.join(self.compressed_path if compress else self.book_path, filename)
 
+    def get_book_index_name(self, betmode: str):
+        """Per-book frame index of compressed books written with config.book_frame_size."""
+        return os.path.join(self.book_path, f"books_{betmode}.index")
+
+    def get_book_dictionary_name(self, betmode: str):
+        """Trained zstd dictionary of compressed books written with config.book_dictionary_size."""
+        return os.path.join(self.compressed_path, f"books_{betmode}.dict")
+
     def get_final_lookup_name(self, betmode: str):
         """Final csv lookup table name."""
         return os.path.join(self.lookup_path, f"lookUpTable_{betmode}.csv")
@@ -167,3 +187,19 @@ class OutputFiles:
     def get_final_segmented_name(self, betmode: str):
         """Final csv segmented wins lookup table name."""
         return os.path.join(self.lookup_path, f"lookUpTableSegmented_{betmode}.csv")
+
+    def get_convergence_name(self, betmode: str):
+        """Per-batch RTP convergence statistics."""
+        return os.path.join(self.stats_path, f"convergence_{betmode}.json")
+
+    def get_rejections_name(self, betmode: str):
+        """Repeat histograms and rejection reasons per criteria."""
+        return os.path.join(self.stats_path, f"rejections_{betmode}.json")
+
+    def get_phase_timings_name(self, betmode: str):
+        """Per-phase spin lifecycle timings."""
+        return os.path.join(self.stats_path, f"phase_timings_{betmode}.csv")
+
+    def get_telemetry_name(self, run_stamp: str):
+        """JSON-lines progress and throughput metrics for a single create_books run."""
+        return os.path.join(self.stats_path, f"telemetry_{run_stamp}.jsonl")
@@ -0,0 +1,97 @@
+"""Binary cache of parsed reelstrips, keyed by the content hash of the source CSV.
+
+Cache files are stored in a __reelcache__ folder next to the CSV and hold a symbol table followed by one
+array of symbol ids per reel. A cache is only used while the hash of the CSV matches, and is rebuilt otherwise.
+"""
+
+import os
+import sys
+import struct
+import hashlib
+from array import array
+
+REEL_CACHE_MAGIC = b"RLC1"
+REEL_CACHE_FOLDER = "__reelcache__"
+
+
+def get_reel_cache_path(file_path: str) -> str:
+    """Location of the binary cache for a reelstrip CSV."""
+    folder, name = os.path.split(os.path.abspath(file_path))
+    return os.path.join(folder, REEL_CACHE_FOLDER, name + ".bin")
+
+
+def get_csv_digest(file_path: str) -> bytes:
+    """SHA-1 digest of the CSV contents."""
+    with open(os.path.abspath(file_path), "rb") as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def encode_reels(reelstrips: list, digest: bytes) -> bytes:
+    """Serialise reelstrips as a symbol table and per-reel uint16 symbol-id arrays."""
+    symbols = list(dict.fromkeys(sym for reel in reelstrips for sym in reel))
+    symbol_ids = {sym: idx for idx, sym in enumerate(symbols)}
+    parts = [REEL_CACHE_MAGIC, digest, struct.pack("<H", len(symbols))]
+    for sym in symbols:
+        name = sym.encode("UTF-8")
+        parts.append(struct.pack("<B", len(name)) + name)
+    parts.append(struct.pack("<H", len(reelstrips)))
+    for reel in reelstrips:
+        ids = array("H", [symbol_ids[sym] for sym in reel])
+        if sys.byteorder == "big":
+            ids.byteswap()
+        parts.append(struct.pack("<I", len(reel)) + ids.tobytes())
+    return b"".join(parts)
+
+
+def decode_reels(data: bytes, digest: bytes) -> list:
+    """Rebuild reelstrips from cache bytes, returning None if the cache does not match the digest."""
+    if data[:4] != REEL_CACHE_MAGIC or data[4:24] != digest:
+        return None
+    offset = 24
+    (num_symbols,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    symbols = []
+    for _ in range(num_symbols):
+        (length,) = struct.unpack_from("<B", data, offset)
+        symbols.append(data[offset + 1 : offset + 1 + length].decode("UTF-8"))
+        offset += 1 + length
+    (num_reels,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    reelstrips = []
+    for _ in range(num_reels):
+        (length,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        ids = array("H")
+        ids.frombytes(data[offset : offset + 2 * length])
+        if sys.byteorder == "big":
+            ids.byteswap()
+        reelstrips.append([symbols[idx] for idx in ids])
+        offset += 2 * length
+    return reelstrips
+
+
+def read_reel_cache(file_path: str, digest: bytes) -> list:
+    """Cached reelstrips for a CSV, or None if there is no valid cache."""
+    cache_path = get_reel_cache_path(file_path)
+    if not os.path.exists(cache_path):
+        return None
+    with open(cache_path, "rb") as f:
+        data = f.read()
+    try:
+        return decode_reels(data, digest)
+    except (struct.error, IndexError, UnicodeDecodeError):
+        return None
+
+
+def write_reel_cache(file_path: str, reelstrips: list, digest: bytes) -> None:
+    """Store parsed reelstrips, skipping silently if the reels folder is not writable."""
+    cache_path = get_reel_cache_path(file_path)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, "wb") as f:
+            f.write(encode_reels(reelstrips, digest))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
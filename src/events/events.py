@@ -2,6 +2,7 @@
 
 from copy import deepcopy
 from src.events.event_constants import EventConstants
+from src.state.phase_timers import timed_phase
 
 
 def json_ready_sym(symbol: object, special_attributes: list = None):
@@ -15,6 +16,7 @@ def json_ready_sym(symbol: object, special_attributes: list = None):
     return print_sym
 
 
+@timed_phase("events")
 def reveal_event(gamestate):
     """Display the initial board drawn from reelstrips."""
     board_client = []
@@ -42,6 +44,7 @@ def reveal_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def fs_trigger_event(
     gamestate,
     include_padding_index=True,
@@ -77,6 +80,7 @@ def fs_trigger_event(
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def set_win_event(gamestate, winlevel_key: str = "standard"):
     """Used for updating cumulative win ticker (for a single outcome)."""
     if not gamestate.wincap_triggered:
@@ -94,6 +98,7 @@ def set_win_event(gamestate, winlevel_key: str = "standard"):
         gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def set_total_event(gamestate):
     """Updates win amount for a betting round (including cumulative wins across multiple freespin wins)."""
     event = {
@@ -109,6 +114,7 @@ def set_total_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def set_tumble_event(gamestate):
     """Update banner indicating wins from successive tumbles."""
     event = {
@@ -119,6 +125,7 @@ def set_tumble_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def wincap_event(gamestate):
     """Emit to indicate end of spin actions."""
     event = {
@@ -134,6 +141,7 @@ def wincap_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def win_info_event(gamestate, include_padding_index=True):
     """
     include_padding_index: starts winning-symbol positions at row=1, to account for top/bottom symbol inclusion in board
@@ -173,6 +181,7 @@ def win_info_event(gamestate, include_padding_index=True):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def update_tumble_win_event(gamestate):
     """Update a banner to record successive tumble wins."""
     event = {
@@ -183,6 +192,7 @@ def update_tumble_win_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def update_freespin_event(gamestate):
     """Update the current spin number and total freegame"""
     event = {
@@ -194,6 +204,7 @@ def update_freespin_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def freespin_end_event(gamestate, winlevel_key="endFeature"):
     """End of feature trigger."""
     event = {
@@ -205,6 +216,7 @@ def freespin_end_event(gamestate, winlevel_key="endFeature"):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def final_win_event(gamestate):
     """Assigns final payout multiplier for a simulation."""
     event = {
@@ -215,6 +227,7 @@ def final_win_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def update_global_mult_event(gamestate):
     """Increment global multiplier value."""
     event = {
@@ -226,6 +239,7 @@ def update_global_mult_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def tumble_board_event(gamestate):
     """States the symbol positions removed from a board during tumble, and which new symbols should take their place."""
     special_attributes = list(gamestate.config.special_symbols.keys())
@@ -254,6 +268,7 @@ def tumble_board_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def spin_win_total_event(gamestate, line_wins: float, collections: float) -> None:
     """Emit complete spin total after all collections are processed."""
     total_amount = line_wins + collections
@@ -267,6 +282,7 @@ def spin_win_total_event(gamestate, line_wins: float, collections: float) -> Non
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def cc_collect_sequence_event(gamestate, collections: list) -> None:
     """Emit deterministic CC → CW collection sequence for frontend animations."""
     event = {
@@ -277,6 +293,7 @@ def cc_collect_sequence_event(gamestate, collections: list) -> None:
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def cw_landed_event(gamestate, count: int, total_cws: int) -> None:
     """Emit when Collector Wilds land on the board during bonus."""
     event = {
@@ -288,6 +305,7 @@ def cw_landed_event(gamestate, count: int, total_cws: int) -> None:
     gamestate.book.add_event(event)
 
 
+@timed_phase("events")
 def enter_bonus_event(gamestate) -> None:
     "Indicate feature game entry explicitly."
     event = {
@@ -0,0 +1,52 @@
+"""Betmode and distribution information resolved once per (betmode, criteria) pair."""
+
+from src.calculations.statistics import WeightedSampler
+
+
+class CriteriaContext:
+    """Resolved betmode, distribution and condition samplers for the current betmode and criteria.
+
+    Contexts are cached on the gamestate, so the spin hot path reads attributes instead of scanning
+    config.bet_modes and the betmode distributions on every call. Conditions are read from the distribution on
+    every access and samplers are rebuilt when their weights change, so games may modify condition weights at
+    runtime.
+    """
+
+    def __init__(self, betmode: object, criteria: str):
+        self.betmode = betmode
+        self.criteria = criteria
+        self.distribution = None
+        if betmode is not None:
+            for distribution in betmode.get_distributions():
+                if distribution._criteria == criteria:
+                    self.distribution = distribution
+                    break
+        self.win_criteria = None if self.distribution is None else self.distribution.get_win_criteria()
+        self.samplers = {}
+
+    @property
+    def conditions(self) -> dict:
+        """Current conditions of the distribution."""
+        return None if self.distribution is None else self.distribution._conditions
+
+    @property
+    def reel_weights(self) -> dict:
+        """Current reel weights of the distribution conditions."""
+        conditions = self.conditions
+        return None if conditions is None else conditions.get("reel_weights")
+
+    def get_sampler(self, *keys) -> WeightedSampler:
+        """Sampler for the weighted distribution at conditions[keys[0]][keys[1]]...
+        The cached sampler is reused while it was built from the same, unchanged weight dictionary."""
+        distribution = self.distribution._conditions
+        for key in keys:
+            distribution = distribution[key]
+        sampler = self.samplers.get(keys)
+        if sampler is None or not sampler.matches(distribution):
+            sampler = WeightedSampler(distribution)
+            self.samplers[keys] = sampler
+        return sampler
+
+    def sample(self, *keys) -> object:
+        """Draw from the weighted distribution at conditions[keys[0]][keys[1]]..."""
+        return self.get_sampler(*keys).sample()
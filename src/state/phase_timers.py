@@ -0,0 +1,112 @@
+"""Opt-in timers accumulating the time spent in each phase of the spin lifecycle."""
+
+import time
+from functools import wraps
+from collections import defaultdict
+
+ACTIVE_TIMER = None
+
+
+class PhaseTimer:
+    """Accumulate exclusive nanoseconds per (phase, criteria, gametype).
+
+    Nested phases are subtracted from their parent, so phase totals sum to the timed section of a spin.
+    Rejected attempts are recorded separately under 'repeat_retries' and overlap with the other phases.
+    """
+
+    def __init__(self, gamestate: object):
+        self.gamestate = gamestate
+        self.totals = defaultdict(lambda: [0, 0])
+        self.child_time = []
+        self.attempt_start = None
+
+    def start(self) -> None:
+        """Open a (possibly nested) phase."""
+        self.child_time.append(0)
+
+    def stop(self, phase: str, elapsed: int) -> None:
+        """Close the innermost phase and record its exclusive time."""
+        children = self.child_time.pop()
+        if self.child_time:
+            self.child_time[-1] += elapsed
+        self.add(phase, elapsed - children)
+
+    def add(self, phase: str, elapsed: int) -> None:
+        """Record time against the current criteria and gametype."""
+        total = self.totals[(phase, self.gamestate.criteria, self.gamestate.gametype)]
+        total[0] += elapsed
+        total[1] += 1
+
+    def start_attempt(self) -> None:
+        """Mark the beginning of a spin attempt."""
+        self.attempt_start = time.perf_counter_ns()
+
+    def reject_attempt(self) -> None:
+        """Record the duration of an attempt which failed the criteria constraints."""
+        if self.attempt_start is not None:
+            self.add("repeat_retries", time.perf_counter_ns() - self.attempt_start)
+
+    def get_totals(self) -> dict:
+        """Picklable copy of accumulated totals."""
+        return {k: tuple(v) for k, v in self.totals.items()}
+
+
+def timed_phase(phase: str):
+    """Attribute the runtime of the decorated function to a phase while a timer is active."""
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            timer = ACTIVE_TIMER
+            if timer is None:
+                return fn(*args, **kwargs)
+            timer.start()
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timer.stop(phase, time.perf_counter_ns() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def set_active_timer(timer: PhaseTimer) -> None:
+    """Enable (or disable with None) phase timing in the current process."""
+    global ACTIVE_TIMER
+    ACTIVE_TIMER = timer
+
+
+def get_active_timer() -> PhaseTimer:
+    """Return the phase timer of the current process, if enabled."""
+    return ACTIVE_TIMER
+
+
+def combine_phase_totals(all_totals: list) -> dict:
+    """Sum phase totals reported by all workers."""
+    combined = defaultdict(lambda: [0, 0])
+    for totals in all_totals:
+        for key, (elapsed, calls) in totals.items():
+            combined[key][0] += elapsed
+            combined[key][1] += calls
+    return combined
+
+
+def get_phase_table(combined: dict) -> list:
+    """Table rows sorted by total time, 'share' excludes the overlapping repeat_retries phase."""
+    timed_ns = sum(v[0] for k, v in combined.items() if k[0] != "repeat_retries")
+    rows = []
+    for (phase, criteria, gametype), (elapsed, calls) in sorted(combined.items(), key=lambda x: -x[1][0]):
+        rows.append(
+            {
+                "phase": phase,
+                "criteria": criteria,
+                "gametype": gametype,
+                "calls": calls,
+                "total_ms": round(elapsed / 1e6, 3),
+                "mean_us": round(elapsed / max(calls, 1) / 1e3, 3),
+                "share": None if phase == "repeat_retries" else round(elapsed / max(timed_ns, 1), 4),
+            }
+        )
+    return rows
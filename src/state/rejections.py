@@ -0,0 +1,148 @@
+"""Rejection-sampling diagnostics and retry budgets for criteria-constrained simulations."""
+
+import time
+from collections import defaultdict
+
+
+class RetryBudgetExceeded(RuntimeError):
+    """A simulation was rejected more times than its criteria retry budget allows."""
+
+
+def get_rejection_reason(gamestate: object) -> str:
+    """Classify why the latest attempt failed its criteria constraints."""
+    win_criteria = gamestate.get_current_betmode_distributions().get_win_criteria()
+    conditions = gamestate.get_current_distribution_conditions()
+    if win_criteria is not None and gamestate.final_win != win_criteria:
+        return "win_criteria"
+    if conditions.get("force_freegame") and not gamestate.triggered_freegame:
+        return "missing_freegame"
+    if conditions.get("force_wincap") and not gamestate.wincap_triggered:
+        return "missing_wincap"
+    if gamestate.final_win == 0:
+        return "zero_win"
+    return "other"
+
+
+def get_histogram_bucket(repeats: int) -> str:
+    """Power-of-two buckets: 0, 1, 2-3, 4-7, ..."""
+    if repeats < 2:
+        return str(repeats)
+    lower = 1 << (repeats.bit_length() - 1)
+    return f"{lower}-{2 * lower - 1}"
+
+
+class RejectionStats:
+    """Per-criteria repeat histograms, rejection reasons and time spent in rejected attempts."""
+
+    def __init__(self):
+        self.criteria = {}
+        self.attempts = 0
+        self.attempt_start = None
+        self.sim_start = None
+        self.sim_reasons = defaultdict(int)
+
+    def get_criteria_stats(self, criteria: str) -> dict:
+        """Create or return the counters for a criteria."""
+        if criteria not in self.criteria:
+            self.criteria[criteria] = {
+                "sims": 0,
+                "attempts": 0,
+                "max_repeats": 0,
+                "seconds": 0.0,
+                "rejected_seconds": 0.0,
+                "reasons": defaultdict(int),
+                "histogram": defaultdict(int),
+            }
+        return self.criteria[criteria]
+
+    def start_sim(self) -> None:
+        """Reset per-simulation counters."""
+        self.attempts = 0
+        self.sim_start = time.perf_counter()
+        self.sim_reasons = defaultdict(int)
+
+    def start_attempt(self, gamestate: object) -> None:
+        """Called at the start of every attempt, any previous attempt of the same simulation was rejected."""
+        now = time.perf_counter()
+        if self.attempts > 0:
+            reason = get_rejection_reason(gamestate)
+            stats = self.get_criteria_stats(gamestate.criteria)
+            stats["reasons"][reason] += 1
+            stats["rejected_seconds"] += now - self.attempt_start
+            self.sim_reasons[reason] += 1
+            budget = gamestate.get_retry_budget()
+            if budget is not None and self.attempts > budget:
+                raise RetryBudgetExceeded(self.get_budget_report(gamestate, budget))
+        self.attempts += 1
+        self.attempt_start = now
+
+    def finish_sim(self, criteria: str) -> None:
+        """Record the number of repeats needed by an accepted simulation."""
+        repeats = max(self.attempts - 1, 0)
+        stats = self.get_criteria_stats(criteria)
+        stats["sims"] += 1
+        stats["attempts"] += max(self.attempts, 1)
+        stats["max_repeats"] = max(stats["max_repeats"], repeats)
+        stats["seconds"] += time.perf_counter() - self.sim_start
+        stats["histogram"][get_histogram_bucket(repeats)] += 1
+
+    def get_budget_report(self, gamestate: object, budget: int) -> str:
+        """Describe a simulation which could not satisfy its criteria."""
+        stats = self.get_criteria_stats(gamestate.criteria)
+        accepted = stats["sims"]
+        return (
+            f"\nRetry budget of {budget} exceeded:\n"
+            f" Betmode: {gamestate.betmode}\n Criteria: {gamestate.criteria}\n Simulation: {gamestate.sim}\n"
+            f" Rejections for this simulation: {dict(self.sim_reasons)}\n"
+            f" Accepted {gamestate.criteria} simulations in this batch: {accepted}"
+            f" (mean attempts: {round(stats['attempts'] / accepted, 2) if accepted else 'n/a'})\n"
+            f" Distribution conditions: {gamestate.get_current_distribution_conditions()}\n"
+            " Check the criteria can be satisfied by the reel weights and conditions of this distribution."
+        )
+
+    def get_totals(self) -> dict:
+        """JSON-ready copy of all counters."""
+        return {
+            criteria: {
+                **stats,
+                "reasons": dict(stats["reasons"]),
+                "histogram": dict(stats["histogram"]),
+            }
+            for criteria, stats in self.criteria.items()
+        }
+
+
+def combine_rejection_stats(all_stats: list) -> dict:
+    """Sum rejection statistics from all workers and add summary values."""
+    combined = {}
+    for worker_stats in all_stats:
+        for criteria, stats in worker_stats.items():
+            total = combined.setdefault(
+                criteria,
+                {
+                    "sims": 0,
+                    "attempts": 0,
+                    "max_repeats": 0,
+                    "seconds": 0.0,
+                    "rejected_seconds": 0.0,
+                    "reasons": {},
+                    "histogram": {},
+                },
+            )
+            total["sims"] += stats["sims"]
+            total["attempts"] += stats["attempts"]
+            total["max_repeats"] = max(total["max_repeats"], stats["max_repeats"])
+            total["seconds"] += stats["seconds"]
+            total["rejected_seconds"] += stats["rejected_seconds"]
+            for key in ["reasons", "histogram"]:
+                for k, v in stats[key].items():
+                    total[key][k] = total[key].get(k, 0) + v
+
+    for stats in combined.values():
+        stats["mean_repeats"] = round((stats["attempts"] - stats["sims"]) / max(stats["sims"], 1), 3)
+        stats["seconds"] = round(stats["seconds"], 3)
+        stats["rejected_seconds"] = round(stats["rejected_seconds"], 3)
+        stats["histogram"] = dict(
+            sorted(stats["histogram"].items(), key=lambda x: int(x[0].split("-")[0]))
+        )
+    return combined
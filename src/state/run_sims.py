@@ -1,13 +1,29 @@
+import os
 import time
 import random
-from multiprocessing import Process, Manager
+from copy import deepcopy
+from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
 import cProfile
+import pstats
 from warnings import warn
 import shutil
 import asyncio
-from typing import Dict
+from typing import Dict, List
 
-from src.write_data.write_data import output_lookup_and_force_files
+from src.write_data.write_data import (
+    output_lookup_and_force_files,
+    get_force_record_keys,
+    write_convergence_stats,
+    write_phase_timings,
+)
+from src.state.telemetry import TelemetryMonitor
+from src.state.phase_timers import combine_phase_totals, get_phase_table
+from src.state.speculative import resolve_speculative_seeds
+from src.state.worker_bootstrap import get_worker_context, start_worker, print_startup_summary
+from src.state.scheduling import CHUNKS_PER_THREAD, get_criteria_costs, get_cost_ordered_chunks, fill_sim_queue
 
 
 def create_books(
@@ -18,8 +34,39 @@ def create_books(
     threads: int,
     compress: bool,
     profiling: bool,
+    sim_offsets: Dict[str, int] = None,
+    target_rtp_error: Dict[str, float] = None,
+    telemetry: bool = False,
+    phase_timers: bool = False,
+    speculative_criteria: list = None,
+    criteria_scheduling: object = None,
+    pipeline_modes: bool = False,
+    book_chunk_size: int = None,
+    start_method: str = None,
 ):
-    """Main run-function for simulating game outcomes and outputting all files."""
+    """Main run-function for simulating game outcomes and outputting all files.
+
+    sim_offsets: optional {betmode: number of existing simulations}. Modes with a non-zero offset
+    append new simulations (starting at id offset+1) to the existing library instead of replacing it.
+    target_rtp_error: optional {betmode: standard error}. Listed modes stop simulating once the standard
+    error of the quota-weighted (stratified) average win falls below the target, num_sim_args then acts as a
+    hard cap. The estimate is not the mode RTP, which depends on the optimized lookup table weights.
+    telemetry: workers report live progress and throughput counters, rendered with an ETA and written
+    to library/simulation_stats/telemetry_<timestamp>.jsonl.
+    phase_timers: accumulate time spent in each phase of the spin lifecycle, per criteria and gametype,
+    written to library/simulation_stats/phase_timings_<mode>.csv.
+    speculative_criteria: optional list of rare criteria (e.g. ["wincap"]). Their attempts are searched in
+    parallel over deterministic sub-seeds before each batch, the lowest accepted sub-seed is then replayed.
+    criteria_scheduling: 'pilot', 'previous' or {criteria: cost}. Workers pull criteria-homogeneous chunks of
+    simulations, most expensive first, using costs from a pilot run or the previous run's statistics.
+    pipeline_modes: merge and compress the outputs of each mode in a background process while the next mode
+    is simulated.
+    book_chunk_size: stream every book_chunk_size completed books to a background writer thread in each worker,
+    overlapping encoding, compression and disk writes with simulation.
+    start_method: multiprocessing start method of simulation workers. 'forkserver' preloads the game modules in a
+    template process which workers are forked from, the gamestate is still pickled to every worker. Worker
+    startup times are printed for each mode.
+    """
     for key, ns in num_sim_args.items():
         if all([ns > 0, ns > batch_size * batch_size]):
             assert (
@@ -30,40 +77,89 @@ def create_books(
     if not compress and sum(num_sim_args.values()) > 1e4:
         warn("Generating large number of uncompressed books!")
 
-    if profiling and threads > 1:
-        raise RuntimeError("Multithread profiling not supported, threads must = 1 with profiling enabled")
+    telemetry_name = None
+    if telemetry:
+        telemetry_name = gamestate.output_files.get_telemetry_name(datetime.now().strftime("%Y%m%d_%H%M%S"))
 
     startTime = time.time()
     print("\nCreating books...")
+    merge_executor = ProcessPoolExecutor(max_workers=1) if pipeline_modes else None
+    merges = []
     for betmode_name in num_sim_args:
         if num_sim_args[betmode_name] > 0:
-            gamestate.betmode = betmode_name
-            # Clear recorded events to prevent cross-contamination between bet modes
-            gamestate.recorded_events = {}
-            run_multi_process_sims(
+            sim_offset = 0 if sim_offsets is None else int(sim_offsets.get(betmode_name, 0))
+            # Each mode is simulated on its own copy, preventing cross-contamination between bet modes
+            mode_state = get_mode_state(gamestate, betmode_name)
+            num_sims, num_repeats = run_multi_process_sims(
                 threads,
                 batch_size,
                 config.game_id,
                 betmode_name,
-                gamestate,
+                mode_state,
                 num_sims=num_sim_args[betmode_name],
                 compress=compress,
                 write_event_list=config.write_event_list,
                 profiling=profiling,
+                sim_offset=sim_offset,
+                target_rtp_error=None if target_rtp_error is None else target_rtp_error.get(betmode_name),
+                telemetry_name=telemetry_name,
+                phase_timers=phase_timers,
+                speculative_criteria=speculative_criteria,
+                criteria_scheduling=criteria_scheduling,
+                book_chunk_size=book_chunk_size,
+                start_method=start_method,
             )
-            output_lookup_and_force_files(
-                threads,
-                batch_size,
-                config.game_id,
-                betmode_name,
-                gamestate,
-                num_sims=num_sim_args[betmode_name],
-                compress=compress,
-            )  # , write_event_list=config.write_event_list)
+            restore_mode_config(gamestate, mode_state, betmode_name)
+            merge_args = (threads, batch_size, config.game_id, betmode_name, mode_state)
+            merge_kwargs = {
+                "num_sims": num_sims,
+                "compress": compress,
+                "sim_offset": sim_offset,
+                "num_repeats": num_repeats,
+                "merge_by_id": criteria_scheduling is not None and threads > 1,
+            }
+            profile_name = None
+            if profiling:
+                profile_name = f"games/{config.game_id}/simulationProfile_{betmode_name}_merge.prof"
+            if merge_executor is not None:
+                merges.append(merge_executor.submit(merge_mode_outputs, merge_args, merge_kwargs, profile_name))
+            else:
+                merge_mode_outputs(merge_args, merge_kwargs, profile_name)
+
+    if merge_executor is not None:
+        for merge in merges:
+            merge.result()
+        merge_executor.shutdown()
     shutil.rmtree(gamestate.output_files.temp_path)
     print("\nFinished creating books in", time.time() - startTime, "seconds.\n")
 
 
+def get_mode_state(gamestate: object, betmode_name: str) -> object:
+    """Independent copy of the gamestate used to simulate a single bet mode."""
+    mode_state = deepcopy(gamestate)
+    mode_state.betmode = betmode_name
+    mode_state.recorded_events = {}
+    return mode_state
+
+
+def restore_mode_config(gamestate: object, mode_state: object, betmode_name: str) -> None:
+    """Carry the betmode (with the force keys found during simulation) back to the shared config."""
+    for idx, betmode in enumerate(gamestate.config.bet_modes):
+        if betmode.get_name() == betmode_name:
+            gamestate.config.bet_modes[idx] = mode_state.get_betmode(betmode_name)
+    gamestate.clear_criteria_contexts()
+
+
+def merge_mode_outputs(merge_args: tuple, merge_kwargs: dict, profile_name: str = None) -> None:
+    """Combine the temporary outputs of a bet mode, optionally under cProfile."""
+    if profile_name is None:
+        output_lookup_and_force_files(*merge_args, **merge_kwargs)
+        return
+    profiler = cProfile.Profile()
+    profiler.runcall(output_lookup_and_force_files, *merge_args, **merge_kwargs)
+    profiler.dump_stats(profile_name)
+
+
 def get_sim_splits(gamestate: object, num_sims: int, betmode_name: str) -> Dict[str, int]:
     """Ensure assignment of criteria to all simulations numbers."""
     betmode_distributions = gamestate.get_betmode(betmode_name).get_distributions()
@@ -83,35 +179,173 @@ def get_sim_splits(gamestate: object, num_sims: int, betmode_name: str) -> Dict[
     return num_sims_criteria
 
 
-def assign_sim_criteria(num_sims_criteria: Dict[str, int], sims: int) -> Dict[int, str]:
+def get_extension_sim_splits(
+    gamestate: object, num_sims: int, betmode_name: str, existing_criteria: Dict[str, int]
+) -> Dict[str, int]:
+    """Allocate criteria to appended simulations so the extended library matches the betmode quota split."""
+    num_existing = sum(existing_criteria.values())
+    target_criteria = get_sim_splits(gamestate, num_existing + num_sims, betmode_name)
+    num_sims_criteria = {c: max(n - existing_criteria.get(c, 0), 0) for c, n in target_criteria.items()}
+    betmode_distributions = gamestate.get_betmode(betmode_name).get_distributions()
+    listedCriteria = [d._criteria for d in betmode_distributions]
+    criteria_weights = [d._quota for d in betmode_distributions]
+    while sum(num_sims_criteria.values()) != num_sims:
+        c = random.choices(listedCriteria, criteria_weights)[0]
+        if sum(num_sims_criteria.values()) > num_sims and num_sims_criteria[c] > 0:
+            num_sims_criteria[c] -= 1
+        elif sum(num_sims_criteria.values()) < num_sims:
+            num_sims_criteria[c] += 1
+
+    return num_sims_criteria
+
+
+def get_batched_sim_splits(
+    gamestate: object, num_batches: int, batch_sims: int, betmode_name: str, existing_criteria: Dict[str, int] = None
+) -> List[Dict[str, int]]:
+    """Criteria split of each batch. Every batch compensates the criteria counts of the existing library (if any)
+    and the batches before it, as get_extension_sim_splits does, so the first k batches add up to the split of
+    the whole library rather than repeating the minimum of one simulation per criteria in every batch."""
+    batch_criteria = []
+    library_criteria = {} if existing_criteria is None else dict(existing_criteria)
+    for _ in range(num_batches):
+        num_sims_criteria = get_extension_sim_splits(gamestate, batch_sims, betmode_name, library_criteria)
+        for criteria, count in num_sims_criteria.items():
+            library_criteria[criteria] = library_criteria.get(criteria, 0) + count
+        batch_criteria.append(num_sims_criteria)
+    return batch_criteria
+
+
+def assign_batched_sim_criteria(
+    batch_criteria: List[Dict[str, int]], batch_sims: int, sim_offset: int = 0
+) -> Dict[int, str]:
+    """Assign criteria batch-by-batch, so that any number of completed batches satisfies the quota split."""
+    sim_allocation = {}
+    for batch, num_sims_criteria in enumerate(batch_criteria):
+        sim_allocation.update(assign_sim_criteria(num_sims_criteria, batch_sims, sim_offset + batch * batch_sims))
+    return sim_allocation
+
+
+def get_sim_allocation(
+    gamestate: object,
+    betmode: str,
+    num_sims: int,
+    num_batches: int,
+    batch_sims: int,
+    sim_offset: int = 0,
+    existing_criteria: Dict[str, int] = None,
+    batched: bool = False,
+) -> Dict[int, str]:
+    """Criteria of every simulation id. batched assigns each of num_batches batches of batch_sims its own
+    quota split (used for adaptive stopping), otherwise num_sims are split at once. existing_criteria are the
+    criteria counts of the library being extended from sim_offset."""
+    if batched:
+        batch_criteria = get_batched_sim_splits(gamestate, num_batches, batch_sims, betmode, existing_criteria)
+        return assign_batched_sim_criteria(batch_criteria, batch_sims, sim_offset)
+    if existing_criteria is not None:
+        num_sims_criteria = get_extension_sim_splits(gamestate, num_sims, betmode, existing_criteria)
+    else:
+        num_sims_criteria = get_sim_splits(gamestate, num_sims, betmode)
+    return assign_sim_criteria(num_sims_criteria, num_sims, sim_offset)
+
+
+def get_criteria_weights(gamestate: object, betmode_name: str) -> Dict[str, float]:
+    """Quota of each criteria, normalised to sum to 1."""
+    betmode_distributions = gamestate.get_betmode(betmode_name).get_distributions()
+    total_quota = sum(d._quota for d in betmode_distributions)
+    return {d._criteria: d._quota / total_quota for d in betmode_distributions}
+
+
+def merge_criteria_statistics(cumulative_statistics: dict, criteria_statistics: dict) -> None:
+    """Add per-criteria win sums of a worker to the running totals."""
+    for criteria, statistics in criteria_statistics.items():
+        totals = cumulative_statistics.setdefault(criteria, {"sims": 0, "wins": 0.0, "squared_wins": 0.0})
+        for key in totals:
+            totals[key] += statistics[key]
+
+
+def get_stratified_win_estimate(criteria_statistics: dict, criteria_weights: Dict[str, float], cost: float) -> tuple:
+    """Stratified estimate of the average win (in bet multiples) and its standard error.
+    Criteria are the strata: each criteria's sample mean and variance is weighted by criteria_weights, so the
+    estimate does not depend on how many simulations each criteria has been given so far. Simulation criteria
+    are forced, so with quota weights this is the average win of the unoptimised library, not the mode RTP,
+    which is only known once the optimisation has weighted the lookup table.
+    The standard error is infinite while a weighted criteria has no simulations."""
+    average_win, variance, sampled_weight = 0.0, 0.0, 0.0
+    for criteria, weight in criteria_weights.items():
+        statistics = criteria_statistics.get(criteria)
+        if statistics is None or statistics["sims"] == 0:
+            continue
+        num_sims = statistics["sims"]
+        mean_win = statistics["wins"] / num_sims
+        sample_variance = 0.0
+        if num_sims > 1:
+            sample_variance = max(statistics["squared_wins"] - num_sims * mean_win**2, 0.0) / (num_sims - 1)
+        average_win += weight * mean_win
+        variance += weight**2 * sample_variance / num_sims
+        sampled_weight += weight
+    if sampled_weight < 1 - 1e-12:
+        average_win = average_win / sampled_weight if sampled_weight > 0 else 0.0
+        return average_win / cost, float("inf")
+    return average_win / cost, variance**0.5 / cost
+
+
+def prepare_library_extension(gamestate: object, betmode: str, sim_offset: int) -> Dict[str, int]:
+    """Verify the existing library matches the offset and carry over its force keys."""
+    existing_criteria = get_library_criteria_counts(gamestate, betmode)
+    if sum(existing_criteria.values()) != sim_offset:
+        raise RuntimeError(
+            f"sim_offset ({sim_offset}) must match the {sum(existing_criteria.values())} existing {betmode} simulations."
+        )
+    print("Extending", betmode, "library from simulation", sim_offset + 1)
+    for key in get_force_record_keys(gamestate.output_files.force[betmode]["paths"]["force_record"]):
+        if key not in gamestate.get_betmode(betmode).get_force_keys():
+            gamestate.get_betmode(betmode).add_force_key(key)
+    return existing_criteria
+
+
+def get_library_criteria_counts(gamestate: object, betmode_name: str) -> Dict[str, int]:
+    """Count criteria of all simulations already written to the segmented lookup table."""
+    segmented_name = gamestate.output_files.get_final_segmented_name(betmode_name)
+    if not os.path.isfile(segmented_name):
+        raise FileNotFoundError(f"Cannot extend library, {segmented_name} does not exist.")
+    criteria_counts = defaultdict(int)
+    with open(segmented_name, "r", encoding="UTF-8") as f:
+        for line in f:
+            if line.strip():
+                criteria_counts[line.strip().split(",")[1]] += 1
+    return dict(criteria_counts)
+
+
+def assign_sim_criteria(num_sims_criteria: Dict[str, int], sims: int, sim_offset: int = 0) -> Dict[int, str]:
     """Assign criteria randomly to simulations based on quota defined in config."""
     simAllocation = [criteria for criteria, count in num_sims_criteria.items() for _ in range(count)]
     random.shuffle(simAllocation)
-    return {i: simAllocation[i] for i in range(min(sims, len(simAllocation)))}
-
-
-async def profile_and_visualize(
-    game_id,
-    gamestate,
-    all_betmode_configs,
-    betmode,
-    sim_allocation,
-    threads,
-    num_repeats,
-    sims_per_thread,
-    repeat,
-    compress,
-    write_event_list,
-):
+    return {sim_offset + i: simAllocation[i] for i in range(min(sims, len(simAllocation)))}
+
+
+def run_profiled_sims(gamestate: object, profile_name: str, *run_sims_args) -> None:
+    """Run a batch of simulations under cProfile and dump the worker statistics."""
+    profiler = cProfile.Profile()
+    profiler.runcall(gamestate.run_sims, *run_sims_args)
+    profiler.dump_stats(profile_name)
+
+
+def merge_profiles(profile_names: list, output_name: str) -> None:
+    """Combine worker profiles into a single output file."""
+    stats = pstats.Stats(profile_names[0])
+    for name in profile_names[1:]:
+        stats.add(name)
+    stats.dump_stats(output_name)
+    for name in profile_names:
+        os.remove(name)
+
+
+async def visualize_profile(output_name: str):
     """Create flame-graph, automatically opens output on localhost."""
-    output_string = f"games/{game_id}/simulationProfile_{betmode}.prof"
-    cProfile.runctx(
-        "gamestate.run_sims(all_betmode_configs, betmode, sim_allocation, threads, num_repeats, sims_per_thread, 0, repeat, compress, write_event_list)",
-        globals(),
-        locals(),
-        output_string,
-    )
-    await asyncio.create_subprocess_exec("snakeviz", output_string)
+    if shutil.which("snakeviz") is None:
+        warn(f"snakeviz is not installed, profile written to {output_name}")
+        return
+    await asyncio.create_subprocess_exec("snakeviz", output_name)
 
 
 def run_multi_process_sims(
@@ -124,63 +358,141 @@ def run_multi_process_sims(
     compress: bool = True,
     write_event_list: bool = False,
     profiling: bool = False,
-):
-    """Setup multiprocessing manager for running all game-mode simulations."""
+    sim_offset: int = 0,
+    target_rtp_error: float = None,
+    telemetry_name: str = None,
+    phase_timers: bool = False,
+    speculative_criteria: list = None,
+    criteria_scheduling: object = None,
+    book_chunk_size: int = None,
+    start_method: str = None,
+) -> tuple:
+    """Setup multiprocessing manager for running all game-mode simulations.
+    Returns the number of simulations and batches which were run."""
     print("\nCreating books for", game_id, "in", betmode)
     num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
     sims_per_thread = int(num_sims / threads / num_repeats)
-    num_sims_criteria = get_sim_splits(gamestate, num_sims, betmode)
-    sim_allocation = assign_sim_criteria(num_sims_criteria, num_sims)
+    existing_criteria = None
+    if sim_offset > 0:
+        existing_criteria = prepare_library_extension(gamestate, betmode, sim_offset)
+
+    sim_allocation = get_sim_allocation(
+        gamestate,
+        betmode,
+        num_sims,
+        num_repeats,
+        threads * sims_per_thread,
+        sim_offset,
+        existing_criteria,
+        batched=target_rtp_error is not None,
+    )
+
+    criteria_costs = None
+    if criteria_scheduling is not None and threads > 1:
+        criteria_costs = get_criteria_costs(gamestate, betmode, sim_allocation, criteria_scheduling)
+        print("Scheduling criteria by expected cost:", {c: round(v, 6) for c, v in criteria_costs.items()})
+
+    mode_cost = gamestate.get_betmode(betmode).get_cost()
+    criteria_weights = get_criteria_weights(gamestate, betmode)
+    cumulative_statistics = {}
+    convergence = []
+    completed_repeats = num_repeats
+    start_time = time.time()
+    profile_names = []
+    all_phase_totals = []
+    all_startup_times = []
+    context = get_worker_context(gamestate, start_method)
+    telemetry_manager, telemetry_channel, monitor = None, None, None
+    if telemetry_name is not None:
+        telemetry_manager = Manager()
+        telemetry_channel = telemetry_manager.Queue()
+        monitor = TelemetryMonitor(telemetry_channel, telemetry_name, betmode, num_sims)
+        monitor.start()
     for repeat in range(num_repeats):
         print("Batch", repeat + 1, "of", num_repeats)
         processes = []
         manager = Manager()
         all_betmode_configs = manager.list()
-        if profiling:
-            asyncio.run(
-                profile_and_visualize(
-                    game_id=game_id,
-                    gamestate=gamestate,
-                    all_betmode_configs=all_betmode_configs,
-                    betmode=betmode,
-                    sim_allocation=sim_allocation,
-                    threads=threads,
-                    num_repeats=num_repeats,
-                    sims_per_thread=sims_per_thread,
-                    repeat=repeat,
-                    compress=compress,
-                    write_event_list=write_event_list,
-                )
+        win_statistics = manager.list()
+        phase_timings = manager.list() if phase_timers else None
+        startup_times = manager.list()
+        speculative_seeds = None
+        if speculative_criteria is not None:
+            batch_start = sim_offset + repeat * threads * sims_per_thread
+            speculative_seeds = resolve_speculative_seeds(
+                gamestate,
+                betmode,
+                {
+                    sim: sim_allocation[sim]
+                    for sim in range(batch_start, batch_start + threads * sims_per_thread)
+                    if sim_allocation[sim] in speculative_criteria
+                },
+                threads,
             )
-        elif threads == 1:
-            gamestate.run_sims(
-                betmode_copy_list=all_betmode_configs,
-                betmode=betmode,
-                sim_to_criteria=sim_allocation,
-                total_threads=threads,
-                total_repeats=num_repeats,
-                num_sims=sims_per_thread,
-                thread_index=0,
-                repeat_count=repeat,
-                compress=compress,
-                write_event_list=write_event_list,
+        sim_queue = None
+        if criteria_costs is not None:
+            batch_start = sim_offset + repeat * threads * sims_per_thread
+            sim_queue = manager.Queue()
+            chunks = get_cost_ordered_chunks(
+                range(batch_start, batch_start + threads * sims_per_thread),
+                sim_allocation,
+                criteria_costs,
+                max(sims_per_thread // CHUNKS_PER_THREAD, 1),
             )
+            fill_sim_queue(sim_queue, chunks, threads)
+        if threads == 1:
+            run_sims_args = (
+                all_betmode_configs,
+                betmode,
+                sim_allocation,
+                threads,
+                num_repeats,
+                sims_per_thread,
+                0,
+                repeat,
+                compress,
+                write_event_list,
+                sim_offset,
+                None,
+                telemetry_channel,
+                phase_timings,
+                speculative_seeds,
+                None,
+                book_chunk_size,
+            )
+            if profiling:
+                profile_names.append(gamestate.output_files.get_temp_profile_name(betmode, 0, repeat))
+                run_profiled_sims(gamestate, profile_names[-1], *run_sims_args)
+            else:
+                gamestate.run_sims(*run_sims_args)
         else:
             for thread in range(threads):
-                process = Process(
-                    target=gamestate.run_sims,
-                    args=(
-                        all_betmode_configs,
-                        betmode,
-                        sim_allocation,
-                        threads,
-                        num_repeats,
-                        sims_per_thread,
-                        thread,
-                        repeat,
-                        compress,
-                        write_event_list,
-                    ),
+                run_sims_args = (
+                    all_betmode_configs,
+                    betmode,
+                    sim_allocation,
+                    threads,
+                    num_repeats,
+                    sims_per_thread,
+                    thread,
+                    repeat,
+                    compress,
+                    write_event_list,
+                    sim_offset,
+                    win_statistics,
+                    telemetry_channel,
+                    phase_timings,
+                    speculative_seeds,
+                    sim_queue,
+                    book_chunk_size,
+                )
+                if profiling:
+                    profile_names.append(gamestate.output_files.get_temp_profile_name(betmode, thread, repeat))
+                    target, target_args = run_profiled_sims, (gamestate, profile_names[-1], *run_sims_args)
+                else:
+                    target, target_args = gamestate.run_sims, run_sims_args
+                process = context.Process(
+                    target=start_worker, args=(time.time(), startup_times, target, *target_args)
                 )
                 print("Started thread", thread)
                 process.start()
@@ -188,6 +500,65 @@ def run_multi_process_sims(
             print("All threads are online.")
             for process in processes:
                 process.join()
+            failed = [thread for thread, process in enumerate(processes) if process.exitcode != 0]
+            if failed:
+                raise RuntimeError(
+                    f"Simulation threads {failed} failed in {betmode}, batch {repeat}. See the traceback above."
+                )
             print("Finished joining threads.")
             gamestate.combine(all_betmode_configs, betmode)
             gamestate.get_betmode(betmode).lock_force_keys()
+
+        if phase_timers:
+            all_phase_totals.extend(phase_timings)
+        all_startup_times.extend(startup_times)
+
+        if target_rtp_error is not None:
+            if threads == 1:
+                win_statistics.append(gamestate.win_manager.get_cumulative_statistics())
+            for thread_statistics in win_statistics:
+                merge_criteria_statistics(cumulative_statistics, thread_statistics)
+            average_win, std_error = get_stratified_win_estimate(cumulative_statistics, criteria_weights, mode_cost)
+            num_completed = sum(statistics["sims"] for statistics in cumulative_statistics.values())
+            convergence.append(
+                {
+                    "batch": repeat + 1,
+                    "sims": num_completed,
+                    "quota_weighted_average_win": average_win,
+                    "std_error": None if std_error == float("inf") else std_error,
+                    "criteria": {
+                        criteria: {"sims": statistics["sims"], "average_win": statistics["wins"] / statistics["sims"] / mode_cost}
+                        for criteria, statistics in cumulative_statistics.items()
+                    },
+                    "elapsed_seconds": round(time.time() - start_time, 3),
+                }
+            )
+            print(
+                f"Quota-weighted average win: {round(average_win, 4)}",
+                f"(standard error: {round(std_error, 5)}, target: {target_rtp_error})",
+            )
+            if std_error <= target_rtp_error:
+                completed_repeats = repeat + 1
+                print(betmode, "converged after", num_completed, "simulations.")
+                break
+
+    if profiling:
+        profile_name = f"games/{game_id}/simulationProfile_{betmode}.prof"
+        merge_profiles(profile_names, profile_name)
+        asyncio.run(visualize_profile(profile_name))
+
+    print_startup_summary(all_startup_times, start_method)
+
+    if phase_timers:
+        write_phase_timings(
+            get_phase_table(combine_phase_totals(all_phase_totals)), gamestate.output_files.get_phase_timings_name(betmode)
+        )
+
+    if monitor is not None:
+        monitor.stop()
+        telemetry_manager.shutdown()
+
+    if target_rtp_error is not None:
+        write_convergence_stats(convergence, gamestate.output_files.get_convergence_name(betmode))
+
+    return completed_repeats * threads * sims_per_thread, completed_repeats
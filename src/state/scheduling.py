@@ -0,0 +1,93 @@
+"""Longest-expected-first scheduling of simulations across worker processes.
+
+Simulations of a batch are grouped into criteria-homogeneous chunks, which are dispatched through a shared queue
+in order of expected cost. Workers write their books sorted by id and batches are merged by id, so the final
+library ordering is unchanged.
+"""
+
+import os
+import json
+import time
+from copy import deepcopy
+
+PILOT_SIMS_PER_CRITERIA = 10
+CHUNKS_PER_THREAD = 10
+
+
+def get_criteria_costs_from_stats(gamestate: object, betmode: str) -> dict:
+    """Mean seconds per simulation of each criteria, from the rejection statistics of a previous run."""
+    stats_name = gamestate.output_files.get_rejections_name(betmode)
+    if not os.path.isfile(stats_name):
+        return None
+    with open(stats_name, "r", encoding="UTF-8") as f:
+        stats = json.load(f)
+    costs = {criteria: s["seconds"] / s["sims"] for criteria, s in stats.items() if s.get("seconds") and s["sims"]}
+    return costs or None
+
+
+def run_pilot(
+    gamestate: object, betmode: str, sim_allocation: dict, sims_per_criteria: int = PILOT_SIMS_PER_CRITERIA
+) -> dict:
+    """Time a few simulations of each criteria on a copy of the gamestate."""
+    pilot_state = deepcopy(gamestate)
+    pilot_state.betmode = betmode
+    pilot_sims = {}
+    for sim, criteria in sim_allocation.items():
+        if len(pilot_sims.setdefault(criteria, [])) < sims_per_criteria:
+            pilot_sims[criteria].append(sim)
+
+    costs = {}
+    for criteria, sims in pilot_sims.items():
+        pilot_state.criteria = criteria
+        start_time = time.perf_counter()
+        for sim in sims:
+            pilot_state.run_spin(sim)
+        costs[criteria] = (time.perf_counter() - start_time) / len(sims)
+    return costs
+
+
+def get_criteria_costs(gamestate: object, betmode: str, sim_allocation: dict, criteria_scheduling: object) -> dict:
+    """Resolve 'pilot', 'previous' (falling back to a pilot run) or user supplied {criteria: cost} estimates."""
+    if isinstance(criteria_scheduling, dict):
+        return criteria_scheduling
+    if criteria_scheduling == "previous":
+        costs = get_criteria_costs_from_stats(gamestate, betmode)
+        if costs is not None:
+            return costs
+        print("No previous simulation statistics found for", betmode, "running a pilot.")
+    elif criteria_scheduling != "pilot":
+        raise ValueError(f"Unknown criteria_scheduling: {criteria_scheduling}")
+    return run_pilot(gamestate, betmode, sim_allocation)
+
+
+def get_cost_ordered_chunks(sims: range, sim_allocation: dict, costs: dict, chunk_size: int) -> list:
+    """Criteria-homogeneous chunks of simulation ids, most expensive first."""
+    default_cost = sum(costs.values()) / len(costs) if costs else 1.0
+    criteria_sims = {}
+    for sim in sims:
+        criteria_sims.setdefault(sim_allocation[sim], []).append(sim)
+
+    chunks = []
+    for criteria, criteria_ids in criteria_sims.items():
+        for idx in range(0, len(criteria_ids), chunk_size):
+            chunk = criteria_ids[idx : idx + chunk_size]
+            chunks.append((costs.get(criteria, default_cost) * len(chunk), chunk))
+    chunks.sort(key=lambda x: -x[0])
+    return [chunk for _, chunk in chunks]
+
+
+def fill_sim_queue(sim_queue: object, chunks: list, threads: int) -> None:
+    """Queue all chunks, followed by a stop signal for each worker."""
+    for chunk in chunks:
+        sim_queue.put(chunk)
+    for _ in range(threads):
+        sim_queue.put(None)
+
+
+def iter_queued_sims(sim_queue: object):
+    """Yield simulation ids from queued chunks until the stop signal."""
+    while True:
+        chunk = sim_queue.get()
+        if chunk is None:
+            return
+        yield from chunk
@@ -0,0 +1,90 @@
+"""Speculative seed search, resolving rare criteria simulations across the worker pool.
+
+Each attempt of a speculative simulation is seeded with its own deterministic sub-seed. Candidate sub-seeds are
+searched in windows spread over a process pool, and the lowest accepted sub-seed index is kept, independently of
+scheduling. The simulation is then replayed from that sub-seed by its regular worker, producing a single attempt.
+Attempts must only draw from the global `random` module for the replay to be identical.
+"""
+
+import time
+from multiprocessing import Pool
+
+from src.state.rejections import RetryBudgetExceeded
+
+SEARCH_STATE = None
+
+
+class SeedWindowExhausted(Exception):
+    """Every sub-seed in the searched window was rejected."""
+
+
+def get_sub_seed(sim: int, attempt: int) -> int:
+    """Seed of a single attempt of a speculative simulation."""
+    return ((sim + 1) << 32) + attempt
+
+
+def init_search_worker(gamestate: object, betmode: str) -> None:
+    """Keep a private gamestate in each pool worker."""
+    global SEARCH_STATE
+    SEARCH_STATE = gamestate
+    SEARCH_STATE.betmode = betmode
+
+
+def search_sub_seeds(task: tuple) -> int:
+    """Lowest accepted sub-seed index in [start, stop), or None."""
+    sim, criteria, start, stop = task
+    gamestate = SEARCH_STATE
+    gamestate.library = {}
+    gamestate.recorded_events = {}
+    gamestate.criteria = criteria
+    gamestate.seed_window = (start, stop)
+    try:
+        gamestate.run_spin(sim)
+    except SeedWindowExhausted:
+        return None
+    finally:
+        gamestate.seed_window = None
+    return start + gamestate.rejections.attempts - 1
+
+
+def resolve_speculative_seeds(
+    gamestate: object, betmode: str, sim_to_criteria: dict, threads: int, window_size: int = 64
+) -> dict:
+    """Find the accepted sub-seed index of every simulation, searching threads windows per simulation per round."""
+    if not sim_to_criteria:
+        return {}
+    start_time = time.time()
+    gamestate.betmode = betmode
+    pending = dict(sim_to_criteria)
+    resolved = {}
+    next_start = 0
+    with Pool(threads, initializer=init_search_worker, initargs=(gamestate, betmode)) as pool:
+        while pending:
+            tasks = []
+            for sim, criteria in pending.items():
+                gamestate.criteria = criteria
+                budget = gamestate.get_retry_budget()
+                if budget is not None and next_start > budget:
+                    raise RetryBudgetExceeded(
+                        f"\nRetry budget of {budget} exceeded during speculative search:\n"
+                        f" Betmode: {betmode}\n Criteria: {criteria}\n Simulation: {sim}\n"
+                        f" Distribution conditions: {gamestate.get_current_distribution_conditions()}"
+                    )
+                for window in range(threads):
+                    start = next_start + window * window_size
+                    stop = start + window_size if budget is None else min(start + window_size, budget + 1)
+                    if start < stop:
+                        tasks.append((sim, criteria, start, stop))
+
+            for (sim, _, _, _), index in zip(tasks, pool.map(search_sub_seeds, tasks)):
+                if index is not None and sim not in resolved:
+                    resolved[sim] = index
+            pending = {sim: criteria for sim, criteria in pending.items() if sim not in resolved}
+            next_start += threads * window_size
+
+    if resolved:
+        print(
+            f"Resolved {len(resolved)} speculative simulations in {round(time.time() - start_time, 2)}s",
+            f"(mean sub-seed index: {round(sum(resolved.values()) / len(resolved), 1)}, max: {max(resolved.values())})",
+        )
+    return resolved
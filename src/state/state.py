@@ -1,3 +1,5 @@
+import os
+import time
 from copy import copy
 from abc import ABC, abstractmethod
 from warnings import warn
@@ -8,13 +10,22 @@ from src.wins.win_manager import WinManager
 from src.calculations.symbol import SymbolStorage
 from src.config.output_filenames import OutputFiles
 from src.state.books import Book
+from src.state.telemetry import SimulationTelemetry
+from src.state.phase_timers import PhaseTimer, timed_phase, get_active_timer, set_active_timer
+from src.state.rejections import RejectionStats
+from src.state.speculative import SeedWindowExhausted, get_sub_seed
+from src.state.scheduling import iter_queued_sims
+from src.state.criteria_context import CriteriaContext
 from src.write_data.write_data import (
     print_recorded_wins,
     make_lookup_tables,
     write_json,
     make_lookup_pay_split,
     write_library_events,
+    write_rejection_stats,
+    get_library_event_items,
 )
+from src.write_data.book_writer import BookWriter
 
 
 class GeneralGameState(ABC):
@@ -35,6 +46,10 @@ class GeneralGameState(ABC):
         self.book = Book(self.sim, self.criteria)
         self.repeat = True
         self.repeat_count = 0
+        self.rejections = RejectionStats()
+        self.seed_window = None
+        self.betmode_lookup = {}
+        self.criteria_contexts = {}
         self.win_data = {
             "totalWin": 0,
             "wins": [],
@@ -63,6 +78,15 @@ class GeneralGameState(ABC):
 
     def reset_book(self) -> None:
         """Reset global simulation variables."""
+        if self.rejections.attempts > 0 and get_active_timer() is not None:
+            get_active_timer().reject_attempt()
+        if self.seed_window is not None:
+            attempt = self.seed_window[0] + self.rejections.attempts
+            if attempt >= self.seed_window[1]:
+                raise SeedWindowExhausted(f"Simulation {self.sim} rejected sub-seeds {self.seed_window}")
+        self.rejections.start_attempt(self)
+        if self.seed_window is not None:
+            random.seed(get_sub_seed(self.sim, attempt))
         self.temp_wins = []
         self.board = [[[] for _ in range(self.config.num_rows[x])] for x in range(self.config.num_reels)]
         self.top_symbols = None
@@ -83,12 +107,15 @@ class GeneralGameState(ABC):
         self.gametype = self.config.basegame_type
         self.repeat = False
         self.anticipation = [0] * self.config.num_reels
+        if get_active_timer() is not None:
+            get_active_timer().start_attempt()
 
     def reset_seed(self, sim: int = 0) -> None:
         """Reset rng seed to simulation number for reproducibility."""
         random.seed(sim + 1)
         self.sim = sim
         self.repeat_count = 0
+        self.rejections.start_sim()
 
     def reset_fs_spin(self) -> None:
         """Use if using repeat during freespin games."""
@@ -99,31 +126,56 @@ class GeneralGameState(ABC):
 
     def get_betmode(self, mode_name) -> object:
         """Return all current betmode information."""
+        betmode = self.betmode_lookup.get(mode_name)
+        if betmode is not None:
+            return betmode
         for betmode in self.config.bet_modes:
             if betmode.get_name() == mode_name:
+                self.betmode_lookup[mode_name] = betmode
                 return betmode
         print("\nWarning: betmode couldn't be retrieved\n")
 
+    def get_criteria_context(self) -> CriteriaContext:
+        """Return the resolved betmode/distribution information for the current betmode and criteria."""
+        key = (self.betmode, self.criteria)
+        context = self.criteria_contexts.get(key)
+        if context is None:
+            betmode = self.betmode_lookup.get(self.betmode)
+            if betmode is None:
+                betmode = next((b for b in self.config.bet_modes if b.get_name() == self.betmode), None)
+            context = CriteriaContext(betmode, self.criteria)
+            self.criteria_contexts[key] = context
+        return context
+
+    def clear_criteria_contexts(self) -> None:
+        """Drop cached betmode lookups, required after config.bet_modes is modified."""
+        self.betmode_lookup = {}
+        self.criteria_contexts = {}
+
     def get_current_betmode(self) -> object:
         """Get current betmode information."""
-        for betmode in self.config.bet_modes:
-            if betmode.get_name() == self.betmode:
-                return betmode
+        return self.get_criteria_context().betmode
 
     def get_current_betmode_distributions(self) -> object:
         """Return current betmode criteria information."""
-        dist = self.get_current_betmode().get_distributions()
-        for c in dist:
-            if c._criteria == self.criteria:
-                return c
-        raise RuntimeError("Could not locate criteria distribution.")
+        distribution = self.get_criteria_context().distribution
+        if distribution is None:
+            raise RuntimeError("Could not locate criteria distribution.")
+        return distribution
 
     def get_current_distribution_conditions(self) -> dict:
         """Return requirements for criteria setup/acceptance."""
-        for d in self.get_betmode(self.betmode).get_distributions():
-            if d._criteria == self.criteria:
-                return d._conditions
-        return RuntimeError("Could not locate betmode conditions")
+        context = self.get_criteria_context()
+        if context.conditions is None:
+            return RuntimeError("Could not locate betmode conditions")
+        return context.conditions
+
+    def get_retry_budget(self) -> int:
+        """Maximum rejected attempts per simulation for the current criteria, None if unlimited."""
+        budget = self.get_current_betmode_distributions().get_retry_budget()
+        if budget is None:
+            budget = getattr(self.config, "retry_budget", None)
+        return budget
 
     def check_current_repeat_count(self, warn_after_count: int = 1000):
         """Alert user to high repeat count."""
@@ -162,6 +214,7 @@ class GeneralGameState(ABC):
                 if key not in self.get_betmode(betmode_name).get_force_keys():  # type:ignore
                     self.get_betmode(betmode_name).add_force_key(key)  # type:ignore
 
+    @timed_phase("imprint_wins")
     def imprint_wins(self) -> None:
         """Record all events to library if criteria conditions are satisfied."""
         for temp_win_index in range(int(len(self.temp_wins) / 2)):
@@ -181,6 +234,7 @@ class GeneralGameState(ABC):
         self.temp_wins = []
         self.library[self.sim + 1] = copy(self.book.to_json())
         self.win_manager.update_end_round_wins()
+        self.win_manager.record_criteria_win(self.criteria, self.book.payout_multiplier)
 
     def update_final_win(self) -> None:
         """Separate base and freegame wins, verify the sum of there are equal to the final simulation payout."""
@@ -209,16 +263,26 @@ class GeneralGameState(ABC):
     def check_repeat(self) -> None:
         """Checks if the spin failed a criteria constraint at any point."""
         if self.repeat is False:
-            win_criteria = self.get_current_betmode_distributions().get_win_criteria()
-            if win_criteria is not None and self.final_win != win_criteria:
+            context = self.get_criteria_context()
+            if context.distribution is None:
+                raise RuntimeError("Could not locate criteria distribution.")
+            if context.win_criteria is not None and self.final_win != context.win_criteria:
                 self.repeat = True
 
-            if self.get_current_distribution_conditions()["force_freegame"] and not (self.triggered_freegame):
+            if context.conditions["force_freegame"] and not (self.triggered_freegame):
                 self.repeat = True
 
         self.repeat_count += 1
         self.check_current_repeat_count()
 
+    def flush_books(self, book_writer: BookWriter, book_ids: list, event_items: dict) -> None:
+        """Hand completed books to the background writer, keeping only their lookup table fields."""
+        books = [self.library[book_id] for book_id in book_ids]
+        get_library_event_items(books, event_items)
+        book_writer.write_chunk(books)
+        for book in books:
+            self.library[book["id"]] = {k: v for k, v in book.items() if k != "events"}
+
     @abstractmethod
     def run_spin(self, sim):
         """run_spin should be defined in gamestate."""
@@ -241,19 +305,69 @@ class GeneralGameState(ABC):
         repeat_count,
         compress=True,
         write_event_list=True,
+        sim_offset=0,
+        win_statistics=None,
+        telemetry_channel=None,
+        phase_timings=None,
+        speculative_seeds=None,
+        sim_queue=None,
+        book_chunk_size=None,
     ) -> None:
         """Assigns criteria and runs individual simulations. Results are stored in temporary file to be combined when all threads are finished."""
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type)
         self.library = {}
         self.betmode = betmode
         self.num_sims = num_sims
-        for sim in range(
-            thread_index * num_sims + (total_threads * num_sims) * repeat_count,
-            (thread_index + 1) * num_sims + (total_threads * num_sims) * repeat_count,
-        ):
+        self.rejections = RejectionStats()
+        telemetry = None
+        if telemetry_channel is not None:
+            telemetry = SimulationTelemetry(telemetry_channel, betmode, thread_index, repeat_count)
+        timer = None
+        if phase_timings is not None:
+            timer = PhaseTimer(self)
+            set_active_timer(timer)
+        temp_book_name = self.output_files.get_temp_multi_thread_name(
+            betmode, thread_index, repeat_count, (compress) * True + (not compress) * False
+        )
+        book_writer, event_items, pending_books = None, None, []
+        if book_chunk_size is not None:
+            book_writer = BookWriter(temp_book_name, self.config.output_regular_json)
+            event_items = {}
+        if sim_queue is None:
+            sims = range(
+                sim_offset + thread_index * num_sims + (total_threads * num_sims) * repeat_count,
+                sim_offset + (thread_index + 1) * num_sims + (total_threads * num_sims) * repeat_count,
+            )
+        else:
+            sims = iter_queued_sims(sim_queue)
+        for sim in sims:
             self.criteria = sim_to_criteria[sim]
-            self.run_spin(sim)
+            if speculative_seeds is not None and sim in speculative_seeds:
+                self.seed_window = (speculative_seeds[sim], speculative_seeds[sim] + 1)
+            if timer is not None:
+                timer.start()
+                spin_start = time.perf_counter_ns()
+                self.run_spin(sim)
+                timer.stop("other", time.perf_counter_ns() - spin_start)
+            else:
+                self.run_spin(sim)
+            self.seed_window = None
+            self.rejections.finish_sim(self.criteria)
+            if telemetry is not None:
+                telemetry.record_sim(self)
+            if book_writer is not None:
+                pending_books.append(sim + 1)
+                if len(pending_books) >= book_chunk_size:
+                    self.flush_books(book_writer, pending_books, event_items)
+                    pending_books = []
+        if book_writer is not None:
+            self.flush_books(book_writer, pending_books, event_items)
+            book_writer.close()
         mode_cost = self.get_current_betmode().get_cost()
+        if sim_queue is not None:
+            # Dynamically scheduled simulations are written in id order, to be merged by id
+            self.library = dict(sorted(self.library.items()))
+            num_sims = max(len(self.library), 1)
 
         print(
             "Thread " + str(thread_index),
@@ -264,16 +378,26 @@ class GeneralGameState(ABC):
             flush=True,
         )
 
-        write_json(
-            self,
-            self.output_files.get_temp_multi_thread_name(
-                betmode, thread_index, repeat_count, (compress) * True + (not compress) * False
-            ),
-        )
+        if book_writer is None:
+            write_json(self, temp_book_name)
         print_recorded_wins(self, self.output_files.get_temp_force_name(betmode, thread_index, repeat_count))
         make_lookup_tables(self, self.output_files.get_temp_lookup_name(betmode, thread_index, repeat_count))
         make_lookup_pay_split(self, self.output_files.get_temp_segmented_name(betmode, thread_index, repeat_count))
+        write_rejection_stats(
+            self.rejections.get_totals(), self.output_files.get_temp_rejection_name(betmode, thread_index, repeat_count)
+        )
 
         if write_event_list:
-            write_library_events(self, list(self.library.values()), betmode)
+            if book_writer is None:
+                write_library_events(self, list(self.library.values()), betmode)
+            else:
+                write_library_events(self, [], betmode, event_items)
         betmode_copy_list.append(self.config.bet_modes)
+        if win_statistics is not None:
+            win_statistics.append(self.win_manager.get_cumulative_statistics())
+        if timer is not None:
+            phase_timings.append(timer.get_totals())
+            set_active_timer(None)
+        if telemetry is not None:
+            telemetry.bytes_written = os.path.getsize(temp_book_name)
+            telemetry.push(finished=True)
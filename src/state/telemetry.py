@@ -0,0 +1,178 @@
+"""Live progress and throughput telemetry for simulation workers."""
+
+import json
+import time
+import threading
+from queue import Empty
+from collections import defaultdict
+from datetime import datetime
+
+from src.events.event_constants import EventConstants
+
+
+class SimulationTelemetry:
+    """Worker-side counters, periodically pushed to the parent process."""
+
+    def __init__(self, channel, betmode: str, thread_index: int, repeat_count: int, interval: float = 1.0):
+        self.channel = channel
+        self.betmode = betmode
+        self.thread_index = thread_index
+        self.repeat_count = repeat_count
+        self.interval = interval
+        self.start_time = time.perf_counter()
+        self.last_push = self.start_time
+        self.sims = 0
+        self.spins = 0
+        self.events = 0
+        self.tumbles = 0
+        self.max_tumble_depth = 0
+        self.bytes_written = 0
+        self.criteria_sims = defaultdict(int)
+        self.criteria_repeats = defaultdict(int)
+
+    def record_sim(self, gamestate: object) -> None:
+        """Update counters from a completed simulation."""
+        self.sims += 1
+        self.spins += max(gamestate.repeat_count, 1)
+        self.events += len(gamestate.book.events)
+        tumble_depth = sum(1 for e in gamestate.book.events if e["type"] == EventConstants.TUMBLE_BOARD.value)
+        self.tumbles += tumble_depth
+        self.max_tumble_depth = max(self.max_tumble_depth, tumble_depth)
+        self.criteria_sims[gamestate.criteria] += 1
+        self.criteria_repeats[gamestate.criteria] += max(gamestate.repeat_count - 1, 0)
+        if time.perf_counter() - self.last_push >= self.interval:
+            self.push()
+
+    def push(self, finished: bool = False) -> None:
+        """Send cumulative counters for this worker batch."""
+        self.last_push = time.perf_counter()
+        elapsed = max(self.last_push - self.start_time, 1e-9)
+        self.channel.put(
+            {
+                "betmode": self.betmode,
+                "thread": self.thread_index,
+                "repeat": self.repeat_count,
+                "finished": finished,
+                "elapsed_seconds": round(elapsed, 3),
+                "sims": self.sims,
+                "spins": self.spins,
+                "sims_per_second": round(self.sims / elapsed, 2),
+                "spins_per_second": round(self.spins / elapsed, 2),
+                "events_per_book": round(self.events / max(self.sims, 1), 2),
+                "mean_tumble_depth": round(self.tumbles / max(self.sims, 1), 3),
+                "max_tumble_depth": self.max_tumble_depth,
+                "criteria_sims": dict(self.criteria_sims),
+                "criteria_repeats": dict(self.criteria_repeats),
+                "bytes_written": self.bytes_written,
+            }
+        )
+
+
+class TelemetryMonitor:
+    """Parent-side listener which renders progress and writes all worker updates to a JSON-lines file."""
+
+    def __init__(self, channel, metrics_name: str, betmode: str, total_sims: int, render_interval: float = 2.0):
+        self.channel = channel
+        self.metrics_name = metrics_name
+        self.betmode = betmode
+        self.total_sims = total_sims
+        self.render_interval = render_interval
+        self.workers = {}
+        self.start_time = time.perf_counter()
+        self.last_render = self.start_time
+        self.stop_event = threading.Event()
+        self.listener = threading.Thread(target=self.listen, daemon=True)
+
+    def start(self) -> None:
+        """Begin draining the telemetry channel."""
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Drain remaining updates and write the mode summary."""
+        self.stop_event.set()
+        self.listener.join()
+        self.drain()
+        summary = self.get_summary()
+        summary["type"] = "summary"
+        self.write_line(summary)
+        self.render(final=True)
+
+    def listen(self) -> None:
+        """Background loop collecting worker updates."""
+        while not self.stop_event.is_set():
+            self.drain(timeout=0.2)
+            if time.perf_counter() - self.last_render >= self.render_interval:
+                self.render()
+
+    def drain(self, timeout: float = 0.0) -> None:
+        """Read all pending updates from the channel."""
+        while True:
+            try:
+                update = self.channel.get(timeout=timeout) if timeout > 0 else self.channel.get_nowait()
+            except Empty:
+                return
+            timeout = 0.0
+            self.workers[(update["thread"], update["repeat"])] = update
+            update["type"] = "worker"
+            update["time"] = datetime.now().isoformat(timespec="seconds")
+            self.write_line(update)
+
+    def write_line(self, record: dict) -> None:
+        """Append a single record to the metrics file."""
+        with open(self.metrics_name, "a", encoding="UTF-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def get_summary(self) -> dict:
+        """Aggregate the latest counters of all workers."""
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        summary = {
+            "betmode": self.betmode,
+            "elapsed_seconds": round(elapsed, 3),
+            "sims": 0,
+            "spins": 0,
+            "bytes_written": 0,
+            "criteria_sims": defaultdict(int),
+            "criteria_repeats": defaultdict(int),
+        }
+        events, tumbles, max_tumble_depth = 0.0, 0.0, 0
+        for update in self.workers.values():
+            summary["sims"] += update["sims"]
+            summary["spins"] += update["spins"]
+            summary["bytes_written"] += update["bytes_written"]
+            events += update["events_per_book"] * update["sims"]
+            tumbles += update["mean_tumble_depth"] * update["sims"]
+            max_tumble_depth = max(max_tumble_depth, update["max_tumble_depth"])
+            for c, n in update["criteria_sims"].items():
+                summary["criteria_sims"][c] += n
+            for c, n in update["criteria_repeats"].items():
+                summary["criteria_repeats"][c] += n
+
+        summary["sims_per_second"] = round(summary["sims"] / elapsed, 2)
+        summary["spins_per_second"] = round(summary["spins"] / elapsed, 2)
+        summary["events_per_book"] = round(events / max(summary["sims"], 1), 2)
+        summary["mean_tumble_depth"] = round(tumbles / max(summary["sims"], 1), 3)
+        summary["max_tumble_depth"] = max_tumble_depth
+        summary["mean_repeats"] = {
+            c: round(summary["criteria_repeats"][c] / n, 2) for c, n in summary["criteria_sims"].items() if n > 0
+        }
+        summary["criteria_sims"] = dict(summary["criteria_sims"])
+        summary["criteria_repeats"] = dict(summary["criteria_repeats"])
+        return summary
+
+    def render(self, final: bool = False) -> None:
+        """Print progress, throughput, ETA and the criteria with the highest mean repeat count."""
+        self.last_render = time.perf_counter()
+        summary = self.get_summary()
+        if summary["sims"] == 0:
+            return
+        remaining = max(self.total_sims - summary["sims"], 0)
+        eta = remaining / summary["sims_per_second"] if summary["sims_per_second"] > 0 else float("inf")
+        slowest = max(summary["mean_repeats"].items(), key=lambda x: x[1])
+        print(
+            f"[{self.betmode}] {summary['sims']}/{self.total_sims} sims",
+            f"({round(100 * summary['sims'] / max(self.total_sims, 1), 1)}%)",
+            f"| {summary['sims_per_second']} sims/s, {summary['spins_per_second']} spins/s",
+            f"| {'finished in ' + str(summary['elapsed_seconds']) + 's' if final else 'ETA ' + str(round(eta, 1)) + 's'}",
+            f"| max mean repeats: {slowest[0]} ({slowest[1]})",
+            flush=True,
+        )
@@ -0,0 +1,79 @@
+"""Worker start methods and startup timing for simulation processes.
+
+With start_method="forkserver", a template process imports the game package (gamestate, game_config and the
+SDK modules they depend on) once, and every simulation worker is forked from it. This only preloads modules:
+each worker still unpickles the whole gamestate, including its config, reels and paytable, so worker setup is
+not cheaper than with "fork", which shares the parent's memory directly. The option exists for platforms where
+"fork" is unavailable or unsafe, and the printed startup times make the cost of each start method visible.
+"""
+
+import os
+import sys
+import time
+import multiprocessing
+from multiprocessing import forkserver
+
+SDK_PRELOAD_MODULES = [
+    "src.state.state",
+    "src.state.run_sims",
+    "src.write_data.write_data",
+    "src.write_data.book_writer",
+    "zstandard",
+]
+
+
+def get_preload_modules(gamestate: object) -> list:
+    """Game and SDK modules to import in the forkserver template."""
+    modules = [type(gamestate).__module__, type(gamestate.config).__module__]
+    return [m for m in modules + SDK_PRELOAD_MODULES if m in sys.modules]
+
+
+def get_module_root(module_name: str) -> str:
+    """Directory a (possibly dotted) module is imported from."""
+    spec = sys.modules[module_name.split(".")[0]].__spec__
+    if spec.submodule_search_locations:
+        return os.path.dirname(list(spec.submodule_search_locations)[0])
+    return os.path.dirname(spec.origin)
+
+
+def get_worker_context(gamestate: object, start_method: str = None) -> object:
+    """Multiprocessing context for simulation workers, preloading the game for forkserver."""
+    if start_method is None:
+        return multiprocessing.get_context()
+    context = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        preload_modules = get_preload_modules(gamestate)
+        # The forkserver does not inherit sys.path, game folders are only importable through PYTHONPATH
+        game_modules = [type(gamestate).__module__, type(gamestate.config).__module__, "src"]
+        python_path = os.environ.get("PYTHONPATH")
+        paths = (python_path or "").split(os.pathsep)
+        for root in dict.fromkeys(get_module_root(m) for m in game_modules if m in sys.modules):
+            if root not in paths:
+                paths.insert(0, root)
+        context.set_forkserver_preload(preload_modules)
+        # Only the forkserver launch reads the environment, later subprocesses get the original PYTHONPATH
+        os.environ["PYTHONPATH"] = os.pathsep.join(p for p in paths if p)
+        try:
+            forkserver.ensure_running()
+        finally:
+            if python_path is None:
+                del os.environ["PYTHONPATH"]
+            else:
+                os.environ["PYTHONPATH"] = python_path
+    return context
+
+
+def start_worker(launch_time: float, startup_times: object, target: object, *args) -> None:
+    """Record the time from Process.start() until the worker is ready to simulate, then run the target."""
+    startup_times.append(time.time() - launch_time)
+    target(*args)
+
+
+def print_startup_summary(startup_times: list, start_method: str) -> None:
+    """Summarise worker startup times."""
+    if startup_times:
+        print(
+            f"Worker startup ({start_method or multiprocessing.get_start_method()}):",
+            f"mean {round(1e3 * sum(startup_times) / len(startup_times), 1)} ms,",
+            f"max {round(1e3 * max(startup_times), 1)} ms over {len(startup_times)} workers.",
+        )
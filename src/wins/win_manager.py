@@ -13,6 +13,9 @@ class WinManager:
         self.total_cumulative_wins = 0
         self.cumulative_base_wins = 0
         self.cumulative_free_wins = 0
+        self.cumulative_squared_wins = 0
+        self.completed_rounds = 0
+        self.criteria_statistics = {}
 
         # Base-game and free-game wins for a specific simulation
         self.running_bet_win = 0.0
@@ -54,6 +57,19 @@ class WinManager:
         self.total_cumulative_wins += self.basegame_wins + self.freegame_wins
         self.cumulative_base_wins += self.basegame_wins
         self.cumulative_free_wins += self.freegame_wins
+        self.cumulative_squared_wins += (self.basegame_wins + self.freegame_wins) ** 2
+        self.completed_rounds += 1
+
+    def record_criteria_win(self, criteria: str, payout: float):
+        """Accumulate the final (capped) payout of a simulation under its criteria."""
+        statistics = self.criteria_statistics.setdefault(criteria, {"sims": 0, "wins": 0.0, "squared_wins": 0.0})
+        statistics["sims"] += 1
+        statistics["wins"] += payout
+        statistics["squared_wins"] += payout**2
+
+    def get_cumulative_statistics(self) -> dict:
+        """Return summed round wins and squared round wins per criteria, for convergence estimates."""
+        return {criteria: dict(statistics) for criteria, statistics in self.criteria_statistics.items()}
 
     def reset_end_round_wins(self):
         """Reset wins at end of gameround/simulation."""
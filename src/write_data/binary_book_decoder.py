@@ -0,0 +1,203 @@
+"""Decoder for binary book files written by binary_book_encoder, and conversion back to RGS .jsonl books."""
+
+import json
+import struct
+import zstandard as zstd
+
+from src.write_data.binary_book_encoder import (
+    BINARY_BOOK_MAGIC,
+    TAG_NULL,
+    TAG_FALSE,
+    TAG_TRUE,
+    TAG_INT,
+    TAG_FLOAT,
+    TAG_INT_FLOAT,
+    TAG_STRING,
+    TAG_LIST,
+    TAG_DICT,
+    TAG_SYMBOL,
+    TAG_GRID,
+    TAG_POSITION,
+    TAG_BLOB,
+)
+
+UNPACK_DOUBLE = struct.Struct("<d").unpack_from
+
+
+def read_varint(data: bytes, pos: int) -> tuple:
+    """Unsigned LEB128 varint at pos, returns (value, next position)."""
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value, shift = byte & 0x7F, 7
+    pos += 1
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+class BinaryBookReader:
+    """Iterate over the books of a binary book file."""
+
+    def __init__(self, filename: str):
+        with open(filename, "rb") as f:
+            data = f.read()
+        if filename.endswith(".zst"):
+            with zstd.ZstdDecompressor().stream_reader(data, read_across_frames=True) as reader:
+                data = reader.read()
+        if data[:4] != BINARY_BOOK_MAGIC:
+            raise RuntimeError(f"{filename} is not a binary book file.")
+        self.data = data
+        pos = 4
+        tables = []
+        for _ in range(2):
+            size, pos = read_varint(data, pos)
+            table = []
+            for _ in range(size):
+                length, pos = read_varint(data, pos)
+                table.append(data[pos : pos + length].decode("UTF-8"))
+                pos += length
+            tables.append(table)
+        self.strings = tables[0]
+        self.symbols = [json.loads(symbol) for symbol in tables[1]]
+        self.num_books, self.books_start = read_varint(data, pos)
+        self.decode = self.make_decoder()
+
+    def __len__(self) -> int:
+        return self.num_books
+
+    def __iter__(self):
+        return self.iter_books()
+
+    def decode_value(self, pos: int, skip_events: bool = False) -> tuple:
+        """Decode the value at pos, returns (value, next position)."""
+        if skip_events:
+            return self.decode_summary(pos)
+        return self.decode(pos)
+
+    def decode_summary(self, pos: int) -> tuple:
+        """Decode a book without its events."""
+        data, strings = self.data, self.strings
+        if data[pos] != TAG_DICT:
+            return self.decode(pos)
+        size, pos = read_varint(data, pos + 1)
+        value = {}
+        for _ in range(size):
+            key, pos = read_varint(data, pos)
+            if data[pos] == TAG_BLOB:
+                length, pos = read_varint(data, pos + 1)
+                value[strings[key]], pos = None, pos + length
+            else:
+                value[strings[key]], pos = self.decode(pos)
+        return value, pos
+
+    def make_decoder(self):
+        """Recursive decoder bound to this file's data and tables, with a fast path for single byte varints."""
+        data, strings, symbols = self.data, self.strings, self.symbols
+        symbols_fit_byte = len(symbols) <= 0x80
+
+        def varint(pos):
+            byte = data[pos]
+            if byte < 0x80:
+                return byte, pos + 1
+            return read_varint(data, pos)
+
+        def decode(pos):
+            tag = data[pos]
+            pos += 1
+            if tag == TAG_STRING:
+                idx = data[pos]
+                if idx < 0x80:
+                    return strings[idx], pos + 1
+                idx, pos = read_varint(data, pos)
+                return strings[idx], pos
+            if tag == TAG_INT:
+                value = data[pos]
+                if value < 0x80:
+                    return (value >> 1 if not value & 1 else -((value + 1) >> 1)), pos + 1
+                value, pos = read_varint(data, pos)
+                return unzigzag(value), pos
+            if tag == TAG_DICT:
+                size, pos = varint(pos)
+                value = {}
+                for _ in range(size):
+                    key = data[pos]
+                    if key < 0x80:
+                        pos += 1
+                    else:
+                        key, pos = read_varint(data, pos)
+                    value[strings[key]], pos = decode(pos)
+                return value, pos
+            if tag == TAG_LIST:
+                size, pos = varint(pos)
+                value = [None] * size
+                for idx in range(size):
+                    value[idx], pos = decode(pos)
+                return value, pos
+            if tag == TAG_POSITION:
+                reel, pos = varint(pos)
+                row, pos = varint(pos)
+                return {"reel": reel, "row": row}, pos
+            if tag == TAG_SYMBOL:
+                idx, pos = varint(pos)
+                return symbols[idx].copy(), pos
+            if tag == TAG_GRID:
+                num_reels, pos = varint(pos)
+                value = []
+                for _ in range(num_reels):
+                    num_rows, pos = varint(pos)
+                    if symbols_fit_byte:
+                        value.append([symbols[idx].copy() for idx in data[pos : pos + num_rows]])
+                        pos += num_rows
+                    else:
+                        reel = []
+                        for _ in range(num_rows):
+                            idx, pos = varint(pos)
+                            reel.append(symbols[idx].copy())
+                        value.append(reel)
+                return value, pos
+            if tag == TAG_BLOB:
+                size, pos = varint(pos)
+                return decode(pos)[0], pos + size
+            if tag == TAG_INT_FLOAT:
+                value, pos = varint(pos)
+                return float(unzigzag(value)), pos
+            if tag == TAG_FLOAT:
+                return UNPACK_DOUBLE(data, pos)[0], pos + 8
+            if tag == TAG_TRUE:
+                return True, pos
+            if tag == TAG_FALSE:
+                return False, pos
+            if tag == TAG_NULL:
+                return None, pos
+            raise RuntimeError(f"Unknown binary book tag {tag} at byte {pos - 1}")
+
+        return decode
+
+    def iter_books(self, skip_events: bool = False):
+        """Yield decoded books. With skip_events, the events are not decoded and "events" is None."""
+        pos = self.books_start
+        for _ in range(self.num_books):
+            length, pos = read_varint(self.data, pos)
+            book, _ = self.decode_value(pos, skip_events)
+            pos += length
+            yield book
+
+
+def convert_binary_to_jsonl(binary_file: str, books_file: str) -> None:
+    """Write the RGS .jsonl(.zst) books of a binary book file."""
+    text = "".join(json.dumps(book) + "\n" for book in BinaryBookReader(binary_file))
+    if books_file.endswith(".zst"):
+        with open(books_file, "wb") as f:
+            f.write(zstd.ZstdCompressor().compress(text.encode("UTF-8")))
+    else:
+        with open(books_file, "w", encoding="UTF-8") as f:
+            f.write(text)
@@ -0,0 +1,213 @@
+"""Compact binary encoding of simulation books, for internal pipelines which do not need JSON.
+
+File layout (optionally zstd compressed when the filename ends with .zst):
+    magic, string table, symbol table, number of books, then one length-prefixed record per book.
+
+Strings (dictionary keys, event types, criteria, ...) are written once in the string table and referenced by
+id. Symbols ({"name": "H1"}, {"name": "S", "scatter": true}, ...) are interned in the symbol table, so boards
+become grids of symbol ids. Board positions ({"reel": r, "row": c}) and integers are written as varints. The
+events of a book are length-prefixed, so readers can skip them. Decoding is exact: json.dumps() of a decoded
+book reproduces the line written to the .jsonl books.
+"""
+
+import json
+import math
+import struct
+import zstandard as zstd
+
+from src.write_data.write_data import read_zst_text
+from src.write_data.book_archive import load_book_dictionary
+
+BINARY_BOOK_MAGIC = b"SBK1"
+
+TAG_NULL = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_INT_FLOAT = 5
+TAG_STRING = 6
+TAG_LIST = 7
+TAG_DICT = 8
+TAG_SYMBOL = 9
+TAG_GRID = 10
+TAG_POSITION = 11
+TAG_BLOB = 12
+
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def write_varint(value: int, out: bytearray) -> None:
+    """Append an unsigned LEB128 varint."""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def zigzag(value: int) -> int:
+    """Map signed integers to unsigned (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...)."""
+    return 2 * value if value >= 0 else -2 * value - 1
+
+
+def is_symbol(value: object) -> bool:
+    """Board symbol: a flat dictionary with a string name."""
+    return (
+        type(value) is dict
+        and isinstance(value.get("name"), str)
+        and all(isinstance(v, SCALAR_TYPES) for v in value.values())
+    )
+
+
+def is_position(value: dict) -> bool:
+    """Board position: exactly {"reel": int, "row": int}, in this key order."""
+    if len(value) != 2 or list(value) != ["reel", "row"]:
+        return False
+    return all(type(v) is int and v >= 0 for v in value.values())
+
+
+def is_grid(value: list) -> bool:
+    """Board: a list of reels, each a list of symbols."""
+    return len(value) > 0 and all(type(reel) is list for reel in value) and all(
+        is_symbol(symbol) for reel in value for symbol in reel
+    )
+
+
+class BinaryBookEncoder:
+    """Encode books into the binary format, building the string and symbol tables as books are added."""
+
+    def __init__(self):
+        self.strings = {}
+        self.symbols = {}
+        self.body = bytearray()
+        self.num_books = 0
+
+    def get_string_id(self, value: str) -> int:
+        string_id = self.strings.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings[value] = string_id
+        return string_id
+
+    def get_symbol_id(self, symbol: dict) -> int:
+        key = json.dumps(symbol)
+        symbol_id = self.symbols.get(key)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            self.symbols[key] = symbol_id
+        return symbol_id
+
+    def encode_value(self, value: object, out: bytearray) -> None:
+        """Append the encoding of a JSON-compatible value."""
+        value_type = type(value)
+        if value is None:
+            out.append(TAG_NULL)
+        elif value_type is bool:
+            out.append(TAG_TRUE if value else TAG_FALSE)
+        elif value_type is int:
+            out.append(TAG_INT)
+            write_varint(zigzag(value), out)
+        elif value_type is float:
+            if value.is_integer() and abs(value) < 2**53 and math.copysign(1.0, value) > 0:
+                out.append(TAG_INT_FLOAT)
+                write_varint(zigzag(int(value)), out)
+            else:
+                out.append(TAG_FLOAT)
+                out += struct.pack("<d", value)
+        elif value_type is str:
+            out.append(TAG_STRING)
+            write_varint(self.get_string_id(value), out)
+        elif value_type is list:
+            if is_grid(value):
+                out.append(TAG_GRID)
+                write_varint(len(value), out)
+                for reel in value:
+                    write_varint(len(reel), out)
+                    for symbol in reel:
+                        write_varint(self.get_symbol_id(symbol), out)
+            else:
+                out.append(TAG_LIST)
+                write_varint(len(value), out)
+                for item in value:
+                    self.encode_value(item, out)
+        elif value_type is dict:
+            if is_position(value):
+                out.append(TAG_POSITION)
+                write_varint(value["reel"], out)
+                write_varint(value["row"], out)
+            elif is_symbol(value):
+                out.append(TAG_SYMBOL)
+                write_varint(self.get_symbol_id(value), out)
+            else:
+                out.append(TAG_DICT)
+                write_varint(len(value), out)
+                for key, item in value.items():
+                    if type(key) is not str:
+                        raise TypeError(f"Book keys must be strings, found {key!r}")
+                    write_varint(self.get_string_id(key), out)
+                    self.encode_value(item, out)
+        else:
+            raise TypeError(f"Cannot encode {value_type.__name__} in a book")
+
+    def encode_book(self, book: dict) -> bytes:
+        """Encode a book, with its events written as a skippable blob."""
+        out = bytearray([TAG_DICT])
+        write_varint(len(book), out)
+        for key, item in book.items():
+            write_varint(self.get_string_id(key), out)
+            if key == "events":
+                events = bytearray()
+                self.encode_value(item, events)
+                out.append(TAG_BLOB)
+                write_varint(len(events), out)
+                out += events
+            else:
+                self.encode_value(item, out)
+        return bytes(out)
+
+    def add_book(self, book: dict) -> None:
+        record = self.encode_book(book)
+        write_varint(len(record), self.body)
+        self.body += record
+        self.num_books += 1
+
+    def get_bytes(self) -> bytes:
+        """Header (string and symbol tables) followed by all books."""
+        out = bytearray(BINARY_BOOK_MAGIC)
+        for table in [self.strings, self.symbols]:
+            write_varint(len(table), out)
+            for value in table:
+                data = value.encode("UTF-8")
+                write_varint(len(data), out)
+                out += data
+        write_varint(self.num_books, out)
+        out += self.body
+        return bytes(out)
+
+    def write(self, filename: str) -> int:
+        """Write all books, zstd compressed if the filename ends with .zst. Returns the number of bytes written."""
+        data = self.get_bytes()
+        if filename.endswith(".zst"):
+            data = zstd.ZstdCompressor().compress(data)
+        with open(filename, "wb") as f:
+            f.write(data)
+        return len(data)
+
+
+def write_binary_books(books, filename: str) -> int:
+    """Encode an iterable of books to a binary book file."""
+    encoder = BinaryBookEncoder()
+    for book in books:
+        encoder.add_book(book)
+    return encoder.write(filename)
+
+
+def convert_jsonl_to_binary(books_file: str, binary_file: str, dictionary_file: str = None) -> int:
+    """Convert .jsonl(.zst) books into a binary book file."""
+    if books_file.endswith(".zst"):
+        dictionary = None if dictionary_file is None else load_book_dictionary(dictionary_file)
+        text = read_zst_text(books_file, dictionary)
+    else:
+        with open(books_file, "r", encoding="UTF-8") as f:
+            text = f.read()
+    return write_binary_books((json.loads(line) for line in text.splitlines() if line), binary_file)
@@ -0,0 +1,188 @@
+"""Seekable compressed books: independent zstd frames of a fixed number of books, with a per-book index.
+
+The archive remains a valid (concatenated) zstd stream, readers decompressing across frames see the same
+books as a single-frame file. The sidecar index maps each book id to its frame and its offset within the
+decompressed frame, so a single book is read by decompressing one frame.
+
+Books may be compressed with a dictionary trained on a sample of the books of the same mode. Small frames
+compress poorly on their own, the dictionary supplies the repeated event structure instead. Decoders need the
+dictionary file written next to the books.
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+from array import array
+from bisect import bisect_left
+import zstandard as zstd
+
+BOOK_INDEX_MAGIC = b"BIX1"
+DICTIONARY_SAMPLE_BOOKS = 20000
+
+
+def get_book_id(line: str) -> int:
+    """Book id of a single line json book."""
+    if line.startswith('{"id": '):
+        return int(line[7 : line.index(",")])
+    return int(json.loads(line)["id"])
+
+
+def write_index_array(f, values: array) -> None:
+    """Write a little-endian array."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    f.write(values.tobytes())
+
+
+def read_index_array(data: bytes, offset: int, typecode: str, length: int) -> tuple:
+    """Read a little-endian array, returning the array and the offset following it."""
+    values = array(typecode)
+    size = values.itemsize * length
+    values.frombytes(data[offset : offset + size])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, offset + size
+
+
+def train_book_dictionary(lines: list, dict_size: int) -> zstd.ZstdCompressionDict:
+    """Train a zstd dictionary from books sampled evenly across a mode."""
+    stride = max(len(lines) // DICTIONARY_SAMPLE_BOOKS, 1)
+    samples = [(line + "\n").encode("UTF-8") for line in lines[::stride]]
+    start = time.time()
+    dictionary = zstd.train_dictionary(dict_size, samples)
+    sample_bytes = sum(len(sample) for sample in samples)
+    plain_bytes = sum(len(zstd.ZstdCompressor().compress(sample)) for sample in samples)
+    compressor = zstd.ZstdCompressor(dict_data=dictionary)
+    dict_bytes = sum(len(compressor.compress(sample)) for sample in samples)
+    print(
+        f"Trained {len(dictionary.as_bytes())} byte dictionary on {len(samples)} books in",
+        f"{round(time.time() - start, 2)} seconds. Single book compression ratio",
+        f"{round(sample_bytes / plain_bytes, 2)} -> {round(sample_bytes / dict_bytes, 2)} with dictionary.",
+    )
+    return dictionary
+
+
+def load_book_dictionary(dictionary_name: str) -> zstd.ZstdCompressionDict:
+    """Dictionary written next to compressed books."""
+    with open(dictionary_name, "rb") as f:
+        return zstd.ZstdCompressionDict(f.read())
+
+
+def print_compression_summary(filename: str, raw_bytes: int, compressed_bytes: int, seconds: float) -> None:
+    """Report the compression ratio and speed of a books file."""
+    print(
+        f"Compressed {os.path.basename(filename)}: {round(raw_bytes / 1e6, 2)} MB -> {round(compressed_bytes / 1e6, 2)} MB",
+        f"(ratio {round(raw_bytes / max(compressed_bytes, 1), 2)}) at {round(raw_bytes / 1e6 / max(seconds, 1e-9), 1)} MB/s.",
+    )
+
+
+def write_framed_books(
+    filename: str, index_name: str, lines, frame_size: int, dictionary: zstd.ZstdCompressionDict = None
+) -> tuple:
+    """Compress single line json books into frames of frame_size books and write the sidecar index.
+    Returns the uncompressed and compressed sizes."""
+    assert frame_size > 0, "frame_size must be a positive number of books"
+    compressor = zstd.ZstdCompressor(dict_data=dictionary)
+    raw_bytes = 0
+    book_ids, book_frames, book_offsets = array("Q"), array("Q"), array("Q")
+    frame_offsets, frame_sizes = array("Q"), array("Q")
+
+    def write_frame(f, chunk: list) -> None:
+        nonlocal raw_bytes
+        offset = 0
+        for line in chunk:
+            book_ids.append(get_book_id(line))
+            book_frames.append(len(frame_offsets))
+            book_offsets.append(offset)
+            offset += len(line.encode("UTF-8")) + 1
+        raw_bytes += offset
+        data = compressor.compress(("\n".join(chunk) + "\n").encode("UTF-8"))
+        frame_offsets.append(f.tell())
+        frame_sizes.append(len(data))
+        f.write(data)
+
+    with open(filename, "wb") as f:
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == frame_size:
+                write_frame(f, chunk)
+                chunk = []
+        if chunk:
+            write_frame(f, chunk)
+        archive_size = f.tell()
+
+    dict_id = 0 if dictionary is None else dictionary.dict_id()
+    with open(index_name, "wb") as f:
+        f.write(BOOK_INDEX_MAGIC)
+        f.write(struct.pack("<QQQQ", archive_size, len(frame_offsets), len(book_ids), dict_id))
+        for values in [frame_offsets, frame_sizes, book_ids, book_frames, book_offsets]:
+            write_index_array(f, values)
+    return raw_bytes, archive_size
+
+
+class BookArchive:
+    """Random access to the books of a framed archive written by write_framed_books()."""
+
+    def __init__(self, filename: str, index_name: str, dictionary_name: str = None):
+        self.filename = filename
+        with open(index_name, "rb") as f:
+            data = f.read()
+        if data[:4] != BOOK_INDEX_MAGIC:
+            raise RuntimeError(f"{index_name} is not a book index.")
+        archive_size, num_frames, num_books, dict_id = struct.unpack_from("<QQQQ", data, 4)
+        if os.path.getsize(filename) != archive_size:
+            raise RuntimeError(f"{index_name} does not match {filename}, rewrite the books with book_frame_size set.")
+        dictionary = None if dictionary_name is None else load_book_dictionary(dictionary_name)
+        if dict_id != (0 if dictionary is None else dictionary.dict_id()):
+            raise RuntimeError(f"{filename} was compressed with dictionary {dict_id}, pass the matching dictionary file.")
+        offset = 4 + struct.calcsize("<QQQQ")
+        self.frame_offsets, offset = read_index_array(data, offset, "Q", num_frames)
+        self.frame_sizes, offset = read_index_array(data, offset, "Q", num_frames)
+        self.book_ids, offset = read_index_array(data, offset, "Q", num_books)
+        self.book_frames, offset = read_index_array(data, offset, "Q", num_books)
+        self.book_offsets, offset = read_index_array(data, offset, "Q", num_books)
+        self.is_sorted = all(self.book_ids[i] < self.book_ids[i + 1] for i in range(num_books - 1))
+        self.positions = None if self.is_sorted else {book_id: i for i, book_id in enumerate(self.book_ids)}
+        self.decompressor = zstd.ZstdDecompressor(dict_data=dictionary)
+        self.cached_frame = (None, b"")
+
+    def __len__(self) -> int:
+        return len(self.book_ids)
+
+    def __contains__(self, book_id: int) -> bool:
+        return self.get_position(book_id) is not None
+
+    def get_position(self, book_id: int) -> int:
+        """Position of a book in the archive, None if the id is not present."""
+        if not self.is_sorted:
+            return self.positions.get(book_id)
+        position = bisect_left(self.book_ids, book_id)
+        if position < len(self.book_ids) and self.book_ids[position] == book_id:
+            return position
+        return None
+
+    def read_frame(self, frame: int) -> bytes:
+        """Decompressed contents of a single frame, the most recent frame is kept in memory."""
+        if self.cached_frame[0] != frame:
+            with open(self.filename, "rb") as f:
+                f.seek(self.frame_offsets[frame])
+                data = f.read(self.frame_sizes[frame])
+            self.cached_frame = (frame, self.decompressor.decompress(data))
+        return self.cached_frame[1]
+
+    def get_book_text(self, book_id: int) -> str:
+        """Single line json of a book."""
+        position = self.get_position(book_id)
+        if position is None:
+            raise KeyError(f"Book {book_id} is not in {self.filename}")
+        data = self.read_frame(self.book_frames[position])
+        start = self.book_offsets[position]
+        return data[start : data.index(b"\n", start)].decode("UTF-8")
+
+    def get_book(self, book_id: int) -> dict:
+        """Decoded book."""
+        return json.loads(self.get_book_text(book_id))
@@ -0,0 +1,67 @@
+"""Background writer which encodes, compresses and writes chunks of books while simulations continue."""
+
+import json
+import queue
+import threading
+import zstandard as zstd
+
+
+class BookWriter:
+    """Write chunks of books to a temporary book file from a background thread.
+
+    Compressed files receive one zstd frame per chunk (zstd releases the GIL while compressing).
+    Pending chunks are held in a bounded queue, so a slow disk blocks the simulation instead of growing memory.
+    Output is otherwise identical to write_json() for the same books.
+    """
+
+    def __init__(self, filename: str, output_regular_json: bool = True, max_pending: int = 4):
+        self.filename = filename
+        self.compress = filename.endswith(".zst")
+        self.regular_json = not self.compress and filename.endswith(".json") and output_regular_json
+        self.chunks = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.books_written = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def write_chunk(self, books: list) -> None:
+        """Queue a list of JSON-ready books, blocking while the queue is full."""
+        if self.error is not None:
+            raise self.error
+        self.chunks.put(books)
+
+    def close(self) -> None:
+        """Flush all queued chunks and wait for the writer to finish."""
+        self.chunks.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def run(self) -> None:
+        """Consume chunks until close() is called."""
+        compressor = zstd.ZstdCompressor()
+        finished = False
+        try:
+            with open(self.filename, "wb") as f:
+                if self.regular_json:
+                    f.write(b"[")
+                while True:
+                    books = self.chunks.get()
+                    if books is None:
+                        finished = True
+                        break
+                    if not books:
+                        continue
+                    if self.regular_json:
+                        separator = ", " if self.books_written else ""
+                        data = (separator + ", ".join(json.dumps(book) for book in books)).encode("UTF-8")
+                    else:
+                        data = ("\n".join(json.dumps(book) for book in books) + "\n").encode("UTF-8")
+                    f.write(compressor.compress(data) if self.compress else data)
+                    self.books_written += len(books)
+                if self.regular_json:
+                    f.write(b"]")
+        except Exception as error:  # surfaced to the simulation thread on the next write or close
+            self.error = error
+            while not finished and self.chunks.get() is not None:
+                pass
@@ -0,0 +1,155 @@
+"""Inverted index of force_record files, for fast partial search-key queries.
+
+Each (name, value) search pair maps to the sorted positions of the force_record entries containing it. A
+partial search key is the intersection of its pairs' entry arrays, and matching book ids are the concatenated
+bookIds of those entries, in force_record order. Matching is per entry (every key must appear in the same
+recorded description), exactly as when scanning the force_record list.
+
+The index is written next to force_record_<mode>.json as force_index_<mode>.npz and is rebuilt from the json
+file if it is missing or older than the force_record file.
+"""
+
+import os
+import json
+import numpy as np
+
+
+def get_force_index_path(force_record_path: str) -> str:
+    """force_index_<mode>.npz next to force_record_<mode>.json."""
+    folder, name = os.path.split(force_record_path)
+    return os.path.join(folder, "force_index_" + name[len("force_record_") : -len(".json")] + ".npz")
+
+
+class ForceIndex:
+    """Search pairs, entries and book ids of a force_record file."""
+
+    def __init__(self, arrays: dict):
+        self.pair_names = arrays["pair_names"]
+        self.pair_values = arrays["pair_values"]
+        self.pair_offsets = arrays["pair_offsets"]
+        self.pair_entries = arrays["pair_entries"]
+        self.entry_pair_offsets = arrays["entry_pair_offsets"]
+        self.entry_pairs = arrays["entry_pairs"]
+        self.entry_times = arrays["entry_times"]
+        self.entry_book_offsets = arrays["entry_book_offsets"]
+        self.book_ids = arrays["book_ids"]
+        self.pairs = {
+            (str(name), str(value)): idx for idx, (name, value) in enumerate(zip(self.pair_names, self.pair_values))
+        }
+
+    @classmethod
+    def from_force_record(cls, force_record: list) -> "ForceIndex":
+        """Build the index from the written force_record list format."""
+        pairs, pair_entries, entry_pairs, entry_pair_offsets = {}, [], [], [0]
+        entry_times, entry_book_offsets, book_ids = [], [0], []
+        for entry_idx, entry in enumerate(force_record):
+            search = {item["name"]: str(item["value"]) for item in entry["search"]}
+            for pair in search.items():
+                if pair not in pairs:
+                    pairs[pair] = len(pairs)
+                    pair_entries.append([])
+                pair_entries[pairs[pair]].append(entry_idx)
+                entry_pairs.append(pairs[pair])
+            entry_pair_offsets.append(len(entry_pairs))
+            entry_times.append(entry["timesTriggered"])
+            book_ids.extend(entry["bookIds"])
+            entry_book_offsets.append(len(book_ids))
+
+        max_id = max(book_ids, default=0)
+        return cls(
+            {
+                "pair_names": np.array([name for name, _ in pairs], dtype=str),
+                "pair_values": np.array([value for _, value in pairs], dtype=str),
+                "pair_offsets": np.cumsum([0] + [len(entries) for entries in pair_entries], dtype=np.int64),
+                "pair_entries": np.array([e for entries in pair_entries for e in entries], dtype=np.int64),
+                "entry_pair_offsets": np.array(entry_pair_offsets, dtype=np.int64),
+                "entry_pairs": np.array(entry_pairs, dtype=np.int64),
+                "entry_times": np.array(entry_times, dtype=np.int64),
+                "entry_book_offsets": np.array(entry_book_offsets, dtype=np.int64),
+                "book_ids": np.array(book_ids, dtype=np.uint32 if max_id < 2**32 else np.int64),
+            }
+        )
+
+    @classmethod
+    def load(cls, filename: str) -> "ForceIndex":
+        with np.load(filename, allow_pickle=False) as arrays:
+            return cls({key: arrays[key] for key in arrays.files})
+
+    def save(self, filename: str) -> None:
+        np.savez_compressed(
+            filename,
+            pair_names=self.pair_names,
+            pair_values=self.pair_values,
+            pair_offsets=self.pair_offsets,
+            pair_entries=self.pair_entries,
+            entry_pair_offsets=self.entry_pair_offsets,
+            entry_pairs=self.entry_pairs,
+            entry_times=self.entry_times,
+            entry_book_offsets=self.entry_book_offsets,
+            book_ids=self.book_ids,
+        )
+
+    def __len__(self) -> int:
+        return len(self.entry_times)
+
+    def get_entries(self, search_key: dict) -> np.ndarray:
+        """Sorted positions of the entries matching every (name, value) of a partial search key."""
+        entry_arrays = []
+        for pair in search_key.items():
+            idx = self.pairs.get(pair)
+            if idx is None:
+                return np.zeros(0, dtype=np.int64)
+            entry_arrays.append(self.pair_entries[self.pair_offsets[idx] : self.pair_offsets[idx + 1]])
+        if not entry_arrays:
+            return np.arange(len(self), dtype=np.int64)
+        entry_arrays.sort(key=len)
+        entries = entry_arrays[0]
+        for other in entry_arrays[1:]:
+            entries = np.intersect1d(entries, other, assume_unique=True)
+        return entries
+
+    def get_book_ids(self, search_key: dict) -> np.ndarray:
+        """bookIds of all matching entries, concatenated in force_record order (ids can repeat across entries)."""
+        entries = self.get_entries(search_key)
+        starts, stops = self.entry_book_offsets[entries], self.entry_book_offsets[entries + 1]
+        if len(entries) == 0:
+            return self.book_ids[:0]
+        lengths = stops - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return self.book_ids[positions]
+
+    def get_times_triggered(self, search_key: dict) -> int:
+        """Total timesTriggered of the matching entries."""
+        return int(self.entry_times[self.get_entries(search_key)].sum())
+
+    def get_search(self, entry: int) -> dict:
+        """{name: value} description of an entry."""
+        pairs = self.entry_pairs[self.entry_pair_offsets[entry] : self.entry_pair_offsets[entry + 1]]
+        return {str(self.pair_names[idx]): str(self.pair_values[idx]) for idx in pairs}
+
+    def iter_entries(self):
+        """Yield force_record entries without their bookIds, for summaries which only need trigger counts."""
+        for entry in range(len(self)):
+            yield {
+                "search": [{"name": name, "value": value} for name, value in self.get_search(entry).items()],
+                "timesTriggered": int(self.entry_times[entry]),
+            }
+
+
+def write_force_index(force_record: list, force_record_path: str) -> None:
+    """Write the index of a force_record list next to its json file."""
+    ForceIndex.from_force_record(force_record).save(get_force_index_path(force_record_path))
+
+
+def load_force_index(force_record_path: str) -> ForceIndex:
+    """Load the index of a force_record file, rebuilding it if it is missing or stale."""
+    index_path = get_force_index_path(force_record_path)
+    if os.path.isfile(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(force_record_path):
+        return ForceIndex.load(index_path)
+    with open(force_record_path, "r", encoding="UTF-8") as f:
+        force_index = ForceIndex.from_force_record(json.load(f))
+    try:
+        force_index.save(index_path)
+    except OSError:
+        pass
+    return force_index
@@ -0,0 +1,68 @@
+"""Binary copies of lookup tables, memory-mapped by analysis and verification code instead of parsing the CSV.
+
+lookUpTable_<mode>.csv and lookUpTable_<mode>_0.csv rows (id, weight, payout) are stored as a structured .npy
+array in a __lutcache__ folder next to the CSV. publish_files/ is uploaded to the RGS as is, so tables there are
+cached in the library's lookup_tables/__lutcache__/publish_files/ folder instead. The CSV remains the source of
+truth: the optimization program and swap_lookups.py rewrite it, so the array is rebuilt whenever it is missing
+or older than the CSV.
+"""
+
+import os
+import warnings
+import numpy as np
+
+LOOKUP_DTYPE = np.dtype([("id", "<u8"), ("weight", "<u8"), ("payout", "<f8")])
+PUBLISH_FOLDER = "publish_files"
+
+
+def get_lookup_array_path(lookup_name: str) -> str:
+    """__lutcache__/<table>.npy next to the CSV, or in lookup_tables/ for tables in publish_files/."""
+    folder, name = os.path.split(os.path.abspath(lookup_name))
+    array_name = os.path.splitext(name)[0] + ".npy"
+    if os.path.basename(folder) == PUBLISH_FOLDER:
+        library = os.path.dirname(folder)
+        return os.path.join(library, "lookup_tables", "__lutcache__", PUBLISH_FOLDER, array_name)
+    return os.path.join(folder, "__lutcache__", array_name)
+
+
+def make_lookup_array(ids, weights, payouts) -> np.ndarray:
+    """Structured (id, weight, payout) array."""
+    lut = np.empty(len(ids), dtype=LOOKUP_DTYPE)
+    lut["id"], lut["weight"], lut["payout"] = ids, weights, payouts
+    return lut
+
+
+def parse_lookup_csv(lookup_name: str) -> np.ndarray:
+    """Parse an id,weight,payout CSV. Raises ValueError unless ids and weights are uint64 values."""
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="loadtxt: input contained no data")
+        return np.loadtxt(lookup_name, delimiter=",", dtype=LOOKUP_DTYPE, ndmin=1, encoding="UTF-8")
+
+
+def save_lookup_array(lookup_name: str, lut: np.ndarray) -> None:
+    """Write the binary copy of a lookup table, atomically."""
+    array_name = get_lookup_array_path(lookup_name)
+    os.makedirs(os.path.dirname(array_name), exist_ok=True)
+    temp_name = array_name + f".{os.getpid()}.tmp"
+    with open(temp_name, "wb") as f:
+        np.save(f, lut)
+    os.replace(temp_name, array_name)
+
+
+def write_lookup_array(lookup_name: str) -> np.ndarray:
+    """Parse a lookup table CSV and write its binary copy."""
+    lut = parse_lookup_csv(lookup_name)
+    save_lookup_array(lookup_name, lut)
+    return lut
+
+
+def load_lookup_array(lookup_name: str) -> np.ndarray:
+    """Memory-mapped (id, weight, payout) rows of a lookup table CSV, rebuilt if missing or stale."""
+    array_name = get_lookup_array_path(lookup_name)
+    if os.path.isfile(array_name) and os.path.getmtime(array_name) >= os.path.getmtime(lookup_name):
+        return np.load(array_name, mmap_mode="r")
+    try:
+        write_lookup_array(lookup_name)
+    except OSError:
+        return parse_lookup_csv(lookup_name)
+    return np.load(array_name, mmap_mode="r")
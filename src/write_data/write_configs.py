@@ -7,9 +7,9 @@ import warnings
 from collections import defaultdict
 from utils.get_file_hash import get_hash
 from utils.analysis.distribution_functions import (
-    make_win_distribution,
+    DistributionStats,
+    get_lookup_distribution,
     get_lookup_length,
-    get_distribution_moments,
 )
 
 
@@ -328,9 +328,7 @@ def make_be_config(gamestate):
             copy_and_rename_csv(base_table)
 
         lut_sha_value = get_hash(lut_table)
-        dist = make_win_distribution(lut_table)
-        _, std_val, _, _ = get_distribution_moments(dist)
-        std_val = round(std_val / bet.get_cost(), 2)
+        std_val = round(DistributionStats(*get_lookup_distribution(lut_table)).std / bet.get_cost(), 2)
         booklength = get_lookup_length(lut_table)
 
         _, lut_nme = os.path.split(lut_table)
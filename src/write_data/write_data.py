@@ -7,8 +7,20 @@ import os
 import hashlib
 import json
 import ast
+import heapq
+import time
 import zstandard as zstd
 
+from src.state.rejections import combine_rejection_stats
+from src.write_data.force_index import write_force_index
+from src.write_data.lookup_arrays import write_lookup_array, save_lookup_array
+from src.write_data.book_archive import (
+    write_framed_books,
+    train_book_dictionary,
+    load_book_dictionary,
+    print_compression_summary,
+)
+
 
 def get_sha_256(file_to_hash: str):
     """Get human readable hash of file."""
@@ -74,6 +86,31 @@ def get_force_options(force_results: dict):
     return {key: list(val) for key, val in force_keys.items()}
 
 
+def load_force_record(force_record_path: str) -> dict:
+    """Convert a written force_record file back to the {description: {timesTriggered, bookIds}} format."""
+    with open(force_record_path, "r", encoding="UTF-8") as f:
+        force_record = json.load(f)
+    force_results_dict = {}
+    for entry in force_record:
+        description = tuple((item["name"], item["value"]) for item in entry["search"])
+        force_results_dict[description] = {
+            "timesTriggered": entry["timesTriggered"],
+            "bookIds": entry["bookIds"],
+        }
+    return force_results_dict
+
+
+def get_force_record_keys(force_record_path: str) -> list:
+    """Return all unique search names within an existing force_record file."""
+    force_keys = []
+    if os.path.isfile(force_record_path):
+        for description in load_force_record(force_record_path):
+            for key, _ in description:
+                if key not in force_keys:
+                    force_keys.append(key)
+    return force_keys
+
+
 def make_lookup_tables(gamestate: object, name: str):
     """Write lookup tables for all simulations."""
     file = open(name, "w", encoding="UTF-8")
@@ -103,18 +140,23 @@ def make_lookup_pay_split(gamestate: object, name: str):
     file.close()
 
 
-def write_library_events(gamestate: object, library: list, gametype: str):
-    """Write all unique events within a given mode - with one example application."""
-    unique_event = []
-    event_items = {}
+def get_library_event_items(library: list, event_items: dict = None) -> dict:
+    """First example of each unique event type, added to any previously collected examples."""
+    if event_items is None:
+        event_items = {}
     for event in library:
         for instance in event["events"]:
             lib_event = instance["type"]
-            if lib_event not in unique_event:
-                unique_event.append(lib_event)
+            if lib_event not in event_items:
                 item_keys = instance.keys()
                 dict_details = {key: instance[key] for key in item_keys if key != "index"}
                 event_items[lib_event] = dict_details
+    return event_items
+
+
+def write_library_events(gamestate: object, library: list, gametype: str, event_items: dict = None):
+    """Write all unique events within a given mode - with one example application."""
+    event_items = get_library_event_items(library, event_items)
     json_object = json.dumps(event_items, indent=4)
     with open(
         os.path.join(gamestate.output_files.config_path, f"event_config_{gametype}.json"),
@@ -132,10 +174,16 @@ def output_lookup_and_force_files(
     gamestate: object,
     num_sims: int = 1000000,
     compress: bool = True,
+    sim_offset: int = 0,
+    num_repeats: int = None,
+    merge_by_id: bool = False,
 ):
-    """Combine temporary lookup tables and force files into a single output."""
+    """Combine temporary lookup tables and force files into a single output.
+    If sim_offset > 0, outputs are appended to the existing library files for this betmode.
+    merge_by_id: thread files of each batch hold interleaved (sorted) simulation ids and are merged by id."""
     print("Saving books for ", game_id, "in", betmode)
-    num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
+    if num_repeats is None:
+        num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
     file_list = []
     for repeat_index in range(num_repeats):
         for thread in range(threads):
@@ -143,13 +191,35 @@ def output_lookup_and_force_files(
                 gamestate.output_files.get_temp_multi_thread_name(betmode, thread, repeat_index, compress)
             )
 
-    if compress:
+    if sim_offset > 0:
+        # Existing books are merged as the first chunk, ahead of the appended simulations
+        final_book_name = gamestate.output_files.get_final_book_name(betmode, compress)
+        if not os.path.isfile(final_book_name):
+            raise FileNotFoundError(f"Cannot extend library, {final_book_name} does not exist.")
+        previous_book_name = os.path.join(
+            gamestate.output_files.temp_path, "previous_" + os.path.basename(final_book_name)
+        )
+        dictionary_name = gamestate.output_files.get_book_dictionary_name(betmode)
+        if compress and os.path.isfile(dictionary_name):
+            # Existing books can only be decoded with their dictionary, merge them as a plain zstd stream
+            text = read_zst_text(final_book_name, load_book_dictionary(dictionary_name))
+            with open(previous_book_name, "wb") as f:
+                f.write(zstd.ZstdCompressor().compress(text.encode("UTF-8")))
+            os.remove(final_book_name)
+        else:
+            os.replace(final_book_name, previous_book_name)
+        file_list.insert(0, previous_book_name)
+
+    if merge_by_id:
+        write_books_by_id(gamestate, betmode, file_list, threads, compress, previous_files=int(sim_offset > 0))
+    elif compress and uses_book_layout(gamestate):
+        write_compressed_books(gamestate, betmode, (line for fname in file_list for line in read_temp_lines(fname)))
+    elif compress:
+        remove_book_layout_files(gamestate, betmode)
         temp_book_output_path = os.path.join(gamestate.output_files.book_path, "temp_book_output.json")
         with open(temp_book_output_path, "w", encoding="UTF-8") as outfile:
             for fname in file_list:
-                with open(fname, "rb") as infile:
-                    decompressed = zstd.ZstdDecompressor().decompress(infile.read())
-                    outfile.write(decompressed.decode("UTF-8"))
+                outfile.write(read_zst_text(fname))
 
         final_out = gamestate.output_files.get_final_book_name(betmode, True)
         with open(temp_book_output_path, "rb") as f_in, open(final_out, "wb") as f_out:
@@ -178,7 +248,10 @@ def output_lookup_and_force_files(
                             outfile.write("," + file_data[1::])  # dont write first '[', write last ']'
 
     print("Saving force files for", game_id, "in", betmode)
+    force_record_path = os.path.join(gamestate.output_files.force_path, f"force_record_{betmode}.json")
     force_results_dict = {}
+    if sim_offset > 0 and os.path.isfile(force_record_path):
+        force_results_dict = load_force_record(force_record_path)
     file_list = []
     for repeat_index in range(num_repeats):
         for thread in range(threads):
@@ -194,6 +267,9 @@ def output_lookup_and_force_files(
                 force_results_dict[key]["bookIds"] += force_chunk[key]["bookIds"]
             else:
                 force_results_dict[key] = force_chunk[key]
+    if merge_by_id:
+        for key in force_results_dict:
+            force_results_dict[key]["bookIds"].sort()
 
     force_results_dict_just_for_rob = []
     for force_combination in force_results_dict:
@@ -208,9 +284,9 @@ def output_lookup_and_force_files(
         force_results_dict_just_for_rob.append(force_dict)
 
     json_object_for_rob = json.dumps(force_results_dict_just_for_rob, indent=4)
-    force_record_path = os.path.join(gamestate.output_files.force_path, f"force_record_{betmode}.json")
     with open(force_record_path, "w", encoding="UTF-8") as file:
         file.write(json_object_for_rob)
+    write_force_index(force_results_dict_just_for_rob, force_record_path)
 
     forceResultKeys = get_force_options(force_results_dict)
     json_file_path = os.path.join(gamestate.output_files.force_path, "force.json")
@@ -236,14 +312,16 @@ def output_lookup_and_force_files(
                 gamestate.output_files.get_temp_segmented_name(betmode, thread, repeat_index)
             ]
 
+    write_mode = "a" if sim_offset > 0 else "w"
     with open(
         gamestate.output_files.get_final_lookup_name(betmode),
-        "w",
+        write_mode,
         encoding="UTF-8",
     ) as outfile:
-        for filename in weights_plus_wins_file_list:
-            with open(filename, "r", encoding="UTF-8") as infile:
-                outfile.write(infile.read())
+        for text in read_temp_text(weights_plus_wins_file_list, threads, merge_by_id):
+            outfile.write(text)
+
+    lut = write_lookup_array(gamestate.output_files.get_final_lookup_name(betmode))
 
     # Write _0 file if it does not exist
     if not (os.path.exists(gamestate.output_files.get_optimized_lookup_name(betmode))):
@@ -251,14 +329,144 @@ def output_lookup_and_force_files(
             gamestate.output_files.get_final_lookup_name(betmode),
             gamestate.output_files.get_optimized_lookup_name(betmode),
         )
+        save_lookup_array(gamestate.output_files.get_optimized_lookup_name(betmode), lut)
+    elif sim_offset > 0:
+        warn(f"Appended unit weights to {betmode} optimized lookup table, optimization should be re-run.")
+        with open(gamestate.output_files.get_optimized_lookup_name(betmode), "a", encoding="UTF-8") as outfile:
+            for text in read_temp_text(weights_plus_wins_file_list, threads, merge_by_id):
+                outfile.write(text)
+        write_lookup_array(gamestate.output_files.get_optimized_lookup_name(betmode))
     with open(
         gamestate.output_files.get_final_segmented_name(betmode),
-        "w",
+        write_mode,
         encoding="UTF-8",
     ) as outfile:
-        for filename in segmented_lut_file_list:
+        for text in read_temp_text(segmented_lut_file_list, threads, merge_by_id):
+            outfile.write(text)
+
+    rejection_stats = []
+    for repeat_index in range(num_repeats):
+        for thread in range(threads):
+            with open(
+                gamestate.output_files.get_temp_rejection_name(betmode, thread, repeat_index), "r", encoding="UTF-8"
+            ) as f:
+                rejection_stats.append(json.load(f))
+    write_rejection_stats(
+        combine_rejection_stats(rejection_stats), gamestate.output_files.get_rejections_name(betmode)
+    )
+
+
+def read_zst_text(filename: str, dictionary: zstd.ZstdCompressionDict = None) -> str:
+    """Decompress a (possibly multi-frame) zstd file."""
+    with open(filename, "rb") as f:
+        with zstd.ZstdDecompressor(dict_data=dictionary).stream_reader(f, read_across_frames=True) as reader:
+            return reader.read().decode("UTF-8")
+
+
+def get_line_id(line: str) -> int:
+    """Simulation id at the start of a book (json) or lookup table line."""
+    if line.startswith('{"id": '):
+        return int(line[7 : line.index(",")])
+    return int(line[: line.index(",")])
+
+
+def read_temp_lines(filename: str) -> list:
+    """Non-empty lines of a temporary book or lookup table file, books as single line json."""
+    if filename.endswith(".zst"):
+        text = read_zst_text(filename)
+    elif filename.endswith(".json"):
+        with open(filename, "r", encoding="UTF-8") as f:
+            return [json.dumps(book) for book in json.load(f)]
+    else:
+        with open(filename, "r", encoding="UTF-8") as f:
+            text = f.read()
+    return [line for line in text.splitlines() if line]
+
+
+def iter_lines_by_id(file_list: list, threads: int):
+    """Yield lines of consecutive batches of thread files, merged by simulation id within each batch."""
+    for idx in range(0, len(file_list), threads):
+        # Files are id ordered unless books were streamed in scheduling order, sorting is linear in the first case
+        batch = [sorted(read_temp_lines(f), key=get_line_id) for f in file_list[idx : idx + threads]]
+        yield from heapq.merge(*batch, key=get_line_id)
+
+
+def read_temp_text(file_list: list, threads: int, merge_by_id: bool = False):
+    """Yield the contents of temporary lookup tables, in file order or merged by id within each batch."""
+    if not merge_by_id:
+        for filename in file_list:
             with open(filename, "r", encoding="UTF-8") as infile:
-                outfile.write(infile.read())
+                yield infile.read()
+        return
+    for idx in range(0, len(file_list), threads):
+        yield "".join(line + "\n" for line in iter_lines_by_id(file_list[idx : idx + threads], threads))
+
+
+def write_books_by_id(
+    gamestate: object, betmode: str, file_list: list, threads: int, compress: bool, previous_files: int = 0
+):
+    """Write final books from batches of thread files merged by id. Previous (already ordered) books come first."""
+    lines = [line for f in file_list[:previous_files] for line in read_temp_lines(f)]
+    lines += iter_lines_by_id(file_list[previous_files:], threads)
+    final_out = gamestate.output_files.get_final_book_name(betmode, compress)
+    if compress and uses_book_layout(gamestate):
+        write_compressed_books(gamestate, betmode, lines)
+    elif compress:
+        remove_book_layout_files(gamestate, betmode)
+        with open(final_out, "wb") as f:
+            f.write(zstd.ZstdCompressor().compress(("\n".join(lines) + "\n").encode("UTF-8")))
+    elif final_out.endswith(".jsonl"):
+        with open(final_out, "w", encoding="UTF-8") as f:
+            f.write("\n".join(lines) + "\n")
+    else:
+        with open(final_out, "w", encoding="UTF-8") as f:
+            f.write("[" + ", ".join(lines) + "]")
+
+
+def uses_book_layout(gamestate: object) -> bool:
+    """True if compressed books are framed and/or compressed with a trained dictionary."""
+    return gamestate.config.book_frame_size is not None or gamestate.config.book_dictionary_size is not None
+
+
+def remove_book_layout_files(gamestate: object, betmode: str, keep: list = ()) -> None:
+    """Remove a previous index or dictionary, which would not match newly written books."""
+    for name in [
+        gamestate.output_files.get_book_index_name(betmode),
+        gamestate.output_files.get_book_dictionary_name(betmode),
+    ]:
+        if name not in keep and os.path.isfile(name):
+            os.remove(name)
+
+
+def write_compressed_books(gamestate: object, betmode: str, lines) -> None:
+    """Write final compressed books as fixed size frames with an index and/or with a trained dictionary."""
+    final_out = gamestate.output_files.get_final_book_name(betmode, True)
+    index_name = gamestate.output_files.get_book_index_name(betmode)
+    dictionary_name = gamestate.output_files.get_book_dictionary_name(betmode)
+    frame_size = gamestate.config.book_frame_size
+    dictionary = None
+    if gamestate.config.book_dictionary_size is not None:
+        lines = list(lines)
+        try:
+            dictionary = train_book_dictionary(lines, gamestate.config.book_dictionary_size)
+        except zstd.ZstdError as error:
+            warn(f"Could not train a book dictionary for {betmode}, writing books without one: {error}")
+    keep = [name for name, used in [(index_name, frame_size), (dictionary_name, dictionary)] if used is not None]
+    remove_book_layout_files(gamestate, betmode, keep)
+    if dictionary is not None:
+        with open(dictionary_name, "wb") as f:
+            f.write(dictionary.as_bytes())
+
+    start = time.time()
+    if frame_size is not None:
+        raw_bytes, compressed_bytes = write_framed_books(final_out, index_name, lines, frame_size, dictionary)
+    else:
+        data = ("\n".join(lines) + "\n").encode("UTF-8")
+        compressed = zstd.ZstdCompressor(dict_data=dictionary).compress(data)
+        with open(final_out, "wb") as f:
+            f.write(compressed)
+        raw_bytes, compressed_bytes = len(data), len(compressed)
+    print_compression_summary(final_out, raw_bytes, compressed_bytes, time.time() - start)
 
 
 def write_json(gamestate, filename: str):
@@ -280,6 +488,26 @@ def write_json(gamestate, filename: str):
                 f.write(json.dumps(j_regular))
 
 
+def write_convergence_stats(convergence: list, name: str):
+    """Write per-batch convergence of the average win estimate."""
+    with open(name, "w", encoding="UTF-8") as f:
+        f.write(json.dumps(convergence, indent=4))
+
+
+def write_rejection_stats(rejections: dict, name: str):
+    """Write per-criteria repeat histograms and rejection reasons."""
+    with open(name, "w", encoding="UTF-8") as f:
+        f.write(json.dumps(rejections, indent=4))
+
+
+def write_phase_timings(rows: list, name: str):
+    """Write the per-phase timing table."""
+    with open(name, "w", encoding="UTF-8") as f:
+        f.write("phase,criteria,gametype,calls,total_ms,mean_us,share\n")
+        for row in rows:
+            f.write(",".join("" if v is None else str(v) for v in row.values()) + "\n")
+
+
 def print_recorded_wins(gamestate: object, name: str = ""):
     """Temporary file generation for wins/recorded results."""
     json_object = json.dumps(str(gamestate.recorded_events), indent=4)
@@ -0,0 +1,19 @@
+import json
+
+import zstandard as zstd
+
+from benchmarks.book_codec_benchmarks import run_book_codec_benchmark
+
+
+def test_benchmark_reports_exact_round_trip(tmp_path):
+    books = [
+        {"id": i, "payoutMultiplier": 10 * i, "events": [{"index": 0, "type": "reveal", "board": [[{"name": "L1"}]]}]}
+        for i in range(1, 21)
+    ]
+    books_file = tmp_path / "books_base.jsonl.zst"
+    text = "".join(json.dumps(book) + "\n" for book in books)
+    books_file.write_bytes(zstd.ZstdCompressor().compress(text.encode("UTF-8")))
+
+    metrics = run_book_codec_benchmark(str(books_file))
+    assert metrics["exact"] and metrics["books"] == 20
+    assert metrics["binary_bytes"] < metrics["jsonl_bytes"]
@@ -0,0 +1,28 @@
+import json
+
+import zstandard as zstd
+
+from benchmarks.book_projection_benchmarks import run_book_projection_benchmark
+
+
+def test_benchmark_reports_exact_projection(tmp_path):
+    books = [
+        {
+            "id": i,
+            "payoutMultiplier": 10 * i,
+            "events": [
+                {"index": 0, "type": "reveal", "board": [[{"name": "L1"}]]},
+                {"index": 1, "type": "setTotalWin", "amount": 10 * i},
+            ],
+            "criteria": "basegame",
+        }
+        for i in range(1, 21)
+    ]
+    books_file = tmp_path / "books_base.jsonl.zst"
+    text = "".join(json.dumps(book) + "\n" for book in books)
+    books_file.write_bytes(zstd.ZstdCompressor().compress(text.encode("UTF-8")))
+
+    metrics = run_book_projection_benchmark(str(books_file), [["setTotalWin"], ["winInfo"]], keys=["criteria"])
+    assert metrics["books"] == 20
+    assert metrics["projections"]["setTotalWin"]["events"] == 20 and metrics["projections"]["setTotalWin"]["exact"]
+    assert metrics["projections"]["winInfo"]["events"] == 0 and metrics["projections"]["winInfo"]["exact"]
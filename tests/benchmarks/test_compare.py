@@ -0,0 +1,35 @@
+from benchmarks.run_benchmarks import compare_to_baseline, get_best_run
+
+BASELINE = {
+    "0_0_lines/base": {"sims_per_second": 100.0, "merge_seconds": 1.0, "peak_rss_mb": 50.0, "bytes_written": 1000}
+}
+
+
+def test_within_threshold_passes():
+    results = {
+        "0_0_lines/base": {"sims_per_second": 95.0, "merge_seconds": 1.1, "peak_rss_mb": 52.0, "bytes_written": 1000}
+    }
+    assert compare_to_baseline(results, BASELINE) == []
+
+
+def test_regressions_are_reported_per_direction():
+    results = {
+        "0_0_lines/base": {"sims_per_second": 80.0, "merge_seconds": 0.5, "peak_rss_mb": 70.0, "bytes_written": 1000}
+    }
+    regressions = compare_to_baseline(results, BASELINE)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("0_0_lines/base sims_per_second")
+    assert regressions[1].startswith("0_0_lines/base peak_rss_mb")
+
+
+def test_best_run_is_kept():
+    runs = [
+        {"sims_per_second": 90.0, "merge_seconds": 1.2, "peak_rss_mb": 50.0, "bytes_written": 1000},
+        {"sims_per_second": 110.0, "merge_seconds": 0.9, "peak_rss_mb": 51.0, "bytes_written": 1000},
+    ]
+    assert get_best_run(runs) == {
+        "sims_per_second": 110.0,
+        "merge_seconds": 0.9,
+        "peak_rss_mb": 50.0,
+        "bytes_written": 1000,
+    }
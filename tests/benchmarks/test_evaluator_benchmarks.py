@@ -0,0 +1,14 @@
+from benchmarks.evaluator_benchmarks import EVALUATORS, generate_board_specs, run_microbenchmarks
+
+
+def test_board_specs_are_seeded():
+    specs = generate_board_specs(5, 3, 4, wild_density=0.2, multiplier_density=1.0, seed=3)
+    assert specs == generate_board_specs(5, 3, 4, wild_density=0.2, multiplier_density=1.0, seed=3)
+    assert all(m is not None for board in specs for reel in board for name, m in reel if name == "W")
+
+
+def test_all_evaluators_run_on_smallest_and_largest_boards():
+    results = run_microbenchmarks(board_sizes=[(5, 3), (8, 8)], num_boards=2, multiplier_density=0.5)
+    assert set(results) == set(EVALUATORS)
+    for sizes in results.values():
+        assert set(sizes) == {"5x3", "8x8"}
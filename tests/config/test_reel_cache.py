@@ -0,0 +1,38 @@
+from src.config.config import Config
+from src.config.reel_cache import get_reel_cache_path
+
+
+def write_csv(path, rows):
+    path.write_text("".join(",".join(row) + "\n" for row in rows), encoding="UTF-8")
+
+
+def test_cached_reels_match_parsed_reels(tmp_path):
+    csv_path = tmp_path / "BR0.csv"
+    write_csv(csv_path, [["L1", "H1 ", "W"], ["S", "L2", "L1"], ["H1", "L1", "S"]])
+    config = Config()
+    parsed = config.parse_reels_csv(csv_path)
+
+    assert config.read_reels_csv(csv_path) == parsed
+    assert get_reel_cache_path(csv_path).endswith("__reelcache__/BR0.csv.bin")
+    assert config.read_reels_csv(csv_path) == parsed == [["L1", "S", "H1"], ["H1", "L2", "L1"], ["W", "L1", "S"]]
+
+
+def test_cache_is_rebuilt_when_csv_changes(tmp_path):
+    csv_path = tmp_path / "BR0.csv"
+    write_csv(csv_path, [["L1", "H1"], ["L2", "H2"]])
+    config = Config()
+    config.read_reels_csv(csv_path)
+
+    write_csv(csv_path, [["W", "S"], ["L3", "L4"], ["L5", "L1"]])
+    assert config.read_reels_csv(csv_path) == [["W", "L3", "L5"], ["S", "L4", "L1"]]
+
+
+def test_corrupt_cache_falls_back_to_csv(tmp_path):
+    csv_path = tmp_path / "BR0.csv"
+    write_csv(csv_path, [["L1", "H1"]])
+    config = Config()
+    config.read_reels_csv(csv_path)
+    with open(get_reel_cache_path(csv_path), "r+b") as f:
+        f.truncate(30)
+
+    assert config.read_reels_csv(csv_path) == [["L1"], ["H1"]]
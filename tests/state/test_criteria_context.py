@@ -0,0 +1,80 @@
+import random
+
+from src.config.config import Config
+from src.config.betmode import BetMode
+from src.config.distributions import Distribution
+from src.calculations.statistics import WeightedSampler, get_random_outcome
+from src.state.criteria_context import CriteriaContext
+
+
+def test_sampler_matches_linear_draws():
+    distribution = {"BR0": 3, "BR1": 0, "BR2": 1.5, "WCAP": 0.25}
+    sampler = WeightedSampler(distribution)
+    random.seed(11)
+    expected = [get_random_outcome(distribution) for _ in range(2000)]
+    random.seed(11)
+    assert [sampler.sample() for _ in range(2000)] == expected
+
+
+def test_context_resolves_distribution_and_samplers():
+    distribution = Distribution(
+        criteria="freegame",
+        quota=1,
+        win_criteria=2.0,
+        conditions={"reel_weights": {"basegame": {"BR0": 1}}, "force_freegame": True},
+    )
+    betmode = BetMode(
+        name="base",
+        cost=1.0,
+        rtp=0.97,
+        max_win=5000,
+        auto_close_disabled=False,
+        is_feature=True,
+        is_buybonus=False,
+        distributions=[distribution],
+    )
+    context = CriteriaContext(betmode, "freegame")
+    assert context.distribution is distribution and context.win_criteria == 2.0
+    assert context.conditions["force_freegame"] and context.reel_weights == {"basegame": {"BR0": 1}}
+    assert context.sample("reel_weights", "basegame") == "BR0"
+    assert context.get_sampler("reel_weights", "basegame") is context.samplers[("reel_weights", "basegame")]
+    assert CriteriaContext(betmode, "0").distribution is None
+
+
+def test_win_level_bisection_matches_ranges():
+    config = Config()
+    for key, levels in config.win_levels.items():
+        for win in [0, 0.05, 0.1, 1.0, 7.3, 99.99, 100.0, 4999.9, 5000.0, 1e9]:
+            expected = next(idx for idx, pair in levels.items() if pair[0] <= win < pair[1])
+            assert config.get_win_level(win, key) == expected
+
+    config.win_levels["gapped"] = {1: (0, 1), 2: (2, 3)}
+    assert config.get_win_level_table("gapped") is None
+    assert config.get_win_level(2.5, "gapped") == 2
+    assert isinstance(config.get_win_level(1.5, "gapped"), RuntimeError)
+
+
+def test_samplers_follow_runtime_weight_changes():
+    reel_weights = {"basegame": {"BR0": 1, "BR1": 0}}
+    distribution = Distribution(criteria="basegame", quota=1, conditions={"reel_weights": reel_weights})
+    betmode = BetMode(
+        name="base",
+        cost=1.0,
+        rtp=0.97,
+        max_win=5000,
+        auto_close_disabled=False,
+        is_feature=True,
+        is_buybonus=False,
+        distributions=[distribution],
+    )
+    context = CriteriaContext(betmode, "basegame")
+    assert {context.sample("reel_weights", "basegame") for _ in range(50)} == {"BR0"}
+
+    # Weights changed in place
+    reel_weights["basegame"]["BR0"], reel_weights["basegame"]["BR1"] = 0, 1
+    assert {context.sample("reel_weights", "basegame") for _ in range(50)} == {"BR1"}
+
+    # Weight dictionary replaced
+    reel_weights["basegame"] = {"BR2": 1}
+    assert {context.sample("reel_weights", "basegame") for _ in range(50)} == {"BR2"}
+    assert context.reel_weights == {"basegame": {"BR2": 1}}
@@ -0,0 +1,69 @@
+import os
+import sys
+import csv
+import json
+import importlib
+from collections import Counter
+
+import pytest
+import zstandard as zstd
+
+from src.config.paths import PATH_TO_GAMES
+from src.state.run_sims import create_books, get_sim_splits
+
+GAME_PATH = os.path.join(PATH_TO_GAMES, "0_0_lines")
+GAME_MODULES = ["game_calculations", "game_executables", "game_override", "game_config", "gamestate"]
+
+
+@pytest.fixture
+def sample_game():
+    """Import the sample game's modules, which expect the game folder on sys.path."""
+    saved = {name: sys.modules.pop(name) for name in GAME_MODULES if name in sys.modules}
+    sys.path.insert(0, GAME_PATH)
+    try:
+        yield importlib.import_module("game_config").GameConfig, importlib.import_module("gamestate").GameState
+    finally:
+        sys.path.remove(GAME_PATH)
+        for name in GAME_MODULES:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+
+def run_books(sample_game, library_path, num_sims, sim_offsets=None):
+    GameConfig, GameState = sample_game
+    config = GameConfig()
+    config.library_path = library_path
+    gamestate = GameState(config)
+    create_books(
+        gamestate, config, {"base": num_sims}, 100, 1, compress=True, profiling=False, sim_offsets=sim_offsets
+    )
+    return gamestate
+
+
+def read_rows(path):
+    with open(path, "r", encoding="UTF-8") as f:
+        return list(csv.reader(f))
+
+
+def test_extended_library_matches_single_run(sample_game, tmp_path):
+    library_path = str(tmp_path / "library")
+    num_sims, num_extra = 200, 300
+    run_books(sample_game, library_path, num_sims)
+    with pytest.warns(UserWarning, match="optimization should be re-run"):
+        gamestate = run_books(sample_game, library_path, num_extra, sim_offsets={"base": num_sims})
+    expected_ids = list(range(1, num_sims + num_extra + 1))
+
+    with open(os.path.join(library_path, "publish_files", "books_base.jsonl.zst"), "rb") as f:
+        lines = zstd.ZstdDecompressor().stream_reader(f).read().decode("UTF-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines if line] == expected_ids
+
+    lookup_tables = [
+        os.path.join(library_path, "lookup_tables", "lookUpTable_base.csv"),
+        os.path.join(library_path, "lookup_tables", "lookUpTableSegmented_base.csv"),
+        os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv"),
+    ]
+    for lookup_table in lookup_tables:
+        assert [int(row[0]) for row in read_rows(lookup_table)] == expected_ids
+
+    segmented = read_rows(lookup_tables[1])
+    assert Counter(row[1] for row in segmented) == get_sim_splits(gamestate, num_sims + num_extra, "base")
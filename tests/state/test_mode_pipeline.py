@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from src.config.betmode import BetMode
+from src.state.run_sims import get_mode_state, restore_mode_config
+
+
+class FakeState:
+    def __init__(self, bet_modes):
+        self.config = SimpleNamespace(bet_modes=bet_modes)
+        self.betmode = None
+        self.recorded_events = {"stale": 1}
+
+    def get_betmode(self, name):
+        return next(betmode for betmode in self.config.bet_modes if betmode.get_name() == name)
+
+    def clear_criteria_contexts(self):
+        pass
+
+
+def make_betmode(name):
+    return BetMode(
+        name=name,
+        cost=1.0,
+        rtp=0.97,
+        max_win=5000,
+        auto_close_disabled=False,
+        is_feature=True,
+        is_buybonus=False,
+        distributions=[],
+    )
+
+
+def test_mode_states_are_independent():
+    gamestate = FakeState([make_betmode("base"), make_betmode("bonus")])
+    base_state = get_mode_state(gamestate, "base")
+    bonus_state = get_mode_state(gamestate, "bonus")
+    base_state.get_betmode("base").add_force_key("symbol")
+
+    assert (base_state.betmode, bonus_state.betmode) == ("base", "bonus")
+    assert base_state.recorded_events == {} and gamestate.recorded_events == {"stale": 1}
+    assert gamestate.get_betmode("base").get_force_keys() == []
+
+    restore_mode_config(gamestate, base_state, "base")
+    assert gamestate.get_betmode("base").get_force_keys() == ["symbol"]
+    assert bonus_state.get_betmode("base").get_force_keys() == []
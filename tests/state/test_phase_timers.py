@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from src.state.phase_timers import (
+    PhaseTimer,
+    timed_phase,
+    set_active_timer,
+    combine_phase_totals,
+    get_phase_table,
+)
+
+
+@timed_phase("inner")
+def inner():
+    return 1
+
+
+@timed_phase("outer")
+def outer():
+    return inner() + inner()
+
+
+def test_nested_phases_record_exclusive_time():
+    gamestate = SimpleNamespace(criteria="basegame", gametype="basegame")
+    timer = PhaseTimer(gamestate)
+    set_active_timer(timer)
+    try:
+        assert outer() == 2
+    finally:
+        set_active_timer(None)
+
+    totals = timer.get_totals()
+    assert totals[("inner", "basegame", "basegame")][1] == 2
+    assert totals[("outer", "basegame", "basegame")][1] == 1
+    assert timer.child_time == []
+
+
+def test_disabled_timer_records_nothing():
+    assert outer() == 2
+
+
+def test_phase_table_shares_exclude_retries():
+    totals = [
+        {("draw_board", "0", "basegame"): (3000, 3), ("repeat_retries", "0", "basegame"): (9000, 1)},
+        {("draw_board", "0", "basegame"): (1000, 1), ("events", "0", "basegame"): (4000, 2)},
+    ]
+    rows = {row["phase"]: row for row in get_phase_table(combine_phase_totals(totals))}
+    assert rows["draw_board"]["calls"] == 4
+    assert rows["draw_board"]["share"] == 0.5
+    assert rows["repeat_retries"]["share"] is None
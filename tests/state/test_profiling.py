@@ -0,0 +1,46 @@
+"""Test profiling of worker processes and merging of their profiles."""
+
+import os
+import pstats
+import multiprocessing
+
+from src.state.run_sims import run_profiled_sims, merge_profiles
+
+
+def spin_first_worker(num_sims):
+    return sum(range(num_sims))
+
+
+def spin_second_worker(num_sims):
+    return sum(range(2 * num_sims))
+
+
+class ProfiledGamestate:
+    """Stands in for a gamestate, each worker runs a different spin function."""
+
+    def __init__(self, spin):
+        self.spin = spin
+
+    def run_sims(self, num_sims):
+        for _ in range(num_sims):
+            self.spin(100)
+
+
+def test_worker_profiles_are_merged(tmp_path):
+    profile_names = [str(tmp_path / f"worker_{thread}.prof") for thread in range(2)]
+    processes = [
+        multiprocessing.Process(target=run_profiled_sims, args=(ProfiledGamestate(spin), name, 5))
+        for spin, name in zip([spin_first_worker, spin_second_worker], profile_names)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    output_name = str(tmp_path / "simulationProfile_base.prof")
+    merge_profiles(profile_names, output_name)
+    calls = {function: stat[1] for (_, _, function), stat in pstats.Stats(output_name).stats.items()}
+    assert calls["spin_first_worker"] == 5 and calls["spin_second_worker"] == 5
+    assert calls["run_sims"] == 2
+    assert not any(os.path.exists(name) for name in profile_names)
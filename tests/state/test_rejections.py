@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.state.rejections import (
+    RejectionStats,
+    RetryBudgetExceeded,
+    get_histogram_bucket,
+    combine_rejection_stats,
+)
+
+
+class FakeDistribution:
+    def __init__(self, win_criteria=None):
+        self.win_criteria = win_criteria
+
+    def get_win_criteria(self):
+        return self.win_criteria
+
+
+def make_gamestate(final_win=0.0, win_criteria=None, conditions=None, budget=None):
+    conditions = conditions or {"force_freegame": False, "force_wincap": False}
+    return SimpleNamespace(
+        betmode="base",
+        criteria="0",
+        sim=7,
+        final_win=final_win,
+        triggered_freegame=False,
+        wincap_triggered=False,
+        get_current_betmode_distributions=lambda: FakeDistribution(win_criteria),
+        get_current_distribution_conditions=lambda: conditions,
+        get_retry_budget=lambda: budget,
+    )
+
+
+def test_histogram_buckets():
+    assert [get_histogram_bucket(r) for r in [0, 1, 2, 3, 4, 7, 8]] == ["0", "1", "2-3", "2-3", "4-7", "4-7", "8-15"]
+
+
+def test_rejections_are_classified_per_attempt():
+    stats = RejectionStats()
+    stats.start_sim()
+    stats.start_attempt(make_gamestate(final_win=5.0, win_criteria=0.0))
+    stats.start_attempt(make_gamestate(final_win=5.0, win_criteria=0.0))
+    stats.start_attempt(make_gamestate(final_win=0.0, conditions={"force_freegame": True}))
+    stats.finish_sim("0")
+
+    totals = stats.get_totals()["0"]
+    assert totals["reasons"] == {"win_criteria": 1, "missing_freegame": 1}
+    assert totals["histogram"] == {"2-3": 1}
+    assert totals["attempts"] == 3 and totals["max_repeats"] == 2
+
+
+def test_retry_budget_fails_fast():
+    stats = RejectionStats()
+    stats.start_sim()
+    gamestate = make_gamestate(budget=2)
+    for _ in range(3):
+        stats.start_attempt(gamestate)
+    with pytest.raises(RetryBudgetExceeded, match="zero_win"):
+        stats.start_attempt(gamestate)
+
+
+def test_combined_mean_repeats():
+    worker = {
+        "sims": 2,
+        "attempts": 5,
+        "max_repeats": 2,
+        "seconds": 1.0,
+        "rejected_seconds": 0.5,
+        "reasons": {"zero_win": 3},
+    }
+    combined = combine_rejection_stats(
+        [{"0": {**worker, "histogram": {"0": 1, "2-3": 1}}}, {"0": {**worker, "histogram": {"1": 2}}}]
+    )["0"]
+    assert combined["mean_repeats"] == 1.5
+    assert combined["reasons"] == {"zero_win": 6}
+    assert list(combined["histogram"]) == ["0", "1", "2-3"]
@@ -0,0 +1,39 @@
+"""Test the stratified win estimate used for adaptive stopping."""
+
+import pytest
+
+from src.state.run_sims import get_stratified_win_estimate, merge_criteria_statistics
+from src.wins.win_manager import WinManager
+
+
+def test_win_manager_accumulates_per_criteria():
+    win_manager = WinManager("basegame", "freegame")
+    for criteria, payout in [("0", 0), ("freegame", 10), ("0", 0), ("freegame", 30)]:
+        win_manager.record_criteria_win(criteria, payout)
+    assert win_manager.get_cumulative_statistics() == {
+        "0": {"sims": 2, "wins": 0.0, "squared_wins": 0.0},
+        "freegame": {"sims": 2, "wins": 40.0, "squared_wins": 1000.0},
+    }
+
+
+def test_stratified_estimate_with_known_wins():
+    weights = {"0": 0.5, "basegame": 0.4, "freegame": 0.1}
+    statistics = {}
+    # basegame mean 2, sample variance 2; freegame mean 20, sample variance 200
+    merge_criteria_statistics(statistics, {"0": {"sims": 3, "wins": 0.0, "squared_wins": 0.0}})
+    merge_criteria_statistics(statistics, {"basegame": {"sims": 2, "wins": 4.0, "squared_wins": 10.0}})
+    merge_criteria_statistics(statistics, {"freegame": {"sims": 2, "wins": 40.0, "squared_wins": 1000.0}})
+    average_win, std_error = get_stratified_win_estimate(statistics, weights, cost=2.0)
+    assert average_win == pytest.approx((0.4 * 2 + 0.1 * 20) / 2)
+    assert std_error == pytest.approx((0.4**2 * 2 / 2 + 0.1**2 * 200 / 2) ** 0.5 / 2)
+
+    # Giving a criteria more simulations with the same mean does not move the estimate
+    merge_criteria_statistics(statistics, {"0": {"sims": 97, "wins": 0.0, "squared_wins": 0.0}})
+    assert get_stratified_win_estimate(statistics, weights, cost=2.0)[0] == pytest.approx(average_win)
+
+
+def test_unsampled_criteria_never_converges():
+    statistics = {"basegame": {"sims": 10, "wins": 10.0, "squared_wins": 10.0}}
+    average_win, std_error = get_stratified_win_estimate(statistics, {"basegame": 0.9, "wincap": 0.1}, cost=1.0)
+    assert average_win == pytest.approx(1.0)
+    assert std_error == float("inf")
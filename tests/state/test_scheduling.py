@@ -0,0 +1,30 @@
+import json
+import queue
+
+from src.state.scheduling import get_cost_ordered_chunks, fill_sim_queue, iter_queued_sims
+from src.write_data.write_data import get_line_id, iter_lines_by_id
+
+
+def test_chunks_are_homogeneous_and_most_expensive_first():
+    allocation = {0: "0", 1: "wincap", 2: "0", 3: "freegame", 4: "0", 5: "wincap"}
+    costs = {"0": 1.0, "freegame": 10.0, "wincap": 100.0}
+    chunks = get_cost_ordered_chunks(range(6), allocation, costs, chunk_size=2)
+    assert chunks == [[1, 5], [3], [0, 2], [4]]
+
+
+def test_queued_sims_stop_at_signal():
+    sim_queue = queue.Queue()
+    fill_sim_queue(sim_queue, [[4, 5], [0]], threads=2)
+    assert list(iter_queued_sims(sim_queue)) == [4, 5, 0]
+    assert list(iter_queued_sims(sim_queue)) == []
+
+
+def test_batches_are_merged_by_id(tmp_path):
+    books = {"a.jsonl": [2, 3, 6], "b.jsonl": [1, 4, 5], "c.jsonl": [8], "d.jsonl": [7]}
+    for name, ids in books.items():
+        with open(tmp_path / name, "w", encoding="UTF-8") as f:
+            f.write("".join(json.dumps({"id": book_id, "events": []}) + "\n" for book_id in ids))
+
+    file_list = [str(tmp_path / name) for name in books]
+    assert [get_line_id(line) for line in iter_lines_by_id(file_list, threads=2)] == list(range(1, 9))
+    assert get_line_id("12,1,350") == 12
@@ -0,0 +1,83 @@
+"""Test criteria allocation when creating or extending a library."""
+
+from src.config.betmode import BetMode
+from src.config.distributions import Distribution
+from src.state.run_sims import get_sim_splits, get_extension_sim_splits, assign_sim_criteria, get_sim_allocation, get_batched_sim_splits
+
+
+class AllocationGamestate:
+    """Minimal gamestate exposing a single betmode."""
+
+    def __init__(self):
+        self.betmode = BetMode(
+            name="base",
+            cost=1.0,
+            rtp=0.97,
+            max_win=5000,
+            auto_close_disabled=False,
+            is_feature=True,
+            is_buybonus=False,
+            distributions=[
+                Distribution(criteria="wincap", quota=0.001, win_criteria=5000, conditions={"reel_weights": {}}),
+                Distribution(criteria="freegame", quota=0.1, conditions={"reel_weights": {}}),
+                Distribution(criteria="0", quota=0.4, win_criteria=0.0, conditions={"reel_weights": {}}),
+                Distribution(criteria="basegame", quota=0.5, conditions={"reel_weights": {}}),
+            ],
+        )
+
+    def get_betmode(self, mode_name):
+        return self.betmode
+
+
+def test_extension_matches_combined_split():
+    gamestate = AllocationGamestate()
+    existing = get_sim_splits(gamestate, 1000, "base")
+    appended = get_extension_sim_splits(gamestate, 3000, "base", existing)
+    assert sum(appended.values()) == 3000
+    combined = {c: existing[c] + appended[c] for c in existing}
+    assert combined == get_sim_splits(gamestate, 4000, "base")
+
+
+def test_extension_never_negative():
+    gamestate = AllocationGamestate()
+    existing = {"wincap": 10, "freegame": 100, "0": 400, "basegame": 490}
+    appended = get_extension_sim_splits(gamestate, 100, "base", existing)
+    assert sum(appended.values()) == 100
+    assert all(count >= 0 for count in appended.values())
+
+
+def test_assign_criteria_with_offset():
+    allocation = assign_sim_criteria({"0": 2, "basegame": 3}, 5, sim_offset=10)
+    assert sorted(allocation.keys()) == [10, 11, 12, 13, 14]
+    assert sorted(allocation.values()) == ["0", "0", "basegame", "basegame", "basegame"]
+
+
+def test_batched_extension_matches_split_after_every_batch():
+    gamestate = AllocationGamestate()
+    existing = get_sim_splits(gamestate, 1000, "base")
+    allocation = get_sim_allocation(gamestate, "base", 3000, 3, 1000, 1000, existing, batched=True)
+    assert sorted(allocation.keys()) == list(range(1000, 4000))
+    for num_batches in range(1, 4):
+        library = dict(existing)
+        for sim in range(1000, 1000 + num_batches * 1000):
+            library[allocation[sim]] += 1
+        assert library == get_sim_splits(gamestate, 1000 + num_batches * 1000, "base")
+
+
+def test_batched_extension_compensates_existing_library():
+    gamestate = AllocationGamestate()
+    existing = {"wincap": 0, "freegame": 60, "0": 440, "basegame": 500}
+    allocation = get_sim_allocation(gamestate, "base", 2000, 2, 1000, 1000, existing, batched=True)
+    library = dict(existing)
+    for criteria in allocation.values():
+        library[criteria] += 1
+    assert library == get_sim_splits(gamestate, 3000, "base")
+
+
+def test_batched_splits_add_up_to_library_split():
+    gamestate = AllocationGamestate()
+    batch_criteria = get_batched_sim_splits(gamestate, 20, 50, "base")
+    for num_batches in [1, 5, 20]:
+        summed = {c: sum(split[c] for split in batch_criteria[:num_batches]) for c in batch_criteria[0]}
+        assert summed == get_sim_splits(gamestate, num_batches * 50, "base")
+    assert sum(split["wincap"] for split in batch_criteria) == 1
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.state.rejections import RetryBudgetExceeded
+from src.state.speculative import SeedWindowExhausted, get_sub_seed, resolve_speculative_seeds
+
+
+class FakeState:
+    """Accepts the sub-seed indices listed for each simulation."""
+
+    def __init__(self, accepted, budget=None):
+        self.accepted = accepted
+        self.budget = budget
+        self.criteria = ""
+        self.seed_window = None
+        self.rejections = SimpleNamespace(attempts=0)
+
+    def get_retry_budget(self):
+        return self.budget
+
+    def get_current_distribution_conditions(self):
+        return {}
+
+    def run_spin(self, sim):
+        start, stop = self.seed_window
+        for attempt in range(start, stop):
+            self.rejections.attempts = attempt - start + 1
+            if attempt in self.accepted[sim]:
+                return
+        raise SeedWindowExhausted()
+
+
+def test_sub_seeds_are_unique_per_sim():
+    assert get_sub_seed(0, 5) != get_sub_seed(1, 5)
+    assert get_sub_seed(3, 0) + 1 == get_sub_seed(3, 1)
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_lowest_accepted_index_is_kept(threads):
+    gamestate = FakeState({0: {2, 5}, 1: {300, 40}, 2: {0}})
+    sims = {0: "wincap", 1: "wincap", 2: "wincap"}
+    assert resolve_speculative_seeds(gamestate, "base", sims, threads, window_size=8) == {0: 2, 1: 40, 2: 0}
+
+
+def test_budget_stops_the_search():
+    gamestate = FakeState({0: {50}}, budget=20)
+    with pytest.raises(RetryBudgetExceeded):
+        resolve_speculative_seeds(gamestate, "base", {0: "wincap"}, 2, window_size=8)
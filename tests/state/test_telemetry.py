@@ -0,0 +1,33 @@
+import json
+from queue import Queue
+from types import SimpleNamespace
+
+from src.state.telemetry import SimulationTelemetry, TelemetryMonitor
+
+
+def make_gamestate(criteria, repeat_count, events):
+    return SimpleNamespace(criteria=criteria, repeat_count=repeat_count, book=SimpleNamespace(events=events))
+
+
+def test_worker_counters_are_aggregated(tmp_path):
+    channel = Queue()
+    events = [{"type": "reveal"}, {"type": "tumbleBoard"}, {"type": "tumbleBoard"}]
+    for thread in range(2):
+        worker = SimulationTelemetry(channel, "base", thread, 0, interval=float("inf"))
+        worker.record_sim(make_gamestate("wincap", 5, events))
+        worker.record_sim(make_gamestate("0", 1, events[:1]))
+        worker.bytes_written = 100
+        worker.push(finished=True)
+
+    metrics_name = tmp_path / "telemetry.jsonl"
+    monitor = TelemetryMonitor(channel, str(metrics_name), "base", total_sims=4)
+    monitor.drain()
+    summary = monitor.get_summary()
+
+    assert summary["sims"] == 4
+    assert summary["spins"] == 12
+    assert summary["bytes_written"] == 200
+    assert summary["max_tumble_depth"] == 2
+    assert summary["mean_repeats"] == {"wincap": 4.0, "0": 0.0}
+    with open(metrics_name, "r", encoding="UTF-8") as f:
+        assert [json.loads(line)["thread"] for line in f] == [0, 1]
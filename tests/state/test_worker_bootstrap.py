@@ -0,0 +1,35 @@
+import os
+import importlib
+import json
+import sys
+from types import SimpleNamespace
+
+from src.state.worker_bootstrap import get_module_root, get_preload_modules, get_worker_context, start_worker
+
+
+def test_module_roots():
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert get_module_root("src.state.state") == repo_root
+    assert get_module_root("json.decoder") == os.path.dirname(os.path.dirname(json.__file__))
+
+
+def test_preload_modules_are_imported_modules():
+    importlib.import_module("src.state.state")
+    gamestate = SimpleNamespace(config=SimpleNamespace())
+    modules = get_preload_modules(gamestate)
+    assert "types" in modules and "src.state.state" in modules
+    assert all(module in sys.modules for module in modules)
+
+
+def test_start_worker_records_startup_time():
+    startup_times, calls = [], []
+    start_worker(0.0, startup_times, calls.append, "sim")
+    assert calls == ["sim"] and startup_times[0] > 0
+
+
+def test_forkserver_context_restores_pythonpath(monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", "/original")
+    gamestate = SimpleNamespace(config=SimpleNamespace())
+    context = get_worker_context(gamestate, "forkserver")
+    assert context.get_start_method() == "forkserver"
+    assert os.environ["PYTHONPATH"] == "/original"
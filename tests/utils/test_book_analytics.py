@@ -0,0 +1,167 @@
+import json
+from collections import Counter
+
+import pytest
+import zstandard as zstd
+
+from src.write_data.book_archive import write_framed_books
+from utils.book_analytics import (
+    BookReducer,
+    merge_state,
+    register_reducer,
+    get_reducers,
+    get_projection,
+    project_book_line,
+    scan_projected_book,
+    filter_book,
+    reduce_books,
+    reduce_book_iterable,
+)
+
+
+@register_reducer
+class PayoutReducer(BookReducer):
+    name = "test_payouts"
+
+    def initial(self):
+        return {"books": 0, "payouts": Counter(), "ids": [], "total": 0}
+
+    def map(self, state, book):
+        state["books"] += 1
+        state["payouts"][book["payoutMultiplier"]] += 1
+        state["ids"].append(book["id"])
+        state["total"] += book["payoutMultiplier"]
+        return state
+
+    def finalize(self, state):
+        state["average"] = state["total"] / state["books"] / 100 if state["books"] else 0
+        return state
+
+
+class MaxWinReducer(BookReducer):
+    name = "test_max_win"
+
+    def initial(self):
+        return 0
+
+    def map(self, state, book):
+        return max(state, book["payoutMultiplier"])
+
+    def combine(self, state, other):
+        return max(state, other)
+
+
+class WinEventReducer(BookReducer):
+    name = "test_win_events"
+    event_types = ["winInfo"]
+    keys = ["criteria"]
+
+    def initial(self):
+        return {"types": Counter(), "criteria": Counter()}
+
+    def map(self, state, book):
+        state["types"].update(event["type"] for event in book["events"])
+        state["criteria"][book["criteria"]] += 1
+        return state
+
+
+def make_events(payout):
+    events = [{"index": 0, "type": "reveal", "board": [[{"name": "L1"}, {"name": "W", "wild": True}]]}]
+    if payout > 0:
+        events.append({"index": 1, "type": "winInfo", "totalWin": payout, "wins": [{"symbol": "L1", "meta": {"index": 1}}]})
+    events.append({"index": len(events), "type": "setTotalWin", "amount": payout})
+    return events
+
+
+def make_books(num_books):
+    books = []
+    for idx in range(num_books):
+        payout = (idx * 37) % 500 * 10
+        books.append({"id": idx + 1, "payoutMultiplier": payout, "events": make_events(payout), "criteria": "basegame"})
+    return books
+
+
+def write_books(path, books):
+    lines = "".join(json.dumps(book) + "\n" for book in books).encode("UTF-8")
+    path.write_bytes(zstd.ZstdCompressor().compress(lines))
+    return str(path)
+
+
+def test_merge_state():
+    state = {"n": 1, "values": [1], "counts": Counter({0: 1}), "levels": {1: 2}}
+    merged = merge_state(state, {"n": 2, "values": [2, 3], "counts": Counter({0: 1, 5: 1}), "levels": {1: 1, 2: 1}, "new": 4})
+    assert merged == {"n": 3, "values": [1, 2, 3], "counts": Counter({0: 2, 5: 1}), "levels": {1: 3, 2: 1}, "new": 4}
+    with pytest.raises(TypeError, match="override combine"):
+        merge_state({"flag": True}, {"flag": False})
+
+
+def test_reducers_must_define_map():
+    class IncompleteReducer(BookReducer):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompleteReducer()
+
+
+def test_registered_reducers():
+    assert isinstance(get_reducers(["test_payouts"])[0], PayoutReducer)
+    with pytest.raises(KeyError, match="No reducer registered"):
+        get_reducers(["missing"])
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_reduce_books_matches_serial_pass(tmp_path, processes):
+    books = make_books(250)
+    books_file = write_books(tmp_path / "books_base.jsonl.zst", books)
+    expected = reduce_book_iterable(books, ["test_payouts", MaxWinReducer()])
+
+    results = reduce_books(books_file, ["test_payouts", MaxWinReducer()], processes=processes, chunk_books=16)
+    assert results == expected
+    assert results["test_payouts"]["ids"] == [book["id"] for book in books]
+    assert results["test_max_win"] == max(book["payoutMultiplier"] for book in books)
+
+
+def test_reduce_plain_and_dictionary_books(tmp_path):
+    books = make_books(40)
+    lines = [json.dumps(book) for book in books]
+    expected = reduce_book_iterable(books, [PayoutReducer()])
+
+    (tmp_path / "books.jsonl").write_text("\n".join(lines) + "\n\n")
+    assert reduce_books(str(tmp_path / "books.jsonl"), [PayoutReducer()], processes=1) == expected
+
+    dictionary = zstd.ZstdCompressionDict("".join(lines[:10]).encode("UTF-8"))
+    (tmp_path / "books.dict").write_bytes(dictionary.as_bytes())
+    books_file, index_file = str(tmp_path / "books.jsonl.zst"), str(tmp_path / "books.idx")
+    write_framed_books(books_file, index_file, lines, frame_size=7, dictionary=dictionary)
+    results = reduce_books(books_file, [PayoutReducer()], processes=2, chunk_books=9, dictionary_file=str(tmp_path / "books.dict"))
+    assert results == expected
+
+
+def test_project_book_line_matches_filtered_json():
+    books = make_books(30) + [
+        {"id": 31, "payoutMultiplier": 0, "events": [], "criteria": "0"},
+        # Nested objects laid out like event headers, and books not in the SDK layout, are decoded in full
+        {"id": 32, "payoutMultiplier": 0, "events": [{"index": 0, "type": "reveal", "x": {"index": 1, "type": "winInfo"}}]},
+        {"payoutMultiplier": 10, "id": 33, "events": make_events(10), "criteria": "basegame"},
+        {"id": 34, "payoutMultiplier": 10, "events": make_events(10) + [{"type": "winInfo", "index": 3}]},
+    ]
+    projections = [(set(), []), ({"winInfo"}, ["criteria"]), ({"setTotalWin", "reveal"}, None), (None, ["missing"])]
+    for book in books:
+        line = json.dumps(book).encode("UTF-8")
+        for event_types, keys in projections:
+            assert project_book_line(line, event_types, keys) == filter_book(book, event_types, keys)
+    assert scan_projected_book(json.dumps(books[1]), {"winInfo"}, []) == {"id": 2, "payoutMultiplier": 370, "events": [books[1]["events"][1]]}
+    assert all(scan_projected_book(json.dumps(book), {"winInfo"}, []) is None for book in books[31:])
+
+
+def test_reducers_read_their_projection(tmp_path):
+    assert get_projection([WinEventReducer(), MaxWinReducer()]) == (None, None)
+    assert get_projection([WinEventReducer()]) == ({"winInfo"}, {"criteria"})
+
+    books = make_books(50)
+    books_file = write_books(tmp_path / "books_base.jsonl.zst", books)
+    results = reduce_books(books_file, [WinEventReducer()], processes=1, chunk_books=8)
+    assert results["test_win_events"] == {
+        "types": Counter({"winInfo": sum(book["payoutMultiplier"] > 0 for book in books)}),
+        "criteria": Counter({"basegame": 50}),
+    }
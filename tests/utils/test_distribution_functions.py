@@ -0,0 +1,40 @@
+import pytest
+
+from utils.analysis.distribution_functions import (
+    DistributionStats,
+    get_distribution_moments,
+    get_distribution_median,
+    get_maxwin_hitrate,
+    get_prob_no_win,
+    non_zero_hitrate,
+    prob_less_than_bet,
+    calculate_rtp,
+    min_dist_difference,
+)
+
+DIST = {0.0: 0.5, 0.5: 0.2, 2.0: 0.25, 100.0: 0.05}
+
+
+def test_array_stats_merge_duplicate_payouts():
+    stats = DistributionStats([2.0, 0.0, 0.5, 0.0, 100.0, 2.0], [1, 6, 4, 4, 1, 4], bet_cost=1.0)
+    assert stats.payouts.tolist() == [0.0, 0.5, 2.0, 100.0]
+    assert stats.total_weight == 20
+    assert stats.average == pytest.approx(0.5 * 0.2 + 2.0 * 0.25 + 100.0 * 0.05)
+    assert stats.median == 0.0
+    assert stats.get_quantiles([0.6, 0.9, 0.99]) == {0.6: 0.5, 0.9: 2.0, 0.99: 100.0}
+    assert stats.maxwin_hitrate == pytest.approx(20)
+    assert stats.min_diff == 0.5
+
+
+def test_dict_wrappers():
+    average = 0.5 * 0.2 + 2.0 * 0.25 + 100.0 * 0.05
+    variance = sum(weight * (pay - average) ** 2 for pay, weight in DIST.items())
+    skewness = sum(weight * (pay - average) ** 3 for pay, weight in DIST.items()) / variance**1.5
+    assert get_distribution_moments(DIST)[:3] == pytest.approx((variance, variance**0.5, skewness))
+    assert get_distribution_median(DIST) == 0.0
+    assert get_maxwin_hitrate(DIST) == pytest.approx(20)
+    assert get_prob_no_win(DIST) == 0.5
+    assert non_zero_hitrate(DIST) == pytest.approx(2)
+    assert prob_less_than_bet(DIST, 1.0) == pytest.approx(0.7)
+    assert calculate_rtp(DIST, 2.0) == pytest.approx(average / 2)
+    assert min_dist_difference(DIST) == 50
@@ -0,0 +1,28 @@
+from utils.engine_equivalence import compare_books, compare_force, compare_lines, find_difference
+
+
+def make_book(book_id, amounts):
+    events = [{"index": idx, "type": "setWin", "amount": amount} for idx, amount in enumerate(amounts)]
+    return {"id": book_id, "payoutMultiplier": sum(amounts), "events": events, "criteria": "0"}
+
+
+def test_identical_outputs():
+    books = {1: make_book(1, [10, 20]), 2: make_book(2, [0])}
+    assert compare_books(books, books) is None
+    assert compare_lines(["1,1,30"], ["1,1,30"]) is None
+    assert compare_force({(("symbol", "H1"),): {"bookIds": [1]}}, {(("symbol", "H1"),): {"bookIds": [1]}}) is None
+
+
+def test_first_event_divergence_is_reported():
+    reference = {1: make_book(1, [10]), 5: make_book(5, [10, 20, 30])}
+    candidate = {1: make_book(1, [10]), 5: make_book(5, [10, 25, 30])}
+    divergence = compare_books(reference, candidate)
+    assert divergence["sim"] == 4
+    assert divergence["event_index"] == 1
+    assert divergence["path"] == ".amount"
+
+
+def test_missing_event_and_book_fields():
+    assert compare_books({1: make_book(1, [10, 20])}, {1: make_book(1, [10])})["path"] == "missing event"
+    assert find_difference({"a": [1, {"b": 2}]}, {"a": [1, {"b": 3}]}) == ".a[1].b"
+    assert compare_lines(["1,1,0", "2,1,5"], ["1,1,0"]) == {"line": 2, "reference": "2,1,5", "candidate": None}
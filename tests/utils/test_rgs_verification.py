@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+import zstandard as zstd
+
+from utils.rgs_verification import scan_book_line, find_first_mismatch, execute_all_tests
+
+
+def make_book(book_id, payout, num_events):
+    events = [{"index": idx, "type": "setWin", "amount": payout, "details": {"index": 9, "type": "x"}} for idx in range(num_events)]
+    return {"id": book_id, "payoutMultiplier": payout, "events": events, "criteria": "basegame"}
+
+
+class FakeBetMode:
+    def __init__(self, name):
+        self.name = name
+
+    def get_name(self):
+        return self.name
+
+    def get_cost(self):
+        return 1.0
+
+
+class FakeConfig:
+    def __init__(self, publish_path, modes):
+        self.publish_path = str(publish_path)
+        self.game_id = "game"
+        self.bet_modes = [FakeBetMode(mode) for mode in modes]
+
+
+def write_mode(publish_path, mode, books, lut_payouts=None):
+    lines = "".join(json.dumps(book) + "\n" for book in books)
+    (publish_path / f"books_{mode}.jsonl.zst").write_bytes(zstd.ZstdCompressor().compress(lines.encode("UTF-8")))
+    lut_payouts = [book["payoutMultiplier"] for book in books] if lut_payouts is None else lut_payouts
+    (publish_path / f"lookUpTable_{mode}_0.csv").write_text(
+        "".join(f"{idx + 1},1,{payout}\n" for idx, payout in enumerate(lut_payouts))
+    )
+
+
+def test_scan_book_line_matches_json():
+    for book in [make_book(3, 120, 4), make_book(4, 0, 0), {"payoutMultiplier": 10, "id": 7, "events": [{}]}]:
+        line = json.dumps(book).encode("UTF-8")
+        assert scan_book_line(line) == (book["id"], book["payoutMultiplier"], len(book["events"]))
+    with pytest.raises(RuntimeError, match="Missing required key"):
+        scan_book_line(b'{"id": 1, "events": []}')
+    with pytest.raises(RuntimeError, match="Invalid JSON"):
+        scan_book_line(b'{"id": 1, "payoutMultiplier": 0, "events": [')
+
+
+def test_first_mismatch_reports_book_id():
+    ids, payouts = np.array([1, 2, 3], dtype=np.uint64), np.array([0, 20, 30], dtype=np.uint64)
+    assert find_first_mismatch(ids, payouts, ids, payouts) is None
+    assert "book id 2" in find_first_mismatch(ids, payouts, ids, np.array([0, 10, 30], dtype=np.uint64))
+    assert "lookup table id 3 has no book" in find_first_mismatch(ids[:2], payouts[:2], ids, payouts)
+
+
+def test_execute_all_tests(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    publish_path = tmp_path / "publish_files"
+    publish_path.mkdir()
+    write_mode(publish_path, "base", [make_book(idx, 10 * (idx % 3), idx % 4) for idx in range(1, 41)])
+    write_mode(publish_path, "bonus", [make_book(idx, 100 * idx, 2) for idx in range(1, 11)])
+
+    execute_all_tests(FakeConfig(publish_path, ["base", "bonus"]), max_workers=2)
+    stats = json.loads((tmp_path / "game" / "library" / "stats_summary.json").read_text())
+    assert list(stats) == ["base", "bonus"]
+    assert stats["base"]["num_events"] == sum(idx % 4 for idx in range(1, 41))
+    assert stats["bonus"]["max_win"] == 1000
+
+    write_mode(publish_path, "bonus", [make_book(idx, 100 * idx, 2) for idx in range(1, 11)], [100 * idx for idx in range(1, 10)] + [0])
+    with pytest.raises(AssertionError, match="book id 10"):
+        execute_all_tests(FakeConfig(publish_path, ["base", "bonus"]), max_workers=1)
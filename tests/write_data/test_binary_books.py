@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from src.write_data.binary_book_encoder import write_binary_books, BinaryBookEncoder
+from src.write_data.binary_book_decoder import BinaryBookReader, convert_binary_to_jsonl
+
+BOOKS = [
+    {
+        "id": 1,
+        "payoutMultiplier": 250,
+        "events": [
+            {
+                "index": 0,
+                "type": "reveal",
+                "board": [[{"name": "L1"}, {"name": "S", "scatter": True}], [{"name": "W", "multiplier": 2.5}, {"name": "H1"}]],
+                "paddingPositions": [17, 300],
+            },
+            {
+                "index": 1,
+                "type": "winInfo",
+                "totalWin": -3,
+                "wins": [{"symbol": "L1", "positions": [{"reel": 0, "row": 0}, {"row": 1, "reel": 1}], "meta": None}],
+            },
+            {"index": 2, "type": "setTotalWin", "amount": 2**70, "ratio": 0.1, "zero": -0.0, "whole": 3.0, "empty": []},
+        ],
+        "criteria": "freegame",
+        "baseGameWins": 0.0,
+        "freeGameWins": 2.5,
+    },
+    {"id": 2, "payoutMultiplier": 0, "events": [], "criteria": "0", "baseGameWins": 0.0, "freeGameWins": 0.0},
+]
+
+
+@pytest.mark.parametrize("name", ["books.bin", "books.bin.zst"])
+def test_round_trip_is_exact(tmp_path, name):
+    write_binary_books(BOOKS, str(tmp_path / name))
+    reader = BinaryBookReader(str(tmp_path / name))
+    assert len(reader) == 2
+    assert [json.dumps(book) for book in reader] == [json.dumps(book) for book in BOOKS]
+
+    convert_binary_to_jsonl(str(tmp_path / name), str(tmp_path / "books.jsonl"))
+    assert (tmp_path / "books.jsonl").read_text(encoding="UTF-8") == "".join(json.dumps(b) + "\n" for b in BOOKS)
+
+
+def test_events_can_be_skipped(tmp_path):
+    write_binary_books(BOOKS, str(tmp_path / "books.bin"))
+    summaries = list(BinaryBookReader(str(tmp_path / "books.bin")).iter_books(skip_events=True))
+    assert summaries[0] == {**BOOKS[0], "events": None}
+    assert [book["payoutMultiplier"] for book in summaries] == [250, 0]
+
+
+def test_boards_are_symbol_ids():
+    encoder = BinaryBookEncoder()
+    encoder.encode_book(BOOKS[0])
+    assert list(encoder.symbols) == [
+        '{"name": "L1"}',
+        '{"name": "S", "scatter": true}',
+        '{"name": "W", "multiplier": 2.5}',
+        '{"name": "H1"}',
+    ]
+    with pytest.raises(TypeError):
+        encoder.encode_book({"id": 3, "events": [{1, 2}]})
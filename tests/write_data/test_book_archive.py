@@ -0,0 +1,56 @@
+import json
+
+import pytest
+import zstandard as zstd
+
+from src.write_data.book_archive import BookArchive, write_framed_books, train_book_dictionary, load_book_dictionary
+from src.write_data.write_data import read_zst_text
+
+
+def make_lines(ids):
+    return [json.dumps({"id": book_id, "payoutMultiplier": 10 * book_id, "events": [{"index": 0}]}) for book_id in ids]
+
+
+def test_framed_books_are_one_zstd_stream(tmp_path):
+    lines = make_lines(range(1, 24))
+    archive, index = tmp_path / "books_base.jsonl.zst", tmp_path / "books_base.index"
+    write_framed_books(str(archive), str(index), iter(lines), frame_size=5)
+
+    with open(archive, "rb") as f:
+        with zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True) as reader:
+            assert reader.read().decode("UTF-8") == "\n".join(lines) + "\n"
+
+    books = BookArchive(str(archive), str(index))
+    assert len(books) == 23 and len(books.frame_offsets) == 5
+    assert books.get_book(17) == json.loads(lines[16])
+    assert [books.get_book_text(book_id) for book_id in [23, 1, 6]] == [lines[22], lines[0], lines[5]]
+    assert 24 not in books
+    with pytest.raises(KeyError):
+        books.get_book(24)
+
+
+def test_unsorted_ids_and_stale_index(tmp_path):
+    lines = make_lines([5, 3, 9, 1])
+    archive, index = tmp_path / "books.jsonl.zst", tmp_path / "books.index"
+    write_framed_books(str(archive), str(index), lines, frame_size=3)
+    assert BookArchive(str(archive), str(index)).get_book_text(9) == lines[2]
+
+    with open(archive, "ab") as f:
+        f.write(zstd.ZstdCompressor().compress(b"\n"))
+    with pytest.raises(RuntimeError, match="does not match"):
+        BookArchive(str(archive), str(index))
+
+
+def test_dictionary_compressed_frames(tmp_path):
+    lines = make_lines(range(1, 401))
+    dictionary = train_book_dictionary(lines, 4096)
+    dictionary_name = tmp_path / "books_base.dict"
+    dictionary_name.write_bytes(dictionary.as_bytes())
+    archive, index = tmp_path / "books_base.jsonl.zst", tmp_path / "books_base.index"
+    raw_bytes, compressed_bytes = write_framed_books(str(archive), str(index), lines, 10, dictionary)
+
+    assert raw_bytes == len("\n".join(lines)) + 1 and compressed_bytes == archive.stat().st_size
+    assert read_zst_text(str(archive), load_book_dictionary(str(dictionary_name))).splitlines() == lines
+    assert BookArchive(str(archive), str(index), str(dictionary_name)).get_book_text(233) == lines[232]
+    with pytest.raises(RuntimeError, match="dictionary"):
+        BookArchive(str(archive), str(index))
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.write_data.book_writer import BookWriter
+from src.write_data.write_data import write_json, read_temp_lines
+
+
+def make_library(num_books):
+    return {
+        book_id: {"id": book_id, "payoutMultiplier": 10 * book_id, "events": [{"index": 0, "type": "reveal"}]}
+        for book_id in range(1, num_books + 1)
+    }
+
+
+@pytest.mark.parametrize(
+    "name, regular_json", [("books.jsonl.zst", True), ("books.json", True), ("books.jsonl", False)]
+)
+def test_streamed_books_match_write_json(tmp_path, name, regular_json):
+    library = make_library(7)
+    expected_name, streamed_name = str(tmp_path / f"expected_{name}"), str(tmp_path / f"streamed_{name}")
+    write_json(SimpleNamespace(library=library, config=SimpleNamespace(output_regular_json=regular_json)), expected_name)
+
+    writer = BookWriter(streamed_name, regular_json, max_pending=1)
+    books = list(library.values())
+    for idx in range(0, len(books), 3):
+        writer.write_chunk(books[idx : idx + 3])
+    writer.close()
+
+    if name.endswith(".zst"):
+        assert read_temp_lines(streamed_name) == read_temp_lines(expected_name)
+    else:
+        with open(expected_name, "rb") as expected, open(streamed_name, "rb") as streamed:
+            assert streamed.read() == expected.read()
+
+
+def test_writer_errors_are_raised(tmp_path):
+    writer = BookWriter(str(tmp_path / "missing" / "books.jsonl"), False)
+    with pytest.raises(FileNotFoundError):
+        writer.close()
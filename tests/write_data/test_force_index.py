@@ -0,0 +1,50 @@
+import os
+import json
+
+from src.write_data.force_index import ForceIndex, get_force_index_path, load_force_index
+
+FORCE_RECORD = [
+    {"search": [{"name": "kind", "value": "3"}, {"name": "symbol", "value": "L1"}], "timesTriggered": 4, "bookIds": [2, 5]},
+    {"search": [{"name": "kind", "value": "4"}, {"name": "symbol", "value": "H1"}], "timesTriggered": 1, "bookIds": [5]},
+    {"search": [{"name": "kind", "value": "3"}, {"name": "symbol", "value": "H1"}], "timesTriggered": 2, "bookIds": [7, 1]},
+    {"search": [{"name": "symbol", "value": "scatter"}], "timesTriggered": 3, "bookIds": [1, 2, 9]},
+]
+
+
+def scan(search_key):
+    book_ids = []
+    for entry in FORCE_RECORD:
+        search = {item["name"]: str(item["value"]) for item in entry["search"]}
+        if all(search.get(k) == v for k, v in search_key.items()):
+            book_ids.extend(entry["bookIds"])
+    return book_ids
+
+
+def test_queries_match_linear_scan():
+    force_index = ForceIndex.from_force_record(FORCE_RECORD)
+    keys = [{}, {"kind": "3"}, {"symbol": "H1"}, {"kind": "3", "symbol": "H1"}, {"kind": "4", "symbol": "L1"}]
+    keys += [{"symbol": "scatter"}, {"kind": "5"}, {"kind": 3}, {"unknown": "x"}]
+    for search_key in keys:
+        assert force_index.get_book_ids(search_key).tolist() == scan(search_key)
+    # book 5 has 3-kind L1 and 4-kind H1 wins, which must not match a 3-kind H1 search
+    assert force_index.get_book_ids({"kind": "3", "symbol": "H1"}).tolist() == [7, 1]
+    assert force_index.get_times_triggered({"kind": "3"}) == 6
+    assert force_index.get_times_triggered({}) == 10
+    assert [entry["search"] for entry in force_index.iter_entries()] == [entry["search"] for entry in FORCE_RECORD]
+
+
+def test_index_is_written_and_rebuilt_when_stale(tmp_path):
+    force_record_path = str(tmp_path / "force_record_base.json")
+    with open(force_record_path, "w", encoding="UTF-8") as f:
+        f.write(json.dumps(FORCE_RECORD))
+    index_path = get_force_index_path(force_record_path)
+    assert index_path == str(tmp_path / "force_index_base.npz")
+
+    assert load_force_index(force_record_path).get_book_ids({"kind": "4"}).tolist() == [5]
+    assert os.path.isfile(index_path)
+    assert load_force_index(force_record_path).get_book_ids({"kind": "4"}).tolist() == [5]
+
+    with open(force_record_path, "w", encoding="UTF-8") as f:
+        f.write(json.dumps(FORCE_RECORD[:1]))
+    os.utime(index_path, (0, 0))
+    assert load_force_index(force_record_path).get_book_ids({}).tolist() == [2, 5]
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from src.write_data.lookup_arrays import (
+    get_lookup_array_path,
+    load_lookup_array,
+    make_lookup_array,
+    save_lookup_array,
+    write_lookup_array,
+)
+from utils.analysis.distribution_functions import make_win_distribution
+
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="UTF-8") as f:
+        f.write("".join(f"{idx},{weight},{payout}\n" for idx, weight, payout in rows))
+
+
+def test_array_matches_csv_and_is_rebuilt_when_stale(tmp_path):
+    lookup_name = str(tmp_path / "lookUpTable_base_0.csv")
+    write_csv(lookup_name, [(1, 3, 0), (2, 2**63 + 1, 150), (3, 1, 0)])
+    write_lookup_array(lookup_name)
+    assert get_lookup_array_path(lookup_name) == str(tmp_path / "__lutcache__" / "lookUpTable_base_0.npy")
+
+    lut = load_lookup_array(lookup_name)
+    assert lut["id"].tolist() == [1, 2, 3]
+    assert lut["weight"].tolist() == [3, 2**63 + 1, 1]
+    assert lut["payout"].tolist() == [0.0, 150.0, 0.0]
+
+    write_csv(lookup_name, [(1, 5, 20)])
+    os.utime(get_lookup_array_path(lookup_name), (0, 0))
+    assert load_lookup_array(lookup_name)["weight"].tolist() == [5]
+
+
+def test_win_distribution_and_invalid_weights(tmp_path):
+    lookup_name = str(tmp_path / "lookUpTable_base.csv")
+    write_csv(lookup_name, [(1, 2, 0), (2, 1, 250), (3, 1, 0), (4, 4, 10)])
+    assert make_win_distribution(lookup_name, normalize=False) == {0.0: 3.0, 0.1: 4.0, 2.5: 1.0}
+
+    write_csv(lookup_name, [(1, -2, 0)])
+    with pytest.raises(ValueError):
+        load_lookup_array(lookup_name)
+
+
+def test_publish_files_stay_clean(tmp_path):
+    publish_path = tmp_path / "library" / "publish_files"
+    publish_path.mkdir(parents=True)
+    lookup_name = str(publish_path / "lookUpTable_base_0.csv")
+    write_csv(lookup_name, [(1, 1, 0), (2, 3, 20)])
+
+    assert load_lookup_array(lookup_name)["weight"].tolist() == [1, 3]
+    save_lookup_array(lookup_name, make_lookup_array([1, 2], [2, 2], [0, 20]))
+    assert os.listdir(publish_path) == ["lookUpTable_base_0.csv"]
+    assert get_lookup_array_path(lookup_name) == str(
+        tmp_path / "library" / "lookup_tables" / "__lutcache__" / "publish_files" / "lookUpTable_base_0.npy"
+    )
@@ -6,7 +6,9 @@ import json
 import hashlib
 import warnings
 import threading
+import numpy as np
 from botocore.exceptions import NoCredentialsError
+from src.write_data.lookup_arrays import load_lookup_array
 
 
 class check_files:
@@ -117,22 +119,11 @@ class FileDetails:
 
     def get_win_weights(self, fname):
         """Return sorted win distribution."""
-        file = open(fname, "r")
-        winDict = {}
-        total_weight = 0
-        for line in file:
-            _, weight, win = line.split(",")
-            try:
-                winDict[float(win) / 100] += float(weight)
-            except:
-                winDict[float(win) / 100] = float(weight)
-            total_weight += float(weight)
-
-        sorted_wins = list(winDict.keys())
-        sorted_wins.sort()
-        sortedWeights = [winDict[win] for win in sorted_wins]
+        lut = load_lookup_array(fname)
+        sorted_wins, inverse = np.unique(lut["payout"] / 100, return_inverse=True)
+        sortedWeights = np.bincount(inverse.ravel(), weights=lut["weight"], minlength=len(sorted_wins))
 
-        return sorted_wins, sortedWeights
+        return sorted_wins.tolist(), sortedWeights.tolist()
 
     def get_file_paths(self, books=True, config_files=True, lookupTables=True, force_files=True):
         """Get all file upload paths and check existence."""
@@ -228,14 +219,9 @@ class FileDetails:
             )
             if lut_file.split("/")[-1].split("_")[1] in game_modes:
                 wins, weights = self.get_win_weights(lut_file)
-                dotProd = 0.0
-                total_weight = 0.0
                 expected_rtp = config_details["rtp"]
 
-                for win, weight in zip(wins, weights):
-                    dotProd += float(win) * float(weight)
-                    total_weight += weight
-                rtp = (dotProd / total_weight) / bookshelf["cost"]
+                rtp = (np.dot(wins, weights) / np.sum(weights)) / bookshelf["cost"]
 
                 if expected_rtp < 1 and round(rtp, 4) != round(expected_rtp, 4):
                     failed = True
@@ -1,25 +1,44 @@
-from collections import defaultdict
+"""Win distribution statistics.
+
+DistributionStats computes every statistic of a (payouts, weights) array pair in one vectorised pass. The
+dict based functions taking {payout: weight} distributions are wrappers around it.
+"""
+
 from math import sqrt
 import numpy as np
+from src.write_data.lookup_arrays import load_lookup_array
 
 
 def get_lookup_length(filepath: str) -> int:
     """Get length of lookup table."""
-    return sum(1 for _ in open(filepath, "rb"))
+    return len(load_lookup_array(filepath))
+
+
+def get_unique_payouts(payouts, weights) -> tuple:
+    """Sorted unique payouts and their summed weights."""
+    payouts, inverse = np.unique(np.asarray(payouts, dtype=np.float64), return_inverse=True)
+    # bincount adds the weights of each payout in table order, as a per-line sum would
+    weights = np.bincount(inverse.ravel(), weights=np.asarray(weights, dtype=np.float64), minlength=len(payouts))
+    return payouts, weights
+
+
+def get_lookup_distribution(filepath: str) -> tuple:
+    """Unique, ordered payouts (in bet multiples) and their total weights from a lookup table."""
+    lut = load_lookup_array(filepath)
+    return get_unique_payouts(lut["payout"] / 100, lut["weight"])
+
+
+def get_distribution_arrays(dist: dict) -> tuple:
+    """(payouts, weights) arrays of a {payout: weight} distribution."""
+    return get_unique_payouts(list(dist.keys()), list(dist.values()))
 
 
 def make_win_distribution(filepath: str, normalize: bool = True) -> dict:
     """Construct win-distribution with unique, ordered payouts."""
-    dist = defaultdict(float)
-    with open(filepath, "r", encoding="UTF-8") as f:
-        for line in f:
-            _, weight, payout = line.strip().split(",")
-            weight = int(weight)
-            payout = float(payout) / 100
-            dist[payout] += weight
-
-    # Sort by win amount
-    dist = dict(sorted(dist.items(), key=lambda x: x[0], reverse=False))
+    payouts, weights = get_lookup_distribution(filepath)
+
+    # Sorted by win amount
+    dist = dict(zip(payouts.tolist(), weights.tolist()))
     if normalize:
         total_weight = sum(dist.values())
         dist = {x: y / total_weight for x, y in dist.items()}
@@ -27,98 +46,95 @@ def make_win_distribution(filepath: str, normalize: bool = True) -> dict:
     return dist
 
 
+class DistributionStats:
+    """Moments, quantiles, hit-rates and RTP of a win distribution.
+    Payouts need not be sorted or unique, weights need not be normalised."""
+
+    def __init__(self, payouts, weights, bet_cost: float = 1.0):
+        self.payouts, self.weights = get_unique_payouts(payouts, weights)
+        self.bet_cost = bet_cost
+        self.cumulative_weights = np.cumsum(self.weights)
+        self.total_weight = float(self.cumulative_weights[-1])
+        probs = self.weights / self.total_weight
+
+        self.average = float(np.average(self.payouts, weights=self.weights))
+        deviations = self.payouts - self.average
+        self.variance = float(np.dot(deviations**2, probs))
+        self.std = sqrt(self.variance)
+        if self.std > 0:
+            self.skewness = float(np.dot(deviations**3, probs)) / self.std**3
+            self.kurtosis = float(np.dot(deviations**4, probs)) / self.std**4 - 3
+        else:
+            self.skewness, self.kurtosis = 0.0, 0.0
+        self.rtp = float(np.dot(self.payouts, self.weights)) / self.total_weight / bet_cost
+
+        self.min_win, self.max_win = float(self.payouts[0]), float(self.payouts[-1])
+        self.median = self.get_quantile(0.5)
+        self.min_diff = float(np.diff(self.payouts).min()) if len(self.payouts) > 1 else None
+
+        zero_weight = float(self.weights[0]) if self.payouts[0] == 0 else 0.0
+        self.prob_no_win = zero_weight / self.total_weight
+        self.non_zero_hitrate = 1.0 / (1 - self.prob_no_win) if self.prob_no_win < 1 else 0
+        self.maxwin_hitrate = 1.0 / (float(self.weights[-1]) / self.total_weight)
+        self.prob_less_than_bet = float(self.weights[self.payouts < bet_cost].sum()) / self.total_weight
+
+    def get_quantile(self, quantile: float) -> float:
+        """Smallest payout whose cumulative probability reaches the quantile."""
+        idx = int(np.searchsorted(self.cumulative_weights, quantile * self.total_weight, side="left"))
+        return float(self.payouts[min(idx, len(self.payouts) - 1)])
+
+    def get_quantiles(self, quantiles: list) -> dict:
+        """{quantile: payout} for several quantiles."""
+        return {quantile: self.get_quantile(quantile) for quantile in quantiles}
+
+
+def get_distribution_stats(dist: dict, bet_cost: float = 1.0) -> DistributionStats:
+    """Statistics of a {payout: weight} distribution."""
+    return DistributionStats(*get_distribution_arrays(dist), bet_cost=bet_cost)
+
+
 def get_distribution_average(dist: dict) -> float:
     """Return weighted average from ordered win distribution."""
     return np.average(list(dist.keys()), weights=list(dist.values()))
 
 
 def get_distribution_moments(dist: dict) -> float:
-    """Given a (weighted) lookup-table, return standard deviation."""
-    av_win = get_distribution_average(dist)
-    total_weight = sum(list(dist.values()))
-
-    variance = 0.0
-    for pay, weight in dist.items():
-        variance += ((pay - av_win) ** 2) * (weight / total_weight)
-    standard_dev = sqrt(variance)
-
-    skewness, kurtosis = 0.0, 0.0
-    av_win = float(av_win)
-    for win, weight in dist.items():
-        skewness += ((win - av_win) ** 3) * weight
-        kurtosis += ((win - av_win) ** 4) * weight
-    skewness /= (standard_dev) ** 3
-    kurtosis /= (standard_dev) ** 4
-    kurtosis -= 3
-
-    return variance, standard_dev, skewness, kurtosis
+    """Given a (weighted) lookup-table, return variance, standard deviation, skewness and excess kurtosis."""
+    stats = get_distribution_stats(dist)
+    return stats.variance, stats.std, stats.skewness, stats.kurtosis
 
 
 def get_distribution_median(dist: dict, total_weight=None) -> float:
-    """Return median of an ordered win-distribution."""
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-    cumulative_weight = 0
-    for win, weight in dist.items():
-        cumulative_weight += weight
-        if cumulative_weight >= total_weight / 2:
-            return win
-    return 0
+    """Return median of an ordered win-distribution. The total weight is taken from the distribution."""
+    return get_distribution_stats(dist).median
 
 
 def get_maxwin_hitrate(dist: dict, total_weight=None) -> float:
     """Return frequency of max-win."""
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-    max_win_prob = dist[max(list(dist.keys()))] / total_weight
-    return 1.0 / max_win_prob
+    return get_distribution_stats(dist).maxwin_hitrate
 
 
 def get_prob_no_win(dist: dict, total_weight=None) -> float:
     "Probability of 0x payout amount."
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-
-    if min(dist.keys()) == 0:
-        return dist[0]
-    return 0
+    return get_distribution_stats(dist).prob_no_win
 
 
 def prob_less_than_bet(dist: dict, bet_cost: float, total_weight=None):
     """Probability of winning less than mode bet cost."""
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-    cumulative_prob = 0
-    for win, weight in dist.items():
-        if win < bet_cost:
-            cumulative_prob += weight
-
-    return cumulative_prob / total_weight
+    return get_distribution_stats(dist, bet_cost).prob_less_than_bet
 
 
 def non_zero_hitrate(dist: dict, total_weight=None):
-    """Calculate probability of"""
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-
-    if min(dist.keys()) == 0:
-        return 1 / (1 - dist[0] / total_weight)
-    else:
-        return 1
+    """Calculate hit-rate of non-zero wins."""
+    return get_distribution_stats(dist).non_zero_hitrate
 
 
 def calculate_rtp(dist: dict, bet_cost: float, total_weight: float = None) -> float:
     """Get distribution RTP."""
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-    return float(np.dot(list(dist.keys()), list(dist.values()))) / total_weight / bet_cost
+    return get_distribution_stats(dist, bet_cost).rtp
 
 
 def min_dist_difference(dist: dict):
     """Minimum payout amount difference"""
-    wins = list(dist.keys())
-    diff = None
-    for i in range(len(wins) - 2):
-        if diff is None or (diff > abs(wins[i + 1]) - wins[i]):
-            diff = abs(wins[i + 1]) - wins[i]
-    return int(round(diff * 100))
+    diff = get_distribution_stats(dist).min_diff
+    return 0 if diff is None else int(round(diff * 100))
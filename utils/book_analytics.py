@@ -0,0 +1,271 @@
+"""Streaming analysis of simulation books with pluggable reducers.
+
+Books are streamed from .jsonl or .jsonl.zst files in chunks, so memory does not grow with the library. Each
+chunk is mapped into a partial state per reducer, in a pool of worker processes. The partial states are combined
+in chunk order, which gives the same result as a serial pass (floating point sums may differ in the last digits,
+integer counts are exact), and the combined state is finalized into the reducer's result.
+
+A reducer subclasses BookReducer:
+
+    @register_reducer
+    class PayoutCounter(BookReducer):
+        name = "payouts"
+
+        def initial(self):
+            return Counter()
+
+        def map(self, state, book):
+            state[book["payoutMultiplier"]] += 1
+            return state
+
+    results = reduce_books("library/publish_files/books_base.jsonl.zst", ["payouts"], processes=4)
+
+The default combine() merges states recursively: numbers are added, lists are concatenated and dictionaries
+(including Counters) are merged key by key. Reducers keeping other state (maxima, sets, ...) override combine().
+
+Reducers needing only some events set event_types (and keys, the top-level keys other than id, payoutMultiplier
+and events they read). Books are then projected instead of decoded in full: event headers are located by a
+regular expression and only matching events are decoded. A reducer with event_types = None sees every event.
+"""
+
+import os
+import io
+import re
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import zstandard as zstd
+
+from src.write_data.book_archive import load_book_dictionary
+
+CHUNK_BOOKS = 2000
+REDUCERS = {}
+BOOK_HEADER = re.compile(r'\{"id": (\d+), "payoutMultiplier": (\d+), "events": \[')
+EVENT_HEADER = re.compile(r'\{"index": (\d+), "type": "([^"\\]*)"')
+HEADER_KEYS = ("id", "payoutMultiplier", "events")
+
+
+def register_reducer(reducer_class: type) -> type:
+    """Register a reducer class under its name, so it can be requested by name in reduce_books()."""
+    REDUCERS[reducer_class.name] = reducer_class
+    return reducer_class
+
+
+def merge_state(state, other):
+    """Add numbers, concatenate lists and merge dictionaries key by key."""
+    if isinstance(state, dict):
+        for key, value in other.items():
+            state[key] = merge_state(state[key], value) if key in state else value
+        return state
+    if isinstance(state, list):
+        state.extend(other)
+        return state
+    if isinstance(state, (int, float)) and not isinstance(state, bool):
+        return state + other
+    raise TypeError(f"Cannot combine {type(state).__name__} states, override combine().")
+
+
+class BookReducer(ABC):
+    """Map books into a partial state, combine partial states across chunks and finalize the result.
+    event_types/keys: event types and top-level keys read by map(), None for all of them."""
+
+    name = None
+    event_types = None
+    keys = None
+
+    def initial(self):
+        """Empty partial state."""
+        return {}
+
+    @abstractmethod
+    def map(self, state, book: dict):
+        """Add a book to a partial state and return the state, must be defined by every reducer."""
+
+    def combine(self, state, other):
+        """Combine the state of a later chunk into the state of the earlier ones."""
+        return merge_state(state, other)
+
+    def finalize(self, state):
+        """Result of the reducer from the fully combined state."""
+        return state
+
+
+def get_reducers(reducers: list) -> list:
+    """Reducer instances from instances or registered names."""
+    instances = []
+    for reducer in reducers:
+        if isinstance(reducer, str):
+            if reducer not in REDUCERS:
+                raise KeyError(f"No reducer registered as '{reducer}', registered: {sorted(REDUCERS)}")
+            reducer = REDUCERS[reducer]()
+        instances.append(reducer)
+    return instances
+
+
+def get_projection(reducers: list) -> tuple:
+    """Union of the (event_types, keys) read by reducers, None where any reducer reads everything."""
+    event_types, keys = set(), set()
+    for reducer in reducers:
+        event_types = None if event_types is None or reducer.event_types is None else event_types | set(reducer.event_types)
+        keys = None if keys is None or reducer.keys is None else keys | set(reducer.keys)
+    return event_types, keys
+
+
+def filter_book(book: dict, event_types=None, keys=None) -> dict:
+    """Projection of a decoded book."""
+    projected = {key: value for key, value in book.items() if keys is None or key in keys or key in HEADER_KEYS}
+    if event_types is not None and "events" in projected:
+        projected["events"] = [event for event in book["events"] if event.get("type") in event_types]
+    return projected
+
+
+def scan_projected_book(text: str, event_types, keys) -> dict:
+    """Projection of a book in the layout written by the SDK, None for any other layout.
+    Event indices must count up from 0, and the last event must close the events list, so no event is missed."""
+    header = BOOK_HEADER.match(text)
+    if header is None:
+        return None
+    events_end = header.end()
+    headers = list(EVENT_HEADER.finditer(text, events_end))
+    if any(int(event[1]) != count for count, event in enumerate(headers)):
+        return None
+
+    decoder = json.JSONDecoder()
+    events = []
+    for event in headers[:-1]:
+        if event[2] in event_types:
+            events.append(decoder.raw_decode(text, event.start())[0])
+    if headers:
+        # The last event is decoded regardless, to find where the events list ends
+        last_event, events_end = decoder.raw_decode(text, headers[-1].start())
+        if headers[-1][2] in event_types:
+            events.append(last_event)
+
+    tail = text[events_end:].rstrip()
+    if not tail.startswith("]") or not tail.endswith("}"):
+        return None
+    book = {"id": int(header[1]), "payoutMultiplier": int(header[2]), "events": events}
+    if keys is None or any(key not in HEADER_KEYS for key in keys):
+        tail = tail[1:].lstrip()
+        if tail.startswith(","):
+            trailing = json.loads("{" + tail[1:])
+            book.update(trailing if keys is None else {key: trailing[key] for key in keys if key in trailing})
+        elif tail != "}":
+            return None
+    return book
+
+
+def project_book_line(line, event_types=None, keys=None) -> dict:
+    """Decode a book line, keeping only events of event_types and the top-level keys in keys (None for all).
+    id, payoutMultiplier and events are always kept."""
+    if event_types is None:
+        return filter_book(json.loads(line), keys=keys)
+    text = line.decode("UTF-8") if isinstance(line, bytes) else line
+    book = scan_projected_book(text, event_types, keys)
+    if book is None:
+        book = filter_book(json.loads(text), event_types, keys)
+    return book
+
+
+def stream_book_lines(books_file: str, dictionary_file: str = None):
+    """Yield the non-empty lines of a .jsonl or .jsonl.zst books file without reading it all into memory."""
+    with open(books_file, "rb") as f:
+        if books_file.endswith(".zst"):
+            dictionary = None if dictionary_file is None else load_book_dictionary(dictionary_file)
+            reader = zstd.ZstdDecompressor(dict_data=dictionary).stream_reader(f, read_across_frames=True)
+            stream = io.BufferedReader(reader, buffer_size=1 << 20)
+        else:
+            stream = f
+        for line in stream:
+            if line.strip():
+                yield line
+
+
+def iter_book_chunks(books_file: str, chunk_books: int = CHUNK_BOOKS, dictionary_file: str = None):
+    """Yield lists of up to chunk_books raw book lines."""
+    chunk = []
+    for line in stream_book_lines(books_file, dictionary_file):
+        chunk.append(line)
+        if len(chunk) == chunk_books:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_books(books_file: str, event_types=None, keys=None, dictionary_file: str = None):
+    """Yield decoded, optionally projected, books."""
+    if event_types is not None:
+        event_types = set(event_types)
+    for line in stream_book_lines(books_file, dictionary_file):
+        yield project_book_line(line, event_types, keys)
+
+
+def map_chunk(reducers: list, lines: list) -> list:
+    """Partial state of every reducer over a chunk of book lines."""
+    event_types, keys = get_projection(reducers)
+    states = [reducer.initial() for reducer in reducers]
+    for line in lines:
+        book = json.loads(line) if event_types is None and keys is None else project_book_line(line, event_types, keys)
+        for idx, reducer in enumerate(reducers):
+            states[idx] = reducer.map(states[idx], book)
+    return states
+
+
+_worker_reducers = None
+
+
+def init_reducer_worker(reducers: list) -> None:
+    global _worker_reducers
+    _worker_reducers = reducers
+
+
+def map_chunk_in_worker(lines: list) -> list:
+    return map_chunk(_worker_reducers, lines)
+
+
+def reduce_book_iterable(books, reducers: list) -> dict:
+    """Run reducers serially over already decoded books, returning {reducer name: result}."""
+    reducers = get_reducers(reducers)
+    states = [reducer.initial() for reducer in reducers]
+    for book in books:
+        for idx, reducer in enumerate(reducers):
+            states[idx] = reducer.map(states[idx], book)
+    return {reducer.name: reducer.finalize(state) for reducer, state in zip(reducers, states)}
+
+
+def reduce_books(
+    books_file: str,
+    reducers: list,
+    processes: int = None,
+    chunk_books: int = CHUNK_BOOKS,
+    dictionary_file: str = None,
+) -> dict:
+    """Stream a books file through reducers in worker processes, returning {reducer name: result}.
+    processes: worker count, defaults to the number of cores. 1 runs in the calling process.
+    At most two chunks per worker are in flight, bounding memory regardless of the library size."""
+    reducers = get_reducers(reducers)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    states = [reducer.initial() for reducer in reducers]
+
+    def combine(partial_states: list) -> None:
+        for idx, reducer in enumerate(reducers):
+            states[idx] = reducer.combine(states[idx], partial_states[idx])
+
+    chunks = iter_book_chunks(books_file, chunk_books, dictionary_file)
+    if processes <= 1:
+        for lines in chunks:
+            combine(map_chunk(reducers, lines))
+    else:
+        with ProcessPoolExecutor(processes, initializer=init_reducer_worker, initargs=(reducers,)) as executor:
+            in_flight = deque()
+            for lines in chunks:
+                in_flight.append(executor.submit(map_chunk_in_worker, lines))
+                if len(in_flight) >= 2 * processes:
+                    combine(in_flight.popleft().result())
+            while in_flight:
+                combine(in_flight.popleft().result())
+
+    return {reducer.name: reducer.finalize(state) for reducer, state in zip(reducers, states)}
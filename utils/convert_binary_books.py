@@ -0,0 +1,31 @@
+"""Convert books between the RGS .jsonl.zst format and the compact binary book format.
+
+usage:
+    python -m utils.convert_binary_books to-binary games/gates/library/publish_files/books_base.jsonl.zst books_base.bin.zst
+    python -m utils.convert_binary_books to-jsonl books_base.bin.zst books_base.jsonl.zst
+"""
+
+import sys
+import argparse
+
+from src.write_data.binary_book_encoder import convert_jsonl_to_binary
+from src.write_data.binary_book_decoder import convert_binary_to_jsonl
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("direction", choices=["to-binary", "to-jsonl"])
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("--dictionary", default=None, help="zstd dictionary of the source .jsonl.zst books")
+    args = parser.parse_args(argv)
+
+    if args.direction == "to-binary":
+        convert_jsonl_to_binary(args.source, args.target, args.dictionary)
+    else:
+        convert_binary_to_jsonl(args.source, args.target)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
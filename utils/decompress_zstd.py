@@ -17,7 +17,7 @@ def decompress(input_path: str, save_output: bool = False):
 
     decompressor = zstd.ZstdDecompressor()
     with open(input_path, "rb") as f:
-        with decompressor.stream_reader(f) as reader:
+        with decompressor.stream_reader(f, read_across_frames=True) as reader:
             decompressed_data = reader.read().decode("utf-8")
 
     all_sims = decompressed_data.split("\n")
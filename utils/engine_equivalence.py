@@ -0,0 +1,198 @@
+"""Differential check that a candidate engine produces identical output to the reference gamestate.
+
+Both engines simulate the same sampled simulation ids (seeded by simulation number, with the criteria
+allocation used by create_books). Books are compared event-by-event, followed by lookup tables,
+segmented lookup tables and force records. The first divergence is reported with its sim id and event index.
+
+usage:
+    python -m utils.engine_equivalence <game> <candidate module>:<GameState class> --mode base --sims 100000 --sample 500
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import importlib
+import tempfile
+
+from src.config.paths import PATH_TO_GAMES
+from src.wins.win_manager import WinManager
+from src.state.run_sims import get_sim_splits, assign_sim_criteria
+from src.write_data.write_data import make_lookup_tables, make_lookup_pay_split
+
+
+def get_sampled_sims(num_sims: int, sample_size: int, seed: int = 0) -> list:
+    """Sorted random subset of simulation ids."""
+    if sample_size >= num_sims:
+        return list(range(num_sims))
+    return sorted(random.Random(seed).sample(range(num_sims), sample_size))
+
+
+def run_engine(gamestate: object, betmode: str, sims: list, sim_to_criteria: dict) -> dict:
+    """Simulate the given ids in-process, returning books, lookup table lines and force records."""
+    gamestate.win_manager = WinManager(gamestate.config.basegame_type, gamestate.config.freegame_type)
+    gamestate.library = {}
+    gamestate.recorded_events = {}
+    gamestate.betmode = betmode
+    gamestate.num_sims = len(sims)
+    for sim in sims:
+        gamestate.criteria = sim_to_criteria[sim]
+        gamestate.run_spin(sim)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lookup_name = os.path.join(temp_dir, "lookUpTable")
+        segmented_name = os.path.join(temp_dir, "lookUpTableSegmented")
+        make_lookup_tables(gamestate, lookup_name)
+        make_lookup_pay_split(gamestate, segmented_name)
+        with open(lookup_name, "r", encoding="UTF-8") as f:
+            lookup_table = f.read().splitlines()
+        with open(segmented_name, "r", encoding="UTF-8") as f:
+            segmented_table = f.read().splitlines()
+
+    return {
+        "books": {book_id: json.loads(json.dumps(book)) for book_id, book in gamestate.library.items()},
+        "lookup_table": lookup_table,
+        "segmented_table": segmented_table,
+        "force": {key: json.loads(json.dumps(value)) for key, value in gamestate.recorded_events.items()},
+    }
+
+
+def find_difference(reference: object, candidate: object, path: str = "") -> str:
+    """Path to the first differing value between two JSON-ready objects, or None if equal."""
+    if type(reference) is not type(candidate):
+        return path or "<root>"
+    if isinstance(reference, dict):
+        for key in list(reference.keys()) + [k for k in candidate.keys() if k not in reference]:
+            if key not in reference or key not in candidate:
+                return f"{path}.{key}"
+            difference = find_difference(reference[key], candidate[key], f"{path}.{key}")
+            if difference is not None:
+                return difference
+        return None
+    if isinstance(reference, list):
+        for idx, (ref_item, cand_item) in enumerate(zip(reference, candidate)):
+            difference = find_difference(ref_item, cand_item, f"{path}[{idx}]")
+            if difference is not None:
+                return difference
+        if len(reference) != len(candidate):
+            return f"{path}.length ({len(reference)} != {len(candidate)})"
+        return None
+    return None if reference == candidate else path or "<root>"
+
+
+def compare_books(reference: dict, candidate: dict) -> dict:
+    """First differing book, with the event index where applicable. Libraries are keyed by book id (sim + 1)."""
+    for book_id in sorted(set(reference) | set(candidate)):
+        sim = book_id - 1
+        if book_id not in reference or book_id not in candidate:
+            return {"sim": sim, "event_index": None, "path": "missing book"}
+        ref_book, cand_book = reference[book_id], candidate[book_id]
+        ref_events, cand_events = ref_book["events"], cand_book["events"]
+        for idx in range(max(len(ref_events), len(cand_events))):
+            if idx >= len(ref_events) or idx >= len(cand_events):
+                return {"sim": sim, "event_index": idx, "path": "missing event"}
+            difference = find_difference(ref_events[idx], cand_events[idx])
+            if difference is not None:
+                return {
+                    "sim": sim,
+                    "event_index": idx,
+                    "path": difference,
+                    "reference": ref_events[idx],
+                    "candidate": cand_events[idx],
+                }
+        difference = find_difference(
+            {k: v for k, v in ref_book.items() if k != "events"},
+            {k: v for k, v in cand_book.items() if k != "events"},
+        )
+        if difference is not None:
+            return {"sim": sim, "event_index": None, "path": difference}
+    return None
+
+
+def compare_lines(reference: list, candidate: list) -> dict:
+    """First differing line of a lookup table."""
+    for idx in range(max(len(reference), len(candidate))):
+        ref_line = reference[idx] if idx < len(reference) else None
+        cand_line = candidate[idx] if idx < len(candidate) else None
+        if ref_line != cand_line:
+            return {"line": idx + 1, "reference": ref_line, "candidate": cand_line}
+    return None
+
+
+def compare_force(reference: dict, candidate: dict) -> dict:
+    """First differing force record key."""
+    for key in sorted(set(reference) | set(candidate), key=str):
+        if reference.get(key) != candidate.get(key):
+            return {"search": dict(key), "reference": reference.get(key), "candidate": candidate.get(key)}
+    return None
+
+
+def compare_engines(
+    reference: object, candidate: object, betmode: str, num_sims: int, sample_size: int = 500, seed: int = 0
+) -> dict:
+    """Run both engines over the same sampled simulations and report the first divergence of each output."""
+    sim_to_criteria = assign_sim_criteria(get_sim_splits(reference, num_sims, betmode), num_sims)
+    sims = get_sampled_sims(num_sims, sample_size, seed)
+    reference_output = run_engine(reference, betmode, sims, sim_to_criteria)
+    candidate_output = run_engine(candidate, betmode, sims, sim_to_criteria)
+
+    report = {
+        "betmode": betmode,
+        "sims": len(sims),
+        "books": compare_books(reference_output["books"], candidate_output["books"]),
+        "lookup_table": compare_lines(reference_output["lookup_table"], candidate_output["lookup_table"]),
+        "segmented_table": compare_lines(reference_output["segmented_table"], candidate_output["segmented_table"]),
+        "force": compare_force(reference_output["force"], candidate_output["force"]),
+    }
+    report["identical"] = all(report[k] is None for k in ["books", "lookup_table", "segmented_table", "force"])
+    return report
+
+
+def print_report(report: dict) -> None:
+    """Summarise an equivalence report."""
+    if report["identical"]:
+        print(f"[{report['betmode']}] {report['sims']} sampled simulations are identical.")
+        return
+    print(f"[{report['betmode']}] Divergence found in {report['sims']} sampled simulations:")
+    if report["books"] is not None:
+        book = report["books"]
+        print(f"  books: sim {book['sim']} (book id {book['sim'] + 1}), event {book['event_index']}, at {book['path']}")
+        if "reference" in book:
+            print(f"    reference: {json.dumps(book['reference'])[:500]}")
+            print(f"    candidate: {json.dumps(book['candidate'])[:500]}")
+    for name in ["lookup_table", "segmented_table", "force"]:
+        if report[name] is not None:
+            print(f"  {name}: {report[name]}")
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("game", help="game folder within games/")
+    parser.add_argument("candidate", help="<module>:<class> of the candidate gamestate, importable from the game folder")
+    parser.add_argument("--mode", nargs="+", default=None, help="bet modes to compare, defaults to all")
+    parser.add_argument("--sims", type=int, default=100000, help="library size used for criteria allocation")
+    parser.add_argument("--sample", type=int, default=500, help="number of simulation ids to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.join(PATH_TO_GAMES, args.game))
+    from game_config import GameConfig
+    from gamestate import GameState
+
+    module_name, class_name = args.candidate.split(":")
+    CandidateState = getattr(importlib.import_module(module_name), class_name)
+
+    # Each engine gets its own config, so state one engine keeps on its config cannot leak into the other
+    reference, candidate = GameState(GameConfig()), CandidateState(GameConfig())
+    modes = args.mode or [betmode.get_name() for betmode in reference.config.bet_modes]
+    identical = True
+    for mode in modes:
+        report = compare_engines(reference, candidate, mode, args.sims, args.sample, args.seed)
+        print_report(report)
+        identical = identical and report["identical"]
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 from src.config.paths import PATH_TO_GAMES
 from collections import defaultdict
 import os
+import numpy as np
+from src.write_data.lookup_arrays import load_lookup_array
 
 
 def get_unoptimized_hits(lut_path, all_modes, win_ranges):
@@ -9,14 +11,12 @@ def get_unoptimized_hits(lut_path, all_modes, win_ranges):
     total_mode_count = {}
     for mode in all_modes:
         base_lut_file = os.path.join(lut_path, "lookUpTable_" + str(mode) + ".csv")
-        lut = open(base_lut_file, "r", encoding="UTF-8")
-        counter = 0
-        for line in lut:
-            _, _, payout = line.strip().split(",")
-            all_modes_base_dist[mode][float(round(int(payout) / 100, 2))] += 1
-            counter += 1
-
-        total_mode_count[mode] = counter
+        lut = load_lookup_array(base_lut_file)
+        payouts, counts = np.unique(np.round(lut["payout"] / 100, 2), return_counts=True)
+        for payout, count in zip(payouts.tolist(), counts.tolist()):
+            all_modes_base_dist[mode][payout] += count
+
+        total_mode_count[mode] = len(lut)
 
     # Segregate to win-ranges
     all_modes_range_hits = {}
@@ -1,8 +1,10 @@
 """Analyze symbol hit-rates"""
 
-import json
 import os
+import numpy as np
 from src.config.paths import PATH_TO_GAMES
+from src.write_data.force_index import load_force_index
+from src.write_data.lookup_arrays import load_lookup_array
 
 
 class HitRateCalculations:
@@ -22,32 +24,15 @@ class HitRateCalculations:
         lut_file = os.path.join(
             PATH_TO_GAMES, self.game_id, "library", "publish_files", f"lookUpTable_{self.mode}_0.csv"
         )
-        with open(force_file, "r", encoding="UTF-8") as f:
-            file_dict = json.load(f)
-            all_keys = [d.keys() for d in file_dict]
-        f.close()
-
-        lut_ids = []
-        weights = []
-        payouts = []
-        with open(lut_file, "r", encoding="UTF-8") as f:
-            for line in f:
-                lut_ids.append(int(line.strip().split(",")[0]))
-                weights.append(int(line.strip().split(",")[1]))
-                payouts.append(float(line.strip().split(",")[2]))
-        f.close()
-
-        self.weights = weights
-        self.total_weight = sum(self.weights)
-        self.payouts = payouts
-        self.force_dict = file_dict
-        self.all_keys = all_keys
-
-    def get_hit_rates(self, unique_ids: list) -> float:
+        lut = load_lookup_array(lut_file)
+        self.weights = lut["weight"]
+        self.total_weight = int(self.weights.sum())
+        self.payouts = lut["payout"]
+        self.force_index = load_force_index(force_file)
+
+    def get_hit_rates(self, unique_ids) -> float:
         """Get hit-rates using inverse probabilities from optimized lookup tables."""
-        cumulative_weight = 0
-        for idx in unique_ids:
-            cumulative_weight += self.weights[idx - 1]
+        cumulative_weight = int(self.weights[np.asarray(unique_ids, dtype=np.int64) - 1].sum())
 
         prob = cumulative_weight / self.total_weight
         try:
@@ -55,46 +40,23 @@ class HitRateCalculations:
         except ZeroDivisionError:
             return 0
 
-    def get_av_wins(self, unique_ids: list) -> float:
+    def get_av_wins(self, unique_ids) -> float:
         """Return average win amount for a specified list of simulation ids."""
-        search_key_tot_weight = 0
+        ids = np.asarray(unique_ids, dtype=np.int64) - 1
         # find out the total payout and weights from the force keys subset of the lookup table
-        for id in unique_ids:
-            search_key_tot_weight += self.weights[id - 1]
-        average_win = 0
-        # multiply each win in the subset of lookup table by the ratio of its weight to normalize the avg payout
-        for id in unique_ids:
-            norm_payout = self.payouts[id - 1] * (self.weights[id - 1] / search_key_tot_weight)
-            average_win += norm_payout
-        try:
-            return average_win
-        except ZeroDivisionError:
+        search_key_tot_weight = int(self.weights[ids].sum())
+        if search_key_tot_weight == 0:
             return 0
+        # weight each win in the subset of lookup table to normalize the avg payout
+        return float(np.dot(self.payouts[ids], self.weights[ids]) / search_key_tot_weight)
 
     def get_sim_count(self, search_key: dict) -> int:
         """Get raw sim count with partial or complete matches to force file keys."""
-        search_key_count = 0
-        for key in self.force_dict:
-            transform_dict = {}
-            for i in key["search"]:
-                transform_dict[i["name"]] = i["value"]
-            if all(transform_dict.get(x) == y for x, y in search_key.items()):
-                search_key_count += key["timesTriggered"]
-        return search_key_count
-
-    def return_valid_ids(self, search_key) -> list:
-        """Extract all ids with a partial match to search conditions."""
-        valid_ids = []
-        for item in self.force_dict:
-            transform_dict = {}
-            for i in item["search"]:
-                transform_dict[i["name"]] = str(i["value"])
-
-            if all(transform_dict.get(k) == v for k, v in search_key.items()):
-                validIDs = item["bookIds"]
-                valid_ids.extend(validIDs)
-
-        return valid_ids
+        return self.force_index.get_times_triggered(search_key)
+
+    def return_valid_ids(self, search_key):
+        """Extract all ids with a partial match to search conditions, as an array of book ids."""
+        return self.force_index.get_book_ids(search_key)
 
 
 def construct_symbol_keys(config) -> list:
@@ -3,6 +3,9 @@
 import json
 import os
 from collections import defaultdict
+import numpy as np
+from src.write_data.force_index import load_force_index
+from src.write_data.lookup_arrays import load_lookup_array
 
 
 def create_multiplier_stats_summary(config, gamestate=None):
@@ -90,12 +93,11 @@ def analyze_multiplier_mode(config, mode_name, mode_cost):
     force_path = os.path.join(config.library_path, "forces", f"force_record_{mode_name}.json")
     if os.path.exists(force_path):
         try:
-            with open(force_path, 'r') as f:
-                force_data = json.load(f)
-                mode_stats.update(analyze_force_data(force_data, mode_cost))
-                # Use the more accurate recalculation method
-                mode_stats = recalculate_rtp_from_force_data(mode_stats, config, mode_name, mode_cost)
-                force_data_loaded = True
+            force_data = list(load_force_index(force_path).iter_entries())
+            mode_stats.update(analyze_force_data(force_data, mode_cost))
+            # Use the more accurate recalculation method
+            mode_stats = recalculate_rtp_from_force_data(mode_stats, config, mode_name, mode_cost)
+            force_data_loaded = True
         except (json.JSONDecodeError, FileNotFoundError):
             pass
     
@@ -186,20 +188,20 @@ def analyze_lookup_table(lut_path, mode_cost):
     }
     
     try:
-        with open(lut_path, 'r') as f:
-            for line in f:
-                parts = line.strip().split(',')
-                if len(parts) >= 3:
-                    weight = int(parts[1])
-                    payout_hundredths = int(parts[2])
-                    multiplier = payout_hundredths / 100.0  # Convert from hundredths to multiplier
-                    
-                    stats["total_weight"] += weight
-                    stats["total_payout"] += (multiplier * weight)  # Use actual multiplier
-                    
-                    # Categorize payouts using new range system
-                    range_name = _get_payout_range(multiplier)
-                    stats["payout_distribution"][range_name] += weight
+        lut = load_lookup_array(lut_path)
+        weights = lut["weight"]
+        multipliers = lut["payout"] / 100.0  # Convert from hundredths to multiplier
+        
+        stats["total_weight"] = int(weights.sum())
+        stats["total_payout"] = float(np.dot(multipliers, weights))  # Use actual multiplier
+        
+        # Categorize payouts using new range system, one lookup per unique multiplier
+        unique_multipliers, inverse = np.unique(multipliers, return_inverse=True)
+        multiplier_weights = np.zeros(len(unique_multipliers), dtype=np.uint64)
+        np.add.at(multiplier_weights, inverse.ravel(), weights)
+        for multiplier, weight in zip(unique_multipliers.tolist(), multiplier_weights.tolist()):
+            range_name = _get_payout_range(multiplier)
+            stats["payout_distribution"][range_name] += weight
         
         # Calculate RTP
         if stats["total_weight"] > 0:
@@ -274,8 +276,7 @@ def recalculate_rtp_from_force_data(mode_stats, config, mode_name, mode_cost):
         return mode_stats
     
     try:
-        with open(force_path, 'r') as f:
-            force_data = json.load(f)
+        force_data = load_force_index(force_path).iter_entries()
         
         total_payout = 0.0
         total_spins = 0
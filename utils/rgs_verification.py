@@ -5,24 +5,19 @@ Output statistics tested via RGS
 
 import json
 import os
+import re
 import importlib
-from io import TextIOWrapper
+from io import TextIOWrapper, BufferedReader
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import zstandard as zst
 import hashlib
 import pickle
-from utils.analysis.distribution_functions import (
-    make_win_distribution,
-    get_distribution_moments,
-    get_distribution_average,
-    non_zero_hitrate,
-    prob_less_than_bet,
-    get_prob_no_win,
-    get_maxwin_hitrate,
-    get_distribution_median,
-    min_dist_difference,
-    calculate_rtp,
-)
+from src.write_data.lookup_arrays import load_lookup_array
+from utils.analysis.distribution_functions import make_win_distribution, get_distribution_stats
+
+BOOK_HEADER = re.compile(rb'\{"id": (\d+), "payoutMultiplier": (\d+), "events": \[')
+EVENT_HEADER = re.compile(rb'\{"index": (\d+), "type": ')
 
 
 class WinStatistics:
@@ -80,40 +75,32 @@ class WinStatistics:
 
 def verify_lookup_format(filename: str) -> list:
     "Duplicate RGS verification before upload."
-    integer_payouts = []
-    running_weight_total = 0
-    min_win, max_win = None, None
     win_distribution = make_win_distribution(filename)
-
-    with open(filename, "r", encoding="UTF-8") as f:
-        for line in f:
-            _, weight, payout = line.strip().split(",")
-            weight = float(weight)
-            payout = float(payout)
-
-            # Payout checks
-            assert payout.is_integer() and payout >= 0, "Payout mult be uint64 format:"
-            if payout > 0:
-                assert payout >= 10, "Minimum non-zero payout is 10 (RGS accepts 'cents' increments)."
-            assert payout % 10 == 0, "Payout values must be in increments of 10."
-            integer_payouts.append(int(payout))
-
-            if (min_win is None) or (payout < min_win):
-                min_win = payout
-            if (max_win is None) or (payout > max_win):
-                max_win = payout
-            # Weight checks
-            assert weight.is_integer() and weight >= 0, "Weight must be uint64 format."
-            running_weight_total += weight
-
+    try:
+        lut = load_lookup_array(filename)
+    except ValueError as err:
+        raise AssertionError("Weight must be uint64 format.") from err
+    payouts, weights = lut["payout"], lut["weight"]
+
+    # Payout checks
+    assert np.all((payouts == np.floor(payouts)) & (payouts >= 0)), "Payout mult be uint64 format:"
+    assert np.all((payouts == 0) | (payouts >= 10)), "Minimum non-zero payout is 10 (RGS accepts 'cents' increments)."
+    assert np.all(payouts % 10 == 0), "Payout values must be in increments of 10."
+    integer_payouts = payouts.astype(np.int64).tolist()
+    min_win = float(payouts.min()) if len(payouts) else None
+    max_win = float(payouts.max()) if len(payouts) else None
+
+    # Weight checks, summed as python floats since the uint64 column could overflow
+    running_weight_total = sum(weights.astype(np.float64).tolist())
     assert running_weight_total <= np.iinfo(np.uint64).max, "Sum of weights must be <= MAX(uint64)"
 
     return win_distribution, integer_payouts, running_weight_total, min_win, max_win
 
 
 # payout mult value match to lut + length match
-def verify_books_and_payout_mults(books_filename: str) -> list:
-    """Ensure the values written to the books match those in the lookup table exactly."""
+def verify_books_and_payout_mults(books_filename: str, dictionary_filename: str = None) -> list:
+    """Ensure the values written to the books match those in the lookup table exactly.
+    dictionary_filename: zstd dictionary the books were compressed with (config.book_dictionary_size)."""
     assert str(books_filename).endswith(".jsonl.zstd") or str(books_filename).endswith(
         "jsonl.zst"
     ), "Verification is only run for compressed book files of format .jsonl.zst."
@@ -121,8 +108,12 @@ def verify_books_and_payout_mults(books_filename: str) -> list:
     book_payout_ints = []
     total_num_events = 0
     with open(books_filename, "rb") as f:
-        decompressor = zst.ZstdDecompressor()
-        with decompressor.stream_reader(f) as reader:
+        dictionary = None
+        if dictionary_filename is not None:
+            with open(dictionary_filename, "rb") as dict_file:
+                dictionary = zst.ZstdCompressionDict(dict_file.read())
+        decompressor = zst.ZstdDecompressor(dict_data=dictionary)
+        with decompressor.stream_reader(f, read_across_frames=True) as reader:
             txt_stream = TextIOWrapper(reader, encoding="UTF-8")
             for line in txt_stream:
                 line = line.strip()
@@ -144,6 +135,88 @@ def verify_books_and_payout_mults(books_filename: str) -> list:
     return book_payout_ints, total_num_events
 
 
+def scan_book_line(line: bytes) -> tuple:
+    """(id, payoutMultiplier, number of events) of a single line book.
+    Books written by the SDK are read from the leading fields and event headers without decoding the json. Other
+    layouts, or events whose indices do not count up from 0, are decoded in full."""
+    header = BOOK_HEADER.match(line)
+    if header is not None:
+        indices = EVENT_HEADER.findall(line, header.end())
+        if indices and all(int(index) == count for count, index in enumerate(indices)):
+            return int(header[1]), int(header[2]), len(indices)
+        if not indices and line[header.end() : header.end() + 1] == b"]":
+            return int(header[1]), int(header[2]), 0
+
+    try:
+        blob = json.loads(line)
+    except json.JSONDecodeError:
+        raise RuntimeError("Invalid JSON format.")
+    for key in ["payoutMultiplier", "id", "events"]:
+        if key not in blob:
+            raise RuntimeError(f"Missing required key: {key}")
+    if type(blob["payoutMultiplier"]) is not int:
+        raise RuntimeError(f"Book {blob['id']} payoutMultiplier must be an integer.")
+    return blob["id"], blob["payoutMultiplier"], len(blob["events"])
+
+
+def scan_books(books_filename: str, dictionary_filename: str = None) -> tuple:
+    """Stream compressed books, returning arrays of book ids and payout multipliers and the total event count."""
+    assert str(books_filename).endswith(".jsonl.zstd") or str(books_filename).endswith(
+        "jsonl.zst"
+    ), "Verification is only run for compressed book files of format .jsonl.zst."
+
+    book_ids, book_payouts = [], []
+    total_num_events = 0
+    dictionary = None
+    if dictionary_filename is not None:
+        with open(dictionary_filename, "rb") as dict_file:
+            dictionary = zst.ZstdCompressionDict(dict_file.read())
+    decompressor = zst.ZstdDecompressor(dict_data=dictionary)
+    with open(books_filename, "rb") as f:
+        with decompressor.stream_reader(f, read_across_frames=True) as reader:
+            for line in BufferedReader(reader, buffer_size=1 << 20):
+                line = line.strip()
+                if not line:
+                    continue
+                book_id, payout, num_events = scan_book_line(line)
+                book_ids.append(book_id)
+                book_payouts.append(payout)
+                total_num_events += num_events
+
+    return np.array(book_ids, dtype=np.uint64), np.array(book_payouts, dtype=np.uint64), total_num_events
+
+
+def find_first_mismatch(book_ids, book_payouts, lut_ids, lut_payouts) -> str:
+    """Description of the first book whose id or payout differs from the lookup table, None if all match."""
+    length = min(len(book_ids), len(lut_ids))
+    differing = np.flatnonzero((book_ids[:length] != lut_ids[:length]) | (book_payouts[:length] != lut_payouts[:length]))
+    if len(differing) > 0:
+        pos = int(differing[0])
+        return (
+            f"row {pos + 1}: book id {int(book_ids[pos])} payoutMultiplier {int(book_payouts[pos])}, "
+            f"lookup table id {int(lut_ids[pos])} payout {int(lut_payouts[pos])}"
+        )
+    if len(book_ids) > length:
+        return f"book id {int(book_ids[length])} is missing from the lookup table ({len(book_ids)} books, {length} rows)"
+    if len(lut_ids) > length:
+        return f"lookup table id {int(lut_ids[length])} has no book ({length} books, {len(lut_ids)} rows)"
+    return None
+
+
+def verify_mode(name: str, cost: float, book_file: str, lut_file: str, dictionary_file: str = None) -> object:
+    """Verify the lookup table and books of a single mode, returning its statistics."""
+    win_dist, lut_payouts, weights_range, min_win, max_win = verify_lookup_format(lut_file)
+    book_ids, book_payouts, num_events = scan_books(book_file, dictionary_file)
+
+    lut = load_lookup_array(lut_file)
+    mismatch = find_first_mismatch(book_ids, book_payouts, lut["id"], lut["payout"].astype(np.uint64))
+    assert mismatch is None, f"Mismatch in payout array for {name} mode, {mismatch}."
+
+    StatsObject = get_lut_statistics(win_dist, cost, lut_payouts, weights_range, min_win, max_win, num_events)
+    setattr(StatsObject, "name", name)
+    return StatsObject
+
+
 def compare_payout_values(book_int_payouts, lut_int_payouts) -> None:
     """Ensure payout multiplier values match between books and lookup tables."""
     book_ints = pickle.dumps(book_int_payouts)
@@ -153,47 +226,44 @@ def compare_payout_values(book_int_payouts, lut_int_payouts) -> None:
 
 def get_num_non_zero_payouts(book_int_payouts) -> None:
     """Count non-zero payouts"""
-    return len([p for p in book_int_payouts if p > 0])
+    return int(np.count_nonzero(np.asarray(book_int_payouts) > 0))
 
 
 def get_lut_statistics(
     win_distribution, bet_cost, unique_payouts, weight_range, min_win, max_win, num_events
 ) -> object:
     """Run RGS statistic tests for upload verification."""
-
-    var, std, skew, kurtosis = get_distribution_moments(win_distribution)
+    stats = get_distribution_stats(win_distribution, bet_cost)
     MathStats = WinStatistics(
         win_distribution=win_distribution,
         num_events=num_events,
         weight_range=weight_range,
         min_win=min_win,
         max_win=max_win,
-        min_diff=min_dist_difference(win_distribution),
+        min_diff=0 if stats.min_diff is None else int(round(stats.min_diff * 100)),
         unique_wins=unique_payouts,
-        average_wins=float(get_distribution_average(win_distribution)),
-        rtp=calculate_rtp(win_distribution, bet_cost, weight_range),
-        std=std,
-        var=var,
-        hr_max=get_maxwin_hitrate(win_distribution, weight_range),
-        non_zero_hr=non_zero_hitrate(win_distribution, weight_range),
-        prob_nil=get_prob_no_win(win_distribution, weight_range),
-        prob_less_bet=prob_less_than_bet(win_distribution, bet_cost, weight_range),
+        average_wins=stats.average,
+        rtp=stats.rtp,
+        std=stats.std,
+        var=stats.variance,
+        hr_max=stats.maxwin_hitrate,
+        non_zero_hr=stats.non_zero_hitrate,
+        prob_nil=stats.prob_no_win,
+        prob_less_bet=stats.prob_less_than_bet,
         num_non_zero_payouts=get_num_non_zero_payouts(unique_payouts),
-        skew=skew,
-        excess_kurtosis=kurtosis,
+        skew=stats.skewness,
+        excess_kurtosis=stats.kurtosis,
     )
-    median = get_distribution_median(win_distribution, weight_range)
-    if median > 0:
-        m2m = MathStats.average_win / median
-        MathStats.m2m = m2m
+    if stats.median > 0:
+        MathStats.m2m = stats.average / stats.median
     else:
         MathStats.m2m = 0
     return MathStats
 
 
-def execute_all_tests(config, excluded_modes=[]):
-    """Run all tests for a given game"""
-    mode_stats = []
+def execute_all_tests(config, excluded_modes=[], max_workers: int = None):
+    """Run all tests for a given game, verifying modes in parallel processes."""
+    mode_args = []
     for bet_mode in config.bet_modes:
         name = bet_mode.get_name()
         cost = bet_mode.get_cost()
@@ -206,16 +276,18 @@ def execute_all_tests(config, excluded_modes=[]):
             if not (os.path.exists(book_file)) or not (os.path.exists(lut_file)):
                 raise RuntimeError("Books/Lookup file does not exist.")
 
-            win_dist, lut_payouts, weights_range, min_win, max_win = verify_lookup_format(lut_file)
-            book_payouts, num_events = verify_books_and_payout_mults(book_file)
-
-            compare_payout_values(book_payouts, lut_payouts)
-
-            StatsObject = get_lut_statistics(
-                win_dist, cost, lut_payouts, weights_range, min_win, max_win, num_events
+            dictionary_file = os.path.join(config.publish_path, f"books_{name}.dict")
+            mode_args.append(
+                (name, cost, book_file, lut_file, dictionary_file if os.path.exists(dictionary_file) else None)
             )
-            setattr(StatsObject, "name", name)
-            mode_stats.append(StatsObject)
+
+    if max_workers is None:
+        max_workers = min(len(mode_args), os.cpu_count() or 1)
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            mode_stats = list(executor.map(verify_mode, *zip(*mode_args)))
+    else:
+        mode_stats = [verify_mode(*args) for args in mode_args]
 
     fname = os.path.join(config.game_id, "library", "stats_summary.json")
     write_all_stats(mode_stats, fname)
@@ -4,6 +4,7 @@ import os
 import importlib
 import json
 from typing import List, Dict
+from src.write_data.force_index import load_force_index
 
 
 def load_game_config(game_id: str):
@@ -35,6 +36,7 @@ class ForceTool:
         self.config = load_game_config(game_id)
         self.target_mode = game_mode
         self.current_force_file = None
+        self.force_index = None
         self.search_keys = None
         self.method = None  # For payout range search only
 
@@ -48,6 +50,10 @@ class ForceTool:
         with open(force_name, "r", encoding="UTF-8") as f:
             self.current_force_file = json.loads(f.read())
 
+    def load_force_index(self):
+        "Load the inverted index of the force file, rebuilt from the JSON file if missing or stale."
+        self.force_index = load_force_index(self.get_force_file_name())
+
     def print_search_results(self, search_criteria, simulation_ids: List, filename: str, game_mode: str):
         """Record"""
         base_path = os.path.join(self.config.library_path, "forces")
@@ -79,14 +85,9 @@ class ForceTool:
         """
         assert search_keys is not None, "must specify serach keys and game_mode"
 
-        if reload_force_json:
-            self.load_force_file()
-        matched_book_ids = set()
-        for entry in self.current_force_file:
-            tranform_serach = self.transform_serch_dict(entry)
-            if all(tranform_serach.get(k) == v for k, v in search_keys.items()):
-                for idx in entry["bookIds"]:
-                    matched_book_ids.add(int(idx))
+        if reload_force_json or self.force_index is None:
+            self.load_force_index()
+        matched_book_ids = set(self.force_index.get_book_ids(search_keys).tolist())
 
         if len(matched_book_ids) == 0:
             raise Warning("No book-ids found.")
@@ -97,7 +98,7 @@ class ForceTool:
         Returns all id's appearing in multiplie search criteria
         """
         assert target_mode is not None, "Must specify game mode"
-        self.load_force_file()
+        self.load_force_index()
 
         book_id_sets = []
         for _, search_key in enumerate(search_array):
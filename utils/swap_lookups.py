@@ -7,9 +7,11 @@ import os
 import json
 
 ABS_PATH = Path(__file__).parent.parent
-sys.path.append(ABS_PATH)
+sys.path.append(str(ABS_PATH))
 os.chdir(ABS_PATH)
 
+from src.write_data.lookup_arrays import make_lookup_array, save_lookup_array
+
 
 def swap_tables(game_name: str, game_mode: str, target_file_number: int):
     """Replace default optimization table."""
@@ -20,6 +22,7 @@ def swap_tables(game_name: str, game_mode: str, target_file_number: int):
     new_opt_file = os.path.join("games", game_name, "library", "optimization_files", target_file)
 
     start_recording = False
+    ids, weights, payouts = [], [], []
 
     with open(new_opt_file, "r", encoding="UTF-8") as infile, open(new_lut_file, "w", encoding="UTF-8") as outfile:
         for line in infile:
@@ -37,9 +40,14 @@ def swap_tables(game_name: str, game_mode: str, target_file_number: int):
                     outfile.write(f"{idx},{weight},{payout}\n")
                 except:
                     raise ValueError("Could not write transformed line.")
+                ids.append(idx)
+                weights.append(weight)
+                payouts.append(payout)
             elif line == "Distribution":
                 start_recording = True
 
+    save_lookup_array(new_lut_file, make_lookup_array(ids, weights, payouts))
+
 
 def process_many_files(game_id, file_dict: dict) -> None:
     """Swap out multiple optimization files."""